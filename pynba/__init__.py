@@ -1,9 +1,92 @@
 """Hodge podge of NBA stats and analysis utilities"""
 
+import importlib
+from typing import TYPE_CHECKING
+
 from pynba import logging as __logging
-from pynba.team_info import *
-from pynba.seasons import *
-from pynba.possessions import *
-from pynba.halfgames import *
-from pynba.teams import *
-from pynba.plot import *
+
+
+# the public API, by the module it's from, which is only imported on first
+# access, so e.g. importing season_from_file doesn't import PyMC3 or Bokeh
+_API_MODULES = {
+    "team_info": ["team_id_to_abb", "team_ids_to_abbs"],
+    "seasons": [
+        "season_from_file",
+        "season_from_pbpstats",
+        "seasons_on_file",
+        "save_season",
+    ],
+    "possessions": [
+        "possessions_from_file",
+        "possessions_from_game",
+        "possessions_from_season",
+        "possessions_manifest",
+        "save_possessions",
+    ],
+    "halfgames": [
+        "halfgames_from_file",
+        "halfgames_from_possessions",
+        "save_halfgames",
+        "update_halfgames",
+    ],
+    "teams": [
+        "save_teams",
+        "save_trace",
+        "teams_from_file",
+        "teams_from_files",
+        "teams_from_halfgames",
+        "trace_from_file",
+    ],
+    "simulate": ["simulate_season"],
+    "query": ["partitions_on_file", "query"],
+    "plot": ["bokeh_theme", "save_stats_plot"],
+}
+_API = {name: module for module, names in _API_MODULES.items() for name in names}
+
+__all__ = list(_API)
+
+if TYPE_CHECKING:
+    # the same names, imported eagerly for static analysis only, e.g. pylint
+    from pynba.team_info import team_id_to_abb, team_ids_to_abbs
+    from pynba.seasons import (
+        season_from_file,
+        season_from_pbpstats,
+        seasons_on_file,
+        save_season,
+    )
+    from pynba.possessions import (
+        possessions_from_file,
+        possessions_from_game,
+        possessions_from_season,
+        possessions_manifest,
+        save_possessions,
+    )
+    from pynba.halfgames import (
+        halfgames_from_file,
+        halfgames_from_possessions,
+        save_halfgames,
+        update_halfgames,
+    )
+    from pynba.teams import (
+        save_teams,
+        save_trace,
+        teams_from_file,
+        teams_from_files,
+        teams_from_halfgames,
+        trace_from_file,
+    )
+    from pynba.simulate import simulate_season
+    from pynba.query import partitions_on_file, query
+    from pynba.plot import bokeh_theme, save_stats_plot
+
+
+def __getattr__(name):
+    if name in _API:
+        value = getattr(importlib.import_module(f"pynba.{_API[name]}"), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
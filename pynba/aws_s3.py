@@ -1,12 +1,61 @@
 """Module of utilities for working with s3"""
 
-import boto3
+import io
+import os
+import fnmatch
+import functools
+import re
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
+from botocore.exceptions import ClientError
+
+from pynba.config import config
 from pynba.constants import S3
 
 
-s3_client = boto3.client(S3)
-NoSuchKey = s3_client.exceptions.NoSuchKey
+logger = logging.getLogger(__name__)
+
+_client_lock = threading.Lock()
+
+CHUNK_SIZE = 2**20
+
+SyncSummary = namedtuple(
+    "SyncSummary",
+    ["files_uploaded", "bytes_uploaded", "files_skipped", "bytes_skipped"],
+)
+
+
+def __getattr__(name):
+    """s3_client & NoSuchKey, created on first use rather than on import"""
+    if name == "s3_client":
+        return _s3_client()
+    if name == "NoSuchKey":
+        return _s3_client().exceptions.NoSuchKey
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _s3_client():
+    """
+    The process's boto3 client for AWS S3, imported & created on first use,
+    since that takes a while, stored as the module's s3_client, e.g. to patch
+    """
+    client = globals().get("s3_client")
+    if client is None:
+        # boto3's default session isn't thread safe
+        with _client_lock:
+            client = globals().get("s3_client")
+            if client is None:
+                import boto3  # pylint: disable=import-outside-toplevel
+
+                client = boto3.client(S3)
+                globals()["s3_client"] = client
+    return client
 
 
 def get_fileobject(bucket, key, **kwargs):
@@ -25,7 +74,7 @@ def get_fileobject(bucket, key, **kwargs):
     -------
     StreamingBody fileobject
     """
-    response = s3_client.get_object(Bucket=bucket, Key=key, **kwargs)
+    response = _s3_client().get_object(Bucket=bucket, Key=key, **kwargs)
     return response["Body"]
 
 
@@ -46,9 +95,456 @@ def list_objects(bucket, **kwargs):
     iterator yielding dictionaries
     """
     while True:
-        response = s3_client.list_objects_v2(Bucket=bucket, **kwargs)
-        for content in response["Contents"]:
+        response = _s3_client().list_objects_v2(Bucket=bucket, **kwargs)
+        # there are no contents if there are no objects
+        for content in response.get("Contents", []):
             yield content
         if not response["IsTruncated"]:
             break
         kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+
+class S3File(io.RawIOBase):
+    """
+    Seekable, read-only file object for a key in AWS S3, backed by ranged
+    GET requests, so e.g. PyArrow only fetches the parquet footer and the
+    column chunks it needs, rather than the whole object. Reads are served
+    from a cache of fixed size blocks, and uncached blocks are fetched
+    along with the blocks just after them, reading ahead in one request.
+    The first request fetches the end of the object, where parquet keeps
+    its footer, along with the object's size and ETag. Later requests
+    require the same ETag, so a file changing mid-read raises an error
+    rather than returning a mix of old and new bytes.
+
+    Read parquet from it with pre_buffer=False, since the block cache
+    already coalesces reads, and pre-buffering would call back into Python
+    from PyArrow's IO threads, which can abort the interpreter at exit.
+
+    Parameters
+    ----------
+    bucket : str
+        name of the AWS S3 bucket
+    key: str
+        key for file in the bucket
+    block_size : int, optional
+        bytes per block, defaulting to config.aws_s3_block_size
+    readahead_blocks : int, optional
+        minimum number of blocks per request, defaulting to
+        config.aws_s3_readahead_blocks
+    cache_blocks : int, optional
+        maximum number of blocks to cache, least recently used first out,
+        defaulting to config.aws_s3_cache_blocks
+    """
+
+    def __init__(
+        self, bucket, key, *, block_size=None, readahead_blocks=None, cache_blocks=None
+    ):
+        super().__init__()
+        self.bucket = bucket
+        self.key = key
+        self.block_size = block_size or config.aws_s3_block_size
+        self.readahead_blocks = readahead_blocks or config.aws_s3_readahead_blocks
+        self.cache_blocks = cache_blocks or config.aws_s3_cache_blocks
+        self.requests = 0
+        self.bytes_fetched = 0
+        self._position = 0
+        self._blocks = OrderedDict()
+        self.size, self.etag = self._fetch_tail()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self._position
+        data = self._read_range(self._position, size)
+        self._position += len(data)
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def _read_range(self, start, size):
+        stop = min(start + size, self.size)
+        if start >= stop:
+            return b""
+        first = start // self.block_size
+        last = (stop - 1) // self.block_size
+        pieces = []
+        for index in range(first, last + 1):
+            block_start = index * self.block_size
+            pieces.append(
+                memoryview(self._block(index, last))[
+                    max(start - block_start, 0) : stop - block_start
+                ]
+            )
+        return b"".join(pieces)
+
+    def _block(self, index, last_needed):
+        if index in self._blocks:
+            self._blocks.move_to_end(index)
+            return self._blocks[index]
+        n_blocks = -(-self.size // self.block_size)
+        stop = min(max(last_needed + 1, index + self.readahead_blocks), n_blocks)
+        # don't fetch again blocks that are already cached
+        for later_index in range(index + 1, stop):
+            if later_index in self._blocks:
+                stop = later_index
+                break
+        start_byte = index * self.block_size
+        stop_byte = min(stop * self.block_size, self.size)
+        data = self._get(f"bytes={start_byte}-{stop_byte - 1}", IfMatch=self.etag)[0]
+        self._cache_blocks(data, index)
+        return data[: self.block_size]
+
+    def _fetch_tail(self):
+        try:
+            data, response = self._get(f"bytes=-{self.block_size}")
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] == "InvalidRange":  # empty object
+                return 0, None
+            raise
+        size = int(re.search(r"/(\d+)$", response["ContentRange"]).group(1))
+        # cache the tail's blocks, skipping any partial block at its start
+        first = -(-(size - len(data)) // self.block_size)
+        self._cache_blocks(data[first * self.block_size - (size - len(data)) :], first)
+        return size, response["ETag"]
+
+    def _get(self, byte_range, **kwargs):
+        try:
+            response = _s3_client().get_object(
+                Bucket=self.bucket, Key=self.key, Range=byte_range, **kwargs
+            )
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] == "NoSuchKey":
+                raise FileNotFoundError(
+                    f"No such key {self.key} in bucket {self.bucket}"
+                ) from exc
+            raise
+        data = response["Body"].read()
+        self.requests += 1
+        self.bytes_fetched += len(data)
+        return data, response
+
+    def _cache_blocks(self, data, first):
+        for offset in range(0, len(data), self.block_size):
+            index = first + offset // self.block_size
+            self._blocks[index] = data[offset : offset + self.block_size]
+            self._blocks.move_to_end(index)
+        while len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+
+
+class S3Cache:
+    """
+    Local read-through cache of objects in AWS S3. Each object's copy lives
+    in a directory for its bucket & key, named for its ETag, so a changed
+    object never matches an old copy. A lookup revalidates the cached copy
+    with a conditional GET (If-None-Match), so unchanged objects cost
+    a request but no download, unless the copy was checked less than
+    max_age seconds ago, i.e. its modification time, in which case it's
+    used as is, e.g. so reading a season's files again costs no requests.
+    Once the copies total more than max_bytes, the least recently checked
+    are evicted. Counts hits, misses and bytes downloaded, for this process.
+
+    Parameters
+    ----------
+    directory : str
+        local path for the cached copies
+    max_bytes : int
+        size above which least recently checked copies are evicted
+    max_age : float, optional
+        seconds a checked copy is used for without checking it again,
+        defaulting to 0, i.e. checking on every lookup
+    """
+
+    def __init__(self, directory, max_bytes, max_age=0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.bytes_downloaded = 0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.bytes_downloaded / 2**20:.1f} MiB downloaded"
+        )
+
+    def filepath(self, bucket, key):
+        """
+        Local path of an up to date copy of an object in AWS S3,
+        downloading it if there's no such copy already
+
+        Parameters
+        ----------
+        bucket : str
+            name of the AWS S3 bucket
+        key: str
+            key for file in the bucket
+
+        Returns
+        -------
+        str
+        """
+        object_dir = os.path.join(
+            self.directory, hashlib.sha256(f"{bucket}/{key}".encode()).hexdigest()
+        )
+        cached_etags = []
+        if os.path.isdir(object_dir):
+            cached_etags = [
+                name for name in os.listdir(object_dir) if not name.endswith(".tmp")
+            ]
+        if cached_etags and self._is_fresh(os.path.join(object_dir, cached_etags[0])):
+            with self._lock:
+                self.hits += 1
+            return os.path.join(object_dir, cached_etags[0])
+        kwargs = {"IfNoneMatch": f'"{cached_etags[0]}"'} if cached_etags else {}
+        try:
+            response = _s3_client().get_object(Bucket=bucket, Key=key, **kwargs)
+        except ClientError as exc:
+            code = exc.response["Error"]["Code"]
+            if code in ("304", "NotModified"):
+                filepath = os.path.join(object_dir, cached_etags[0])
+                os.utime(filepath)  # marks it as recently checked
+                with self._lock:
+                    self.hits += 1
+                return filepath
+            if code == "NoSuchKey":
+                raise FileNotFoundError(
+                    f"No such key {key} in bucket {bucket}"
+                ) from exc
+            raise
+
+        os.makedirs(object_dir, exist_ok=True)
+        filepath = os.path.join(object_dir, response["ETag"].strip('"'))
+        n_bytes = _download(response["Body"], filepath)
+        for etag in cached_etags:
+            if os.path.join(object_dir, etag) != filepath:
+                _remove(os.path.join(object_dir, etag))
+        with self._lock:
+            self.misses += 1
+            self.bytes_downloaded += n_bytes
+        logger.info(f"Cached s3://{bucket}/{key} ({n_bytes / 2**20:.1f} MiB)")
+        self.evict()
+        return filepath
+
+    def _is_fresh(self, filepath):
+        """Whether a cached copy was checked less than max_age seconds ago"""
+        try:
+            return time.time() - os.path.getmtime(filepath) < self.max_age
+        except FileNotFoundError:  # e.g. evicted by another process
+            return False
+
+    def evict(self):
+        """Removes least recently checked copies until they fit within max_bytes"""
+        copies = []
+        if not os.path.isdir(self.directory):
+            return
+        for object_dir in os.scandir(self.directory):
+            if object_dir.is_dir():
+                for copy in os.scandir(object_dir.path):
+                    stat = copy.stat()
+                    copies.append((stat.st_mtime, stat.st_size, copy.path))
+        total_bytes = sum(size for _, size, _ in copies)
+        for _, size, path in sorted(copies):
+            if total_bytes <= self.max_bytes:
+                break
+            _remove(path)
+            total_bytes -= size
+            logger.info(f"Evicted {path} from the s3 cache")
+
+
+def _download(body, filepath):
+    """Downloads via a temporary file, so readers never see a partial copy"""
+    file_descriptor, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(filepath), suffix=".tmp"
+    )
+    n_bytes = 0
+    try:
+        with os.fdopen(file_descriptor, "wb") as tmp_file:
+            for chunk in body.iter_chunks(CHUNK_SIZE):
+                tmp_file.write(chunk)
+                n_bytes += len(chunk)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+    return n_bytes
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass  # e.g. another process got there first
+
+
+@functools.lru_cache(maxsize=None)
+def s3_cache():
+    """The process's S3Cache, in config.cache_directory"""
+    return S3Cache(
+        os.path.join(config.local_data_directory, config.cache_directory, S3),
+        config.s3_cache_max_bytes,
+        config.s3_cache_max_age,
+    )
+
+
+def s3_filepath_or_buffer(bucket, key):
+    """
+    Something to read an object in AWS S3 from, for e.g. pd.read_parquet:
+    the path of a local copy from the s3_cache if config.s3_cache is on,
+    otherwise an S3File
+
+    Parameters
+    ----------
+    bucket : str
+        name of the AWS S3 bucket
+    key: str
+        key for file in the bucket
+
+    Returns
+    -------
+    str or S3File
+    """
+    if config.s3_cache:
+        return s3_cache().filepath(bucket, key)
+    return S3File(bucket, key)
+
+
+def sync_directory(directory, bucket, key_prefix, *, exclude=(), max_workers=None):
+    """
+    Uploads a local directory's files to AWS S3, like aws s3 sync, but
+    skipping files whose remote copy has the same size & ETag, i.e. md5,
+    so unchanged files cost nothing but hashing them locally. Files are
+    compared & uploaded up to max_workers at a time, large ones in parts of
+    config.aws_s3_multipart_chunksize bytes, uploaded concurrently.
+    Objects uploaded in parts of a different size, e.g. by the aws cli with
+    a different chunk size configured, don't match, so are uploaded again.
+
+    Parameters
+    ----------
+    directory : str
+        local path of the directory
+    bucket : str
+        name of the AWS S3 bucket
+    key_prefix : str
+        prefix of the files' keys, followed by their relative paths
+    exclude : iterable of str, optional
+        fnmatch patterns of relative paths not to upload, e.g. "*.DS_Store"
+    max_workers : int, optional
+        number of files compared & uploaded at once,
+        defaulting to config.aws_s3_upload_concurrency
+
+    Returns
+    -------
+    SyncSummary
+        numbers of files & bytes uploaded, and skipped as unchanged
+    """
+    max_workers = max_workers or config.aws_s3_upload_concurrency
+    remote_manifest = {
+        obj["Key"]: (obj["Size"], obj["ETag"].strip('"'))
+        for obj in list_objects(bucket, Prefix=f"{key_prefix}/")
+    }
+    transfer_config = _transfer_config()
+
+    def sync_file(relpath):
+        filepath = os.path.join(directory, relpath)
+        key = f"{key_prefix}/{relpath}"
+        size = os.path.getsize(filepath)
+        remote_size, remote_etag = remote_manifest.get(key, (None, None))
+        if remote_size == size and _etag(filepath, remote_etag) == remote_etag:
+            return False, size
+        logger.info(f"Uploading {filepath} to s3://{bucket}/{key}")
+        _s3_client().upload_file(filepath, bucket, key, Config=transfer_config)
+        return True, size
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(sync_file, _local_files(directory, exclude)))
+    summary = SyncSummary(
+        files_uploaded=sum(uploaded for uploaded, _ in results),
+        bytes_uploaded=sum(size for uploaded, size in results if uploaded),
+        files_skipped=sum(not uploaded for uploaded, _ in results),
+        bytes_skipped=sum(size for uploaded, size in results if not uploaded),
+    )
+    logger.info(
+        f"Uploaded {summary.files_uploaded} files, "
+        f"{summary.bytes_uploaded / 2**20:.1f} MiB, "
+        f"skipped {summary.files_skipped} unchanged files, "
+        f"{summary.bytes_skipped / 2**20:.1f} MiB"
+    )
+    return summary
+
+
+def _local_files(directory, exclude):
+    """Relative paths of a directory's files, with / separators, not excluded"""
+    relpaths = []
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in filenames:
+            relpath = os.path.relpath(os.path.join(dirpath, filename), directory)
+            relpath = relpath.replace(os.sep, "/")
+            if not any(fnmatch.fnmatch(relpath, pattern) for pattern in exclude):
+                relpaths.append(relpath)
+    return sorted(relpaths)
+
+
+def _transfer_config():
+    """
+    boto3's config for uploads, in parts of config.aws_s3_multipart_chunksize,
+    so ETags of multipart uploads can be computed locally by _etag
+    """
+    # pylint: disable=import-outside-toplevel
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=config.aws_s3_multipart_chunksize,
+        multipart_chunksize=config.aws_s3_multipart_chunksize,
+        max_concurrency=config.aws_s3_upload_concurrency,
+    )
+
+
+def _etag(filepath, remote_etag=None):
+    """
+    The ETag AWS S3 gives a local file once uploaded: its md5, unless the
+    remote ETag is of a multipart upload, e.g. "<md5>-3", in which case it's
+    the md5 of the md5s of its parts of config.aws_s3_multipart_chunksize
+    bytes, followed by the number of parts
+    """
+    with open(filepath, "rb") as file:
+        if remote_etag is None or "-" not in remote_etag:
+            md5 = hashlib.md5()
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                md5.update(chunk)
+            return md5.hexdigest()
+        part_md5s = [
+            hashlib.md5(part).digest()
+            for part in iter(lambda: file.read(config.aws_s3_multipart_chunksize), b"")
+        ]
+    return f"{hashlib.md5(b''.join(part_md5s)).hexdigest()}-{len(part_md5s)}"
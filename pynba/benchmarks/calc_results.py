@@ -0,0 +1,70 @@
+"""
+Benchmark of the time & peak memory TeamsModel takes to post-process
+a trace into its results, for a synthetic season's model and a trace of
+draws around its prior means, split across chains like pm.sample's,
+with & without posterior quantile columns
+"""
+
+import argparse
+import functools
+import logging
+
+import numpy as np
+import pymc3 as pm
+from pymc3.backends.ndarray import NDArray
+
+from pynba.team_stats import TeamsModel
+from pynba.benchmarks.likelihood_gradient import _synthetic_halfgames
+from pynba.benchmarks.timing import best_of, peak_memory
+
+
+logger = logging.getLogger(__name__)
+
+
+def _synthetic_trace(model, draws, chains, seed=42):
+    """MultiTrace of draws jittered around the model's test point"""
+    rng = np.random.default_rng(seed)
+    # including deterministic values, e.g. off_pace from off_pace_log__
+    test_point = dict(
+        zip(
+            [rv.name for rv in model.unobserved_RVs],
+            model.fastfn(model.unobserved_RVs)(model.test_point),
+        )
+    )
+    straces = []
+    for chain in range(chains):
+        strace = NDArray(model=model)
+        strace.setup(draws // chains, chain)
+        for name, samples in strace.samples.items():
+            samples[:] = test_point[name] * rng.uniform(0.98, 1.02, samples.shape)
+        strace.draw_idx = draws // chains
+        straces.append(strace)
+    return pm.backends.base.MultiTrace(straces)
+
+
+def main():
+    """Time & measure TeamsModel._calc_results' memory, with & without quantiles"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--draws", type=int, default=20_000)
+    parser.add_argument("--chains", type=int, default=4)
+    parser.add_argument("--quantiles", type=float, nargs="*", default=[0.05, 0.95])
+    args = parser.parse_args()
+
+    teams_model = TeamsModel(_synthetic_halfgames(1230))
+    teams_model._trace = _synthetic_trace(  # pylint: disable=protected-access
+        teams_model.model, args.draws, args.chains
+    )
+    for quantiles in [[], args.quantiles]:
+        calc_results = functools.partial(
+            teams_model._calc_results, quantiles  # pylint: disable=protected-access
+        )
+        seconds = best_of(calc_results)
+        peak = peak_memory(calc_results)
+        logger.info(
+            f"{args.draws} draws, quantiles {quantiles}: {seconds * 1e3:.0f}ms, "
+            f"{peak / 2**20:.0f} MiB peak memory"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of building every season's file paths, for seasons, possessions,
+halfgames & teams, with the config's snapshot of its settings, versus
+looking each field up in the Dynaconf settings on each access, as the
+config used to
+"""
+
+import argparse
+import logging
+from unittest import mock
+
+from pynba import halfgames, possessions, seasons, teams
+from pynba.benchmarks.timing import best_of
+from pynba.config import Config, config
+from pynba.constants import LEAGUES, SEASON_TYPES
+
+
+logger = logging.getLogger(__name__)
+
+FIRST_YEAR = 1997
+LAST_YEAR = 2022
+MODULES = [seasons, possessions, halfgames, teams]
+
+
+class _PerAccessConfig:  # pylint: disable=too-few-public-methods
+    """Config looking up & coercing each field on each access"""
+
+    def __init__(self, settings):
+        self._settings = settings
+
+    def __getattr__(self, name):
+        # pylint: disable=protected-access
+        return Config._fields[name](self._settings[name])
+
+
+def _build_paths(repeat):
+    for _ in range(repeat):
+        for league in LEAGUES:
+            for year in range(FIRST_YEAR, LAST_YEAR + 1):
+                for season_type in SEASON_TYPES:
+                    # pylint: disable=protected-access
+                    seasons._season_filepath(league, year, season_type)
+                    possessions._possessions_filepath(league, year, season_type)
+                    halfgames._halfgames_filepath(league, year, season_type)
+                    teams._teams_filepath(league, year, season_type)
+
+
+def main():
+    """Time building paths with each kind of config"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    n_seasons = len(LEAGUES) * (LAST_YEAR - FIRST_YEAR + 1) * len(SEASON_TYPES)
+    logger.info(f"Building paths of {n_seasons} seasons, {args.repeat} times over")
+    # pylint: disable=protected-access,no-member
+    per_access = _PerAccessConfig(config._settings)
+    for name, cfg in [("per access", per_access), ("snapshot", config)]:
+        patchers = [mock.patch.object(module, "config", cfg) for module in MODULES]
+        for patcher in patchers:
+            patcher.start()
+        try:
+            seconds = best_of(lambda: _build_paths(args.repeat))
+        finally:
+            for patcher in patchers:
+                patcher.stop()
+        per_season = seconds / (n_seasons * args.repeat)
+        logger.info(f"{name}: {seconds * 1e3:.0f}ms, {per_season * 1e6:.1f}us/season")
+
+
+if __name__ == "__main__":
+    main()
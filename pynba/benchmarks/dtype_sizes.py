@@ -0,0 +1,139 @@
+"""
+Report of the in-memory and on-disk size of every season of possessions
+and games on file, with the compact dtypes of pynba.schemas, versus
+the wide dtypes they used to have, i.e. object strings and 64 bit numbers,
+or of synthetic seasons if asked for
+"""
+
+import argparse
+import io
+import logging
+
+import numpy as np
+import pandas as pd
+
+from pynba import seasons_on_file, season_from_file, possessions_from_file
+from pynba.benchmarks.halfgames import _synthetic_possessions
+from pynba.parse_pbpstats_possessions import GAME_COLUMNS, PLAYER_COLUMNS
+from pynba.schemas import POSSESSIONS_SCHEMA, SEASON_SCHEMA, apply_schema
+
+
+logger = logging.getLogger(__name__)
+
+
+def _widened(frame):
+    """The frame with the wide dtypes used before pynba.schemas"""
+    columns = {}
+    for column, values in frame.items():
+        if pd.api.types.is_datetime64_any_dtype(values):
+            columns[column] = values.dt.strftime("%Y-%m-%d")
+        elif isinstance(
+            values.dtype, pd.CategoricalDtype
+        ) or pd.api.types.is_string_dtype(values):
+            columns[column] = values.astype(object)
+        elif pd.api.types.is_extension_array_dtype(values):
+            columns[column] = values.astype("Int64")
+        elif pd.api.types.is_integer_dtype(values):
+            columns[column] = values.astype("int64")
+        elif pd.api.types.is_float_dtype(values):
+            columns[column] = values.astype("float64")
+    return frame.assign(**columns)
+
+
+def _sizes(frame):
+    """In-memory and parquet sizes of a frame, in bytes"""
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return frame.memory_usage(deep=True).sum(), buffer.getbuffer().nbytes
+
+
+def _synthetic_seasons(n_seasons):
+    """
+    Seasons' games & possessions, with every column possessions on file have,
+    e.g. players, filled in around the halfgames benchmark's possessions
+    """
+    rng = np.random.default_rng(42)
+    all_possessions = _synthetic_possessions(n_seasons)
+    for year, possessions in all_possessions.groupby("year"):
+        n_rows = len(possessions)
+        possessions = possessions.assign(
+            away_team_id=possessions["home_team_id"] + 100,
+            status="final",
+            start_time=rng.uniform(0, 720, n_rows),
+            start_score_margin=rng.integers(-30, 31, n_rows),
+            # about as many players as play in a season
+            **{
+                column: rng.integers(200_000, 200_500, n_rows)
+                for column in PLAYER_COLUMNS
+            },
+        )
+        possessions["end_time"] = possessions["start_time"] - possessions["duration"]
+        possessions = apply_schema(possessions, POSSESSIONS_SCHEMA)
+        games = possessions.drop_duplicates("game_id")[GAME_COLUMNS].astype(
+            {"game_id": str}
+        )
+        yield ("nba", year, "Regular Season"), {
+            "seasons": apply_schema(games, SEASON_SCHEMA),
+            "possessions": possessions,
+        }
+
+
+def _seasons_on_file():
+    """Each season on file's games, and possessions if it has them"""
+    season_info = seasons_on_file()
+    for season in zip(
+        season_info["league"], season_info["year"], season_info["season_type"]
+    ):
+        frames = {"seasons": season_from_file(*season)}
+        try:
+            frames["possessions"] = possessions_from_file(*season)
+        except FileNotFoundError:
+            logger.info(f"No possessions on file for {season}")
+        yield season, frames
+
+
+def _report(name, totals):
+    (wide_memory, wide_disk), (compact_memory, compact_disk) = totals
+    logger.info(
+        f"{name}: in memory {wide_memory / 2**20:.1f} -> {compact_memory / 2**20:.1f} "
+        f"MiB ({1 - compact_memory / wide_memory:.0%} smaller), on disk "
+        f"{wide_disk / 2**20:.1f} -> {compact_disk / 2**20:.1f} "
+        f"MiB ({1 - compact_disk / wide_disk:.0%} smaller)"
+    )
+
+
+def main():
+    """Compare sizes with wide and compact dtypes across all seasons on file"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--synthetic-seasons",
+        type=int,
+        default=0,
+        help="measure this many synthetic seasons rather than those on file",
+    )
+    args = parser.parse_args()
+
+    totals = {
+        "possessions": [[0, 0], [0, 0]],
+        "seasons": [[0, 0], [0, 0]],
+    }
+    if args.synthetic_seasons:
+        seasons = _synthetic_seasons(args.synthetic_seasons)
+    else:
+        seasons = _seasons_on_file()
+    for season, frames in seasons:
+        for name, frame in frames.items():
+            for total, sizes in zip(
+                totals[name], [_sizes(_widened(frame)), _sizes(frame)]
+            ):
+                total[0] += sizes[0]
+                total[1] += sizes[1]
+        logger.info(f"Measured {season}")
+
+    for name, name_totals in totals.items():
+        if name_totals[0][0]:
+            _report(name, name_totals)
+
+
+if __name__ == "__main__":
+    main()
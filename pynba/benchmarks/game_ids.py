@@ -0,0 +1,85 @@
+"""
+Benchmark of deriving the league, year & season type of a possessions
+column of game_ids, mapping the single game_id functions over every row,
+versus parse_game_ids, for the game_ids of many synthetic seasons
+"""
+
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from pynba.benchmarks.halfgames import GAMES_PER_SEASON, POSSESSIONS_PER_GAME
+from pynba.benchmarks.timing import best_of
+from pynba.game_id import (
+    league_from_game_id,
+    parse_game_ids,
+    season_type_from_game_id,
+    year_from_game_id,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _synthetic_game_ids(n_seasons):
+    """Every possession's game_id, as a categorical column like possessions'"""
+    game_ids = [
+        f"002{year % 100:02d}{game_num:05d}"
+        for year in range(2001, 2001 + n_seasons)
+        for game_num in range(1, GAMES_PER_SEASON + 1)
+    ]
+    return pd.Series(
+        pd.Categorical.from_codes(
+            np.repeat(np.arange(len(game_ids)), POSSESSIONS_PER_GAME), game_ids
+        )
+    )
+
+
+def _mapped(game_ids):
+    return pd.DataFrame(
+        {
+            "league": game_ids.map(league_from_game_id),
+            "year": game_ids.map(year_from_game_id),
+            "season_type": game_ids.map(season_type_from_game_id),
+        }
+    )
+
+
+def _mapped_per_row(game_ids):
+    return pd.DataFrame(
+        {
+            "league": [league_from_game_id(game_id) for game_id in game_ids],
+            "year": [year_from_game_id(game_id) for game_id in game_ids],
+            "season_type": [season_type_from_game_id(game_id) for game_id in game_ids],
+        }
+    )
+
+
+def main():
+    """Compare the throughput of the ways of parsing game_ids"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seasons", type=int, default=10)
+    args = parser.parse_args()
+
+    categorical = _synthetic_game_ids(args.seasons)
+    strings = categorical.astype("string")
+    logger.info(
+        f"Parsing {len(categorical):,} game_ids of {categorical.nunique():,} games"
+    )
+    for name, func, game_ids in [
+        ("map per row", _mapped_per_row, strings),
+        ("map categories", _mapped, categorical),
+        ("parse_game_ids strings", parse_game_ids, strings),
+        ("parse_game_ids categorical", parse_game_ids, categorical),
+    ]:
+        seconds = best_of(lambda func=func, game_ids=game_ids: func(game_ids))
+        logger.info(
+            f"{name}: {seconds * 1e3:.0f}ms, "
+            f"{len(game_ids) / seconds / 1e6:.1f}M game_ids/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark of aggregating possessions into halfgames with Pandas' groupby,
+versus the single pass over NumPy arrays, on the possessions of every season
+on file concatenated together, or synthetic seasons if there are none
+"""
+
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from pynba import seasons_on_file, possessions_from_file
+from pynba.benchmarks.timing import best_of
+from pynba.halfgames import (
+    HALFGAMES_AGGREGATIONS,
+    HALFGAMES_KEYS,
+    halfgames_from_possessions,
+    _aggregate,
+    _aggregate_with_groupby,
+)
+from pynba.parse_pbpstats_possessions import COUNTER_COLUMNS
+from pynba.schemas import POSSESSIONS_SCHEMA, apply_schema
+
+
+logger = logging.getLogger(__name__)
+
+GAMES_PER_SEASON = 1230
+POSSESSIONS_PER_GAME = 200
+
+
+def _possessions_on_file():
+    frames = []
+    season_info = seasons_on_file()
+    for league, year, season_type in zip(
+        season_info["league"], season_info["year"], season_info["season_type"]
+    ):
+        try:
+            frames.append(
+                possessions_from_file(
+                    league,
+                    year,
+                    season_type,
+                    columns=HALFGAMES_KEYS + list(HALFGAMES_AGGREGATIONS),
+                )
+            )
+        except FileNotFoundError:
+            logger.info(f"No possessions on file for {league} {year} {season_type}")
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def _synthetic_possessions(n_seasons):
+    rng = np.random.default_rng(42)
+    n_games = n_seasons * GAMES_PER_SEASON
+    n_rows = n_games * POSSESSIONS_PER_GAME
+    game_nums = np.repeat(np.arange(n_games), POSSESSIONS_PER_GAME)
+    home_team_ids = rng.integers(1, 31, n_games)[game_nums]
+    is_home = np.tile(np.arange(POSSESSIONS_PER_GAME) % 2 == 0, n_games)
+    possessions = pd.DataFrame(
+        {
+            **{column: rng.integers(0, 3, n_rows) for column in COUNTER_COLUMNS},
+            "duration": rng.uniform(0, 24, n_rows),
+            "off_team_id": np.where(is_home, home_team_ids, home_team_ids + 100),
+            "def_team_id": np.where(is_home, home_team_ids + 100, home_team_ids),
+            "period": rng.integers(1, 5, n_rows),
+            "game_id": pd.Categorical.from_codes(
+                game_nums, [f"{ind:010d}" for ind in range(n_games)]
+            ),
+            "date": pd.Timestamp("2019-01-01"),
+            "home_team_id": home_team_ids,
+            "league": "nba",
+            "year": 2019 + game_nums // GAMES_PER_SEASON,
+            "season_type": "Regular Season",
+        }
+    )
+    possessions["possession_num"] = np.tile(np.arange(POSSESSIONS_PER_GAME), n_games)
+    return apply_schema(possessions, POSSESSIONS_SCHEMA)
+
+
+def main():
+    """Compare the throughput of the two ways of aggregating possessions"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--synthetic-seasons",
+        type=int,
+        default=0,
+        help="benchmark this many synthetic seasons rather than those on file",
+    )
+    args = parser.parse_args()
+
+    possessions = None
+    if not args.synthetic_seasons:
+        possessions = _possessions_on_file()
+    if possessions is None:
+        possessions = _synthetic_possessions(args.synthetic_seasons or 5)
+    logger.info(
+        f"Aggregating {len(possessions):,} possessions "
+        f"of {possessions['game_id'].nunique():,} games"
+    )
+    for name, func in [
+        ("groupby", _aggregate_with_groupby),
+        ("single pass", _aggregate),
+        ("halfgames_from_possessions", halfgames_from_possessions),
+    ]:
+        seconds = best_of(lambda func=func: func(possessions))
+        logger.info(
+            f"{name}: {seconds * 1e3:.0f}ms, "
+            f"{len(possessions) / seconds / 1e6:.1f}M possessions/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
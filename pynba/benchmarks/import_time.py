@@ -0,0 +1,72 @@
+"""
+Benchmark of the time taken to import pynba's public API, in a fresh
+interpreter with python -X importtime, reporting the slowest modules
+imported, and whether heavy optional modules like PyMC3 were among them
+"""
+
+import argparse
+import logging
+import subprocess
+import sys
+
+
+logger = logging.getLogger(__name__)
+
+# modules that importing pynba, or data loading functions, shouldn't import
+HEAVY_MODULES = ["pymc3", "theano", "arviz", "bokeh", "boto3"]
+STATEMENT = "from pynba import season_from_file, possessions_from_file"
+
+
+def import_times(statement=STATEMENT):
+    """
+    Cumulative import time of each module imported by running statement in
+    a fresh interpreter, in seconds, keyed by module name, along with the
+    total time of all the imports, and the names of all the modules imported.
+    Modules imported with importlib.import_module, e.g. by pynba's lazy
+    loading, aren't timed themselves, though their imports are, hence the
+    names of the modules imported are read from sys.modules.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"{statement}\nimport sys\nprint(*sys.modules, sep='\\n')",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        # e.g. "import time:       245 |       1024 |   pynba.config"
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative) / 1e6
+            # nested imports are indented, and included in their importer's time
+            if not module[1:].startswith(" "):
+                total += int(cumulative) / 1e6
+    return times, total, set(result.stdout.split())
+
+
+def main():
+    """Time importing pynba, and report its slowest imports"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statement", default=STATEMENT)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    times, total, modules = import_times(args.statement)
+    logger.info(f"{args.statement}: {total * 1e3:.0f}ms")
+    for module, seconds in sorted(times.items(), key=lambda item: -item[1])[: args.top]:
+        logger.info(f"{module}: {seconds * 1e3:.0f}ms")
+    heavy = [module for module in HEAVY_MODULES if module in modules]
+    logger.info(f"Heavy modules imported: {heavy or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
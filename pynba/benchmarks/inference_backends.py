@@ -0,0 +1,89 @@
+"""
+Comparison of TeamsModel's approximate inference backends against NUTS,
+by their time to fit and the differences in each team's net scoring rate
+and pace from NUTS' results, for each season on file
+"""
+
+import argparse
+import logging
+import time
+
+from pynba import seasons_on_file, halfgames_from_file
+from pynba.constants import NUTS, INFERENCE_BACKENDS
+from pynba.team_stats import TeamsModel
+
+
+logger = logging.getLogger(__name__)
+
+COMPARED_COLUMNS = ["net_scoring_rate", "total_pace"]
+
+
+def _fit(halfgames, backend):
+    """Results of fitting a TeamsModel with a backend, and the seconds it took"""
+    teams_model = TeamsModel(halfgames)
+    start = time.perf_counter()
+    teams_model.fit(backend=backend)
+    seconds = time.perf_counter() - start
+    return teams_model.results.set_index("team"), seconds
+
+
+def _compare(halfgames, season, totals):
+    """
+    Logs how each backend in totals compares with NUTS for a season,
+    adding to their totals, and returns the seconds NUTS took
+    """
+    nuts_results, nuts_seconds = _fit(halfgames, NUTS)
+    logger.info(f"{season}: {NUTS} took {nuts_seconds:.0f}s")
+    for backend, total in totals.items():
+        results, seconds = _fit(halfgames, backend)
+        diffs = (results[COMPARED_COLUMNS] - nuts_results[COMPARED_COLUMNS]).abs()
+        total["seconds"] += seconds
+        total["max_diff"] = max(total["max_diff"], diffs["net_scoring_rate"].max())
+        differences = ", ".join(
+            f"{column} differs by {diffs[column].mean():.2f} on average "
+            f"and {diffs[column].max():.2f} at most"
+            for column in COMPARED_COLUMNS
+        )
+        logger.info(f"{season}: {backend} took {seconds:.0f}s, {differences}")
+    return nuts_seconds
+
+
+def main():
+    """Compare each approximate backend with NUTS across seasons on file"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=[backend for backend in INFERENCE_BACKENDS if backend != NUTS],
+        default=[backend for backend in INFERENCE_BACKENDS if backend != NUTS],
+    )
+    parser.add_argument(
+        "--seasons",
+        type=int,
+        default=None,
+        help="only compare this many seasons, most recent first",
+    )
+    args = parser.parse_args()
+
+    season_info = seasons_on_file()[: args.seasons]
+    totals = {backend: {"seconds": 0.0, "max_diff": 0.0} for backend in args.backends}
+    nuts_seconds = 0.0
+    for league, year, season_type in zip(
+        season_info["league"], season_info["year"], season_info["season_type"]
+    ):
+        try:
+            halfgames = halfgames_from_file(league, year, season_type)
+        except FileNotFoundError:
+            logger.info(f"No halfgames on file for {league} {year} {season_type}")
+            continue
+        nuts_seconds += _compare(halfgames, f"{league} {year} {season_type}", totals)
+
+    for backend, total in totals.items():
+        logger.info(
+            f"{backend}: {total['seconds']:.0f}s in total versus {nuts_seconds:.0f}s "
+            f"for {NUTS}, net_scoring_rate differs by {total['max_diff']:.2f} at most"
+        )
+
+
+if __name__ == "__main__":
+    main()
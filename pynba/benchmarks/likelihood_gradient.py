@@ -0,0 +1,108 @@
+"""
+Benchmark of the time to evaluate the gradient of TeamsModel's log posterior,
+the bulk of NUTS' work, with its binomial terms per halfgame versus summed
+over halfgames with the same offense, defense & home team, for a season on
+file or a synthetic season of random matchups
+"""
+
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+from pymc3.theanof import inputvars
+
+from pynba import halfgames_from_file
+from pynba.halfgames import _rates
+from pynba.team_info import team_id_to_abb
+from pynba.team_stats import TeamsModel
+from pynba.benchmarks.timing import best_of
+
+
+logger = logging.getLogger(__name__)
+
+
+def _synthetic_halfgames(n_games, seed=42):
+    """Halfgames of an NBA season's worth of games between random teams"""
+    rng = np.random.default_rng(seed)
+    team_ids = np.array(list(team_id_to_abb("nba", 2019)))
+    matchups = np.array(
+        [rng.choice(team_ids, size=2, replace=False) for _ in range(n_games)]
+    )
+    n_halfgames = 2 * n_games
+    possessions = rng.integers(95, 105, n_halfgames)
+    shots = rng.binomial(possessions, 0.85)
+    threes = rng.binomial(shots, 0.35)
+    ft_attempted = rng.binomial(possessions, 0.2)
+    halfgames = pd.DataFrame(
+        {
+            "game_id": np.repeat([f"{game:010d}" for game in range(n_games)], 2),
+            "off_team_id": matchups.ravel(),
+            "def_team_id": matchups[:, ::-1].ravel(),
+            "home_team_id": np.repeat(matchups[:, 0], 2),
+            "league": "nba",
+            "year": 2019,
+            "season_type": "Regular Season",
+            "turnovers": rng.binomial(possessions, 0.13),
+            "threes_attempted": threes,
+            "threes_made": rng.binomial(threes, 0.35),
+            "twos_attempted": shots - threes,
+            "twos_made": rng.binomial(shots - threes, 0.52),
+            "ft_attempted": ft_attempted,
+            "ft_made": rng.binomial(ft_attempted, 0.77),
+            "off_rebs": rng.binomial(40, 0.25, n_halfgames),
+            "def_rebs": rng.binomial(40, 0.75, n_halfgames),
+            "points_scored": rng.integers(95, 120, n_halfgames),
+            "duration": possessions * rng.uniform(13, 15, n_halfgames),
+            "possession_num": possessions,
+        }
+    )
+    return halfgames.assign(**_rates(halfgames))
+
+
+def _time_gradient(halfgames, collapse_binomials, evaluations):
+    """Seconds per evaluation of the model's gradient, and its binomial terms"""
+    model = TeamsModel(halfgames, collapse_binomials=collapse_binomials).model
+    dlogp = model.fastdlogp(inputvars(model.vars))
+    point = model.test_point
+    dlogp(point)
+    seconds = best_of(lambda: [dlogp(point) for _ in range(evaluations)])
+    n_terms = sum(
+        model[name].observations.size
+        for name in ["threes_made", "twos_made", "threes_attempted", "off_rebs"]
+        + ["turnovers", "ft_made"]
+    )
+    return seconds / evaluations, n_terms
+
+
+def main():
+    """Compare gradient evaluation times with & without collapsed binomials"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--season",
+        nargs=3,
+        metavar=("LEAGUE", "YEAR", "SEASON_TYPE"),
+        help="season of halfgames on file to use, instead of a synthetic one",
+    )
+    parser.add_argument("--games", type=int, default=1230)
+    parser.add_argument("--evaluations", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.season:
+        league, year, season_type = args.season
+        halfgames = halfgames_from_file(league, int(year), season_type)
+    else:
+        halfgames = _synthetic_halfgames(args.games)
+    logger.info(f"{len(halfgames)} halfgames")
+    for collapse_binomials in [False, True]:
+        seconds, n_terms = _time_gradient(
+            halfgames, collapse_binomials, args.evaluations
+        )
+        logger.info(
+            f"collapse_binomials={collapse_binomials}: {n_terms} binomial terms, "
+            f"{seconds * 1e3:.2f}ms per gradient evaluation"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark of the AWS S3 requests & bytes it takes to read a whole season of
+possessions, a few columns of them, from its partition of per-game files,
+from the same partition compacted into one file, and from a single file
+for the season as before partitions, against moto's stand-in for
+AWS S3. Times are moto's, serving requests from within the same process,
+so leave out S3's per-request latency, which the request counts stand in for.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+from unittest import mock
+
+import boto3
+from moto import mock_aws
+
+from pynba import aws_s3, possessions
+from pynba.benchmarks.halfgames import POSSESSIONS_PER_GAME, _synthetic_possessions
+from pynba.benchmarks.timing import best_of
+from pynba.config import Config, config
+from pynba.constants import LOCAL, S3
+
+
+logger = logging.getLogger(__name__)
+
+BUCKET = "pynba-benchmark"
+KEY_PREFIX = "benchmark"
+SEASON = ("nba", 2019, "Regular Season")
+COMPACTED_SEASON = ("nba", 2020, "Regular Season")
+COLUMNS = ["game_id", "off_team_id", "def_team_id", "points_scored", "duration"]
+
+
+def _upload(client, local_dir):
+    for dirpath, _, filenames in os.walk(local_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            with open(path, "rb") as file:
+                client.put_object(
+                    Bucket=BUCKET, Key=f"{KEY_PREFIX}/{relpath}", Body=file
+                )
+
+
+def _save_season(local_dir):
+    season = _synthetic_possessions(1)
+    season["away_team_id"] = season["home_team_id"] + 100
+    # a row group per period, as in real games
+    season["period"] = 1 + season["possession_num"] * 4 // POSSESSIONS_PER_GAME
+    with mock.patch.object(Config, "possessions_compact_parts", 0):
+        possessions.save_possessions(season)
+    possessions.save_possessions(season.assign(year=COMPACTED_SEASON[1]))
+    season.to_parquet(
+        possessions._possessions_filepath(*SEASON),  # pylint: disable=protected-access
+        index=False,
+    )
+    partition = possessions._partition_location(  # pylint: disable=protected-access
+        LOCAL, *SEASON
+    )
+    n_files = len(os.listdir(partition))
+    logger.info(
+        f"Saved {season['game_id'].nunique()} games, {len(season):,} possessions, "
+        f"as {n_files} files in their partition, and as one file"
+    )
+    return local_dir
+
+
+def _partitioned():
+    return possessions.possessions_from_file(*SEASON, columns=COLUMNS)
+
+
+def _compacted():
+    return possessions.possessions_from_file(*COMPACTED_SEASON, columns=COLUMNS)
+
+
+def _single_file():
+    # pylint: disable-next=protected-access
+    return possessions._legacy_possessions_from_file(*SEASON, columns=COLUMNS)
+
+
+def main():
+    """Compare the requests & bytes each layout takes to read a season from S3"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    with tempfile.TemporaryDirectory() as tmp_dir, mock_aws(), mock.patch.multiple(
+        Config,
+        local_data_directory=tmp_dir,
+        possessions_source=LOCAL,
+        aws_s3_bucket=BUCKET,
+        aws_s3_key_prefix=KEY_PREFIX,
+        s3_cache=False,
+    ):
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        os.makedirs(os.path.join(tmp_dir, config.possessions_directory))
+        _upload(client, _save_season(tmp_dir))
+        with mock.patch.object(aws_s3, "s3_client", client), mock.patch.object(
+            Config, "possessions_source", S3
+        ):
+            for name, read in [
+                ("per game", _partitioned),
+                ("compacted", _compacted),
+                ("single", _single_file),
+            ]:
+                with mock.patch.object(
+                    client, "get_object", wraps=client.get_object
+                ) as get_object:
+                    season = read()
+                n_bytes = sum(
+                    _range_size(call.kwargs.get("Range"), client, call.kwargs["Key"])
+                    for call in get_object.call_args_list
+                )
+                seconds = best_of(read, repeat=3)
+                logger.info(
+                    f"{name}: {len(season):,} possessions, "
+                    f"{get_object.call_count:,} GET requests, "
+                    f"{n_bytes / 2**20:.1f} MiB, {seconds:.2f}s"
+                )
+
+
+def _range_size(byte_range, client, key):
+    """Bytes a GET of a byte range asked for, or the whole object without one"""
+    size = client.head_object(Bucket=BUCKET, Key=key)["ContentLength"]
+    if byte_range is None:
+        return size
+    start, stop = byte_range.removeprefix("bytes=").split("-")
+    if not start:
+        return min(int(stop), size)
+    return min(int(stop) + 1, size) - int(start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark of the per-game overhead of building a new pbpstats client,
+versus reusing the cached clients from pbpstats_client,
+when ingesting a season of games from the local file cache
+"""
+
+import argparse
+import logging
+
+from pynba import season_from_file
+from pynba.benchmarks.timing import best_of
+from pynba.constants import FILE, NBA, REGULAR_SEASON
+from pynba.load_pbpstats import _game_stats_provider
+from pynba.pbpstats_client import pbpstats_client, clear_pbpstats_clients
+
+
+logger = logging.getLogger(__name__)
+
+
+def _fresh_client(source, provider):
+    clear_pbpstats_clients()
+    return pbpstats_client(source, provider)
+
+
+def _load_games(game_ids, make_client):
+    for game_id in game_ids:
+        make_client(FILE, _game_stats_provider(game_id)).Game(game_id)
+
+
+def main():
+    """Time building vs reusing pbpstats clients over a season of games"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--league", default=NBA)
+    parser.add_argument("--year", type=int, default=2019)
+    parser.add_argument("--season-type", default=REGULAR_SEASON)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.info(f"Loading season data for {args.league} {args.year} {args.season_type}")
+    season = season_from_file(args.league, args.year, args.season_type)
+    game_ids = [str(game_id) for game_id in season["game_id"]]
+    providers = [_game_stats_provider(game_id) for game_id in game_ids]
+
+    for name, make_client in [("new", _fresh_client), ("cached", pbpstats_client)]:
+        seconds = best_of(
+            lambda make_client=make_client: [
+                make_client(FILE, provider) for provider in providers
+            ],
+            args.repeat,
+        )
+        logger.info(
+            f"Getting a {name} client for each of {len(game_ids)} games took "
+            f"{seconds:.3f}s, {seconds / len(game_ids) * 1e6:.0f}us per game"
+        )
+
+    for name, make_client in [("new", _fresh_client), ("cached", pbpstats_client)]:
+        seconds = best_of(
+            lambda make_client=make_client: _load_games(game_ids, make_client),
+            args.repeat,
+        )
+        logger.info(
+            f"Loading {len(game_ids)} games from file with a {name} client per game "
+            f"took {seconds:.3f}s, {seconds / len(game_ids) * 1e3:.2f}ms per game"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark of parsing a season's possessions with a dict per possession,
+versus the columnar PossessionsBuilder, on a season in the local file cache
+"""
+
+import argparse
+import logging
+
+import pandas as pd
+
+from pynba import season_from_file
+from pynba.benchmarks.timing import best_of, peak_memory
+from pynba.constants import NBA, REGULAR_SEASON
+from pynba.load_pbpstats import load_game
+from pynba.parse_pbpstats_possessions import (
+    PossessionsBuilder,
+    parse_possession,
+    GAME_COLUMNS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_dicts(games):
+    frames = []
+    for game_data, game in games:
+        frame = pd.DataFrame(parse_possession(poss) for poss in game.possessions.items)
+        frame["possession_num"] = frame.index
+        for column in GAME_COLUMNS:
+            frame[column] = game_data[column]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _parse_columnar(games):
+    builder = PossessionsBuilder()
+    for game_data, game in games:
+        builder.append_game(
+            game.possessions.items,
+            **{column: game_data[column] for column in GAME_COLUMNS},
+        )
+    return builder.to_frame()
+
+
+def main():
+    """Compare rows per second and peak memory of the two parsers"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--league", default=NBA)
+    parser.add_argument("--year", type=int, default=2019)
+    parser.add_argument("--season-type", default=REGULAR_SEASON)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.info(f"Loading games for {args.league} {args.year} {args.season_type}")
+    season = season_from_file(args.league, args.year, args.season_type)
+    games = [
+        (game_tuple._asdict(), load_game(str(game_tuple.game_id)))
+        for game_tuple in season.itertuples()
+    ]
+
+    for name, parse in [("dict", _parse_dicts), ("columnar", _parse_columnar)]:
+        n_rows = len(parse(games))
+        seconds = best_of(lambda parse=parse: parse(games), args.repeat)
+        peak = peak_memory(lambda parse=parse: parse(games))
+        logger.info(
+            f"{name} parser: {n_rows} rows in {seconds:.2f}s, "
+            f"{n_rows / seconds:.0f} rows/s, peak memory {peak / 2**20:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
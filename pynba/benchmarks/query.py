@@ -0,0 +1,99 @@
+"""
+Benchmark of loading all NBA regular-season possessions since 2001, a few
+columns of them, with one query reading seasons in parallel, versus
+possessions_from_file for each season in turn, for the possessions on file,
+or synthetic seasons saved to a temporary directory if there are none
+"""
+
+import argparse
+import logging
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+from pynba import possessions_from_file
+from pynba.benchmarks.halfgames import GAMES_PER_SEASON, _synthetic_possessions
+from pynba.benchmarks.timing import best_of
+from pynba.config import Config, config
+from pynba.constants import LOCAL, NBA, REGULAR_SEASON
+from pynba.possessions import save_possessions
+from pynba.query import partitions_on_file, query
+
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["game_id", "off_team_id", "def_team_id", "points_scored", "duration"]
+FIRST_YEAR = 2001
+
+
+def _query():
+    return query(
+        "possessions",
+        leagues=NBA,
+        years=range(FIRST_YEAR, 2100),
+        season_types=REGULAR_SEASON,
+        columns=COLUMNS,
+    )
+
+
+def _sequential():
+    seasons = partitions_on_file("possessions")
+    seasons = seasons[
+        (seasons["league"] == NBA)
+        & (seasons["year"] >= FIRST_YEAR)
+        & (seasons["season_type"] == REGULAR_SEASON)
+    ]
+    return pd.concat(
+        [
+            possessions_from_file(*season, columns=COLUMNS)
+            for season in seasons.itertuples(index=False)
+        ],
+        ignore_index=True,
+    )
+
+
+def _save_synthetic_seasons(n_seasons):
+    possessions = _synthetic_possessions(n_seasons)
+    possessions["away_team_id"] = possessions["home_team_id"] + 100
+    possessions["year"] = possessions["year"] - 2019 + FIRST_YEAR
+    for _, season in possessions.groupby("year"):
+        save_possessions(season)
+
+
+def _benchmark():
+    for name, func in [("sequential", _sequential), ("query", _query)]:
+        possessions = func()
+        seconds = best_of(func)
+        logger.info(
+            f"{name}: {len(possessions):,} possessions in {seconds:.2f}s, "
+            f"{len(possessions) / seconds / 1e6:.1f}M possessions/s"
+        )
+
+
+def main():
+    """Compare one parallel query with loading each season in turn"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--synthetic-seasons",
+        type=int,
+        default=0,
+        help="benchmark this many synthetic seasons rather than those on file",
+    )
+    args = parser.parse_args()
+
+    if not args.synthetic_seasons and not partitions_on_file("possessions").empty:
+        logger.info(f"Querying possessions on file, {config.read_concurrency} at once")
+        _benchmark()
+        return
+    n_seasons = args.synthetic_seasons or 20
+    with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.object(
+        Config, "local_data_directory", tmp_dir
+    ), mock.patch.object(Config, "possessions_source", LOCAL):
+        logger.info(f"Saving {n_seasons} synthetic seasons of {GAMES_PER_SEASON} games")
+        _save_synthetic_seasons(n_seasons)
+        _benchmark()
+
+
+if __name__ == "__main__":
+    main()
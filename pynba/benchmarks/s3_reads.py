@@ -0,0 +1,92 @@
+"""
+Benchmark of bytes transferred reading a subset of a season of possessions'
+columns from AWS S3, downloading the whole object versus ranged reads
+through S3File, against moto's stand-in for AWS S3. The bytes transferred
+are also the bytes held in memory while parsing, i.e. the downloaded body
+or the S3File's block cache. Peak memory isn't measured directly,
+since moto serves the requests from within the same process.
+"""
+
+import argparse
+import io
+import logging
+import os
+from unittest import mock
+
+import boto3
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from moto import mock_aws
+
+from pynba import aws_s3
+from pynba.benchmarks.timing import best_of
+from pynba.parse_pbpstats_possessions import POSSESSION_COLUMN_DTYPES
+from pynba.halfgames import HALFGAMES_AGGREGATIONS
+
+
+logger = logging.getLogger(__name__)
+
+BUCKET = "pynba-benchmark"
+KEY = "possessions.parquet"
+
+
+def _synthetic_possessions(n_rows):
+    rng = np.random.default_rng(42)
+    return pd.DataFrame(
+        {
+            column: rng.integers(0, 100, n_rows).astype(dtype)
+            for column, dtype in POSSESSION_COLUMN_DTYPES.items()
+        }
+    )
+
+
+def _read_downloaded(columns):
+    body = aws_s3.get_fileobject(BUCKET, KEY).read()
+    return pq.read_table(pa.BufferReader(body), columns=columns), len(body)
+
+
+def _read_ranged(columns):
+    fileobject = aws_s3.S3File(BUCKET, KEY)
+    table = pq.read_table(fileobject, columns=columns, pre_buffer=False)
+    return table, fileobject.bytes_fetched
+
+
+def main():
+    """Compare bytes transferred and time taken by the two ways of reading"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=250_000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        possessions = _synthetic_possessions(args.rows)
+        buffer = io.BytesIO()
+        possessions.to_parquet(buffer, index=False)
+        client.put_object(Bucket=BUCKET, Key=KEY, Body=buffer.getvalue())
+        columns = [
+            column for column in HALFGAMES_AGGREGATIONS if column in possessions
+        ][:5]
+        logger.info(
+            f"Reading {len(columns)} of {possessions.shape[1]} columns "
+            f"from a {len(buffer.getvalue()) / 2**20:.1f} MiB object"
+        )
+        with mock.patch.object(aws_s3, "s3_client", client):
+            for name, read in [
+                ("downloaded", _read_downloaded),
+                ("ranged", _read_ranged),
+            ]:
+                _, n_bytes = read(columns)
+                seconds = best_of(lambda read=read: read(columns))
+                logger.info(
+                    f"{name}: {n_bytes / 2**20:.2f} MiB transferred "
+                    f"in {seconds * 1e3:.0f}ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
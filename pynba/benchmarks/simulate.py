@@ -0,0 +1,45 @@
+"""
+Benchmark of the time to simulate a synthetic 1230 game season many times
+over from a trace of draws around a synthetic season's model's prior means
+"""
+
+import argparse
+import logging
+
+from pynba.simulate import simulate_season
+from pynba.team_stats import TeamsModel
+from pynba.benchmarks.calc_results import _synthetic_trace
+from pynba.benchmarks.likelihood_gradient import _synthetic_halfgames
+from pynba.benchmarks.timing import best_of
+
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Time simulate_season for a season's schedule, none of it played"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seasons", type=int, default=20_000)
+    parser.add_argument("--draws", type=int, default=20_000)
+    parser.add_argument("--chains", type=int, default=4)
+    args = parser.parse_args()
+
+    halfgames = _synthetic_halfgames(1230)
+    teams_model = TeamsModel(halfgames)
+    teams_model._trace = _synthetic_trace(  # pylint: disable=protected-access
+        teams_model.model, args.draws, args.chains
+    )
+    schedule = halfgames[halfgames["off_team_id"] == halfgames["home_team_id"]].rename(
+        columns={"def_team_id": "away_team_id"}
+    )
+    seconds = best_of(
+        lambda: simulate_season(
+            teams_model, schedule, args.seasons, random_seed=42, keep_played=False
+        ),
+        repeat=1,
+    )
+    logger.info(f"{args.seasons} seasons of {len(schedule)} games: {seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Helpers for timing benchmarks"""
+
+import time
+import tracemalloc
+
+
+def best_of(func, repeat=3):
+    """Best wall time of repeat calls to func, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(func):
+    """Peak memory allocated by Python during a call to func, in bytes"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
@@ -1,6 +1,6 @@
 """Config for pynba package"""
 
-from pkg_resources import resource_filename
+from importlib import resources
 
 from dynaconf import Dynaconf
 
@@ -19,15 +19,49 @@ class Config(AbstractConfig):  # pylint: disable=too-few-public-methods
     pbpstats_directory: str
     seasons_directory: str
     possessions_directory: str
+    halfgames_directory: str
     teams_directory: str
+    warm_starts_directory: str
+    traces_directory: str
     plots_directory: str
+    cache_directory: str
+    team_index_cache: bool
     seasons_source: str
     possessions_source: str
+    halfgames_source: str
     teams_source: str
+    teams_csv: bool
+    possessions_workers: int
+    possessions_executor: str
+    possessions_compact_parts: int
+    cpu_budget: int
+    web_concurrency: int
+    read_concurrency: int
+    web_rate_limit: float
+    web_max_retries: int
+    web_retry_budget: int
+    web_backoff_base: float
+    web_backoff_cap: float
+    aws_s3_block_size: int
+    aws_s3_readahead_blocks: int
+    aws_s3_cache_blocks: int
+    aws_s3_upload_concurrency: int
+    aws_s3_multipart_chunksize: int
+    s3_cache: bool
+    s3_cache_max_bytes: int
+    s3_cache_max_age: float
     pymc3_random_seed: int
     pymc3_draws: int
     pymc3_chains: int
     pymc3_init: str
+    pymc3_warm_start: bool
+    pymc3_save_trace: bool
+    pymc3_warm_tune: int
+    pymc3_max_rhat: float
+    pymc3_backend: str
+    pymc3_advi_iterations: int
+    pymc3_collapse_binomials: bool
+    results_quantiles: list
     git_sha: str
 
 
@@ -35,7 +69,7 @@ __settings = Dynaconf(
     envvar_prefix=ENVVAR_PREFIX,
     ignore_unknown_envvars=True,
     environments=True,
-    settings_files=[resource_filename("pynba", "settings.toml")],
+    settings_files=[str(resources.files("pynba").joinpath("settings.toml"))],
 )
 
 config = Config(__settings)
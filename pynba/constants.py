@@ -8,6 +8,14 @@ STATS_NBA = "stats_nba"
 DATA_NBA = "data_nba"
 LOCAL = "local"
 S3 = "s3"
+PROCESS = "process"
+THREAD = "thread"
+EXECUTORS = [PROCESS, THREAD]
+NUTS = "nuts"
+ADVI = "advi"
+FULLRANK_ADVI = "fullrank_advi"
+LAPLACE = "laplace"
+INFERENCE_BACKENDS = [NUTS, ADVI, FULLRANK_ADVI, LAPLACE]
 LEAGUES = [NBA, WNBA]
 MULTIYEAR_LEAGUES = {NBA}
 REGULAR_SEASON = "Regular Season"
@@ -0,0 +1,126 @@
+"""
+Functions to build PyArrow filter expressions, which parquet reads push down
+to their row groups, skipping those whose statistics rule them out,
+and to read parquet files with them
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+# the type parquet stores pandas' datetimes as, which date filters compare
+# dates to as they're stored, since casting the column, even to another
+# timestamp unit, stops row groups being skipped by their statistics
+TIMESTAMP = pa.timestamp("us")
+
+
+def build_filter(
+    game_ids=None, team_ids=None, team_columns=(), date_range=None, periods=None
+):
+    """
+    Builds a filter expression from the conditions given, all of which must hold
+
+    Parameters
+    ----------
+    game_ids : list of str, optional
+        only these games
+    team_ids : list of int, optional
+        only rows where any of the team_columns is one of these teams
+    team_columns : list of str
+        e.g. ["home_team_id", "away_team_id"]
+    date_range : tuple, optional
+        start and end dates, both inclusive, where either can be None,
+        e.g. ("2019-01-01", None)
+    periods : list of int, optional
+        only these periods, e.g. [1, 2] for the first half
+
+    Returns
+    -------
+    pyarrow.dataset.Expression, or None if there are no conditions
+    """
+    conditions = []
+    if game_ids is not None:
+        conditions.append(_isin("game_id", game_ids))
+    if team_ids is not None:
+        conditions.append(_any_of([_isin(column, team_ids) for column in team_columns]))
+    if date_range is not None:
+        start_date, end_date = date_range
+        date = ds.field("date")
+        if start_date is not None:
+            conditions.append(date >= _timestamp(start_date))
+        if end_date is not None:
+            conditions.append(date <= _timestamp(end_date))
+    if periods is not None:
+        conditions.append(_isin("period", periods))
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def read_table(filepath_or_buffer, columns=None, filter_expression=None):
+    """
+    Reads a parquet file into a PyArrow table, pushing a filter down to its
+    row groups, with dates as timestamps. Older files store dates as strings,
+    which a date filter can't compare to its timestamps, so those are read
+    whole, their dates parsed once, and only then filtered.
+
+    Parameters
+    ----------
+    filepath_or_buffer : str or file-like
+        e.g. from pynba.aws_s3.s3_filepath_or_buffer
+    columns : list of str, optional
+        only load these columns
+    filter_expression : pyarrow.dataset.Expression, optional
+        only load rows matching this, e.g. from build_filter
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+    try:
+        table = pq.read_table(
+            filepath_or_buffer,
+            columns=columns,
+            filters=filter_expression,
+            pre_buffer=False,
+        )
+    except pa.ArrowNotImplementedError:
+        # e.g. comparing string dates with timestamps
+        table = _parsed_dates(pq.read_table(filepath_or_buffer, pre_buffer=False))
+        return ds.dataset(table).to_table(columns=columns, filter=filter_expression)
+    return _parsed_dates(table)
+
+
+def _parsed_dates(table):
+    """The table, with string dates, as in older files, parsed into timestamps"""
+    if "date" in table.column_names and pa.types.is_string(
+        table.schema.field("date").type
+    ):
+        table = table.set_column(
+            table.column_names.index("date"), "date", table["date"].cast(TIMESTAMP)
+        )
+    return table
+
+
+def _isin(column, values):
+    values = list(values)
+    if not values:
+        # an empty value set has no type to match the column against
+        return ds.scalar(False)
+    return ds.field(column).isin(values)
+
+
+def _any_of(conditions):
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression | condition
+    return expression
+
+
+def _timestamp(date):
+    return pa.scalar(pd.Timestamp(date), type=TIMESTAMP)
@@ -1,5 +1,9 @@
 """Module for parsing game_ids to get relevant information"""
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
 from pynba.constants import NBA, WNBA
 
 GAME_ID_PREFIXES = {
@@ -12,6 +16,8 @@ SEASON_TYPE_STRS = {
     "5": "Play In",
 }
 STATS_YEAR_CUTOFF = 80
+# game_ids listed in the error for game_ids that can't be parsed
+MAX_REPORTED_GAME_IDS = 20
 
 
 def league_from_game_id(game_id):
@@ -36,3 +42,78 @@ def season_type_from_game_id(game_id):
         return SEASON_TYPE_STRS[game_id[2]]
     except KeyError as exc:
         raise ValueError(f"game_id {game_id} has unrecognized third digit") from exc
+
+
+def parse_game_ids(game_ids):
+    """
+    Derives the league, year & season type of many game_ids at once, e.g. a
+    column of possessions, parsing each distinct game_id once, with
+    vectorized string slicing, rather than calling the functions above for
+    every row
+
+    Parameters
+    ----------
+    game_ids : pd.Series, pa.Array or array-like of str
+
+    Returns
+    -------
+    pd.DataFrame
+        with categorical league & season_type, and int16 year columns,
+        indexed like game_ids if it's a Series
+
+    Raises
+    ------
+    ValueError
+        listing the game_ids that can't be parsed, if any
+    """
+    index = game_ids.index if isinstance(game_ids, pd.Series) else None
+    if isinstance(game_ids, (pa.Array, pa.ChunkedArray)):
+        game_ids = game_ids.to_pandas()
+    codes, uniques = pd.factorize(game_ids)
+    if (codes < 0).any():
+        raise ValueError(f"{(codes < 0).sum()} game_ids are missing")
+    uniques = pd.Series(np.asarray(uniques, dtype=object), dtype="string")
+
+    league_codes = _category_codes(uniques, uniques.str[:2], GAME_ID_PREFIXES, "prefix")
+    season_type_codes = _category_codes(
+        uniques, uniques.str[2], SEASON_TYPE_STRS, "third digit"
+    )
+    year_digits = uniques.str[3:5]
+    _check_game_ids(
+        uniques, ~year_digits.str.fullmatch(r"\d\d").fillna(False), "year digits"
+    )
+    digits = year_digits.astype(int).to_numpy()
+    century = np.where(digits < STATS_YEAR_CUTOFF, 2000, 1900)
+    is_wnba = np.asarray(list(GAME_ID_PREFIXES.values()))[league_codes] == WNBA
+    years = (century + digits + ~is_wnba).astype(np.int16)
+
+    return pd.DataFrame(
+        {
+            "league": pd.Categorical.from_codes(
+                league_codes[codes], categories=list(GAME_ID_PREFIXES.values())
+            ),
+            "year": years[codes],
+            "season_type": pd.Categorical.from_codes(
+                season_type_codes[codes], categories=list(SEASON_TYPE_STRS.values())
+            ),
+        },
+        index=index,
+    )
+
+
+def _category_codes(game_ids, parts, categories, part):
+    """Codes of the categories each part of the game_ids is a key of"""
+    codes = pd.Index(list(categories)).get_indexer(parts.astype(object))
+    _check_game_ids(game_ids, codes < 0, part)
+    return codes
+
+
+def _check_game_ids(game_ids, invalid, part):
+    """Raises a ValueError listing the invalid game_ids, if there are any"""
+    invalid = np.asarray(invalid, dtype=bool)
+    if invalid.any():
+        bad = game_ids[invalid].tolist()
+        listed = ", ".join(bad[:MAX_REPORTED_GAME_IDS])
+        if len(bad) > MAX_REPORTED_GAME_IDS:
+            listed += ", ..."
+        raise ValueError(f"{len(bad)} game_ids have unrecognized {part}: {listed}")
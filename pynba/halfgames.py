@@ -1,27 +1,164 @@
 """Module of functions to load and manipulate halfgames and their stats"""
 
-from pynba.possessions import possessions_from_file
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+
+from pynba.config import config
+from pynba.constants import LOCAL, S3
+from pynba.aws_s3 import s3_filepath_or_buffer
+from pynba.possessions import possessions_from_file, possessions_manifest
+from pynba.schemas import HALFGAMES_SCHEMA, apply_schema
 
 
 __all__ = [
     "halfgames_from_file",
     "halfgames_from_possessions",
+    "save_halfgames",
+    "update_halfgames",
 ]
 
+logger = logging.getLogger(__name__)
+
+HALFGAMES_KEYS = ["game_id", "off_team_id"]
+HALFGAMES_AGGREGATIONS = {
+    "def_team_id": "first",
+    "home_team_id": "first",
+    "league": "first",
+    "year": "first",
+    "season_type": "first",
+    "date": "first",
+    "turnovers": "sum",
+    "threes_attempted": "sum",
+    "threes_made": "sum",
+    "twos_attempted": "sum",
+    "twos_made": "sum",
+    "ft_attempted": "sum",
+    "ft_made": "sum",
+    "off_rebs": "sum",
+    "def_rebs": "sum",
+    "points_scored": "sum",
+    "duration": "sum",
+    "possession_num": "count",
+    "period": "max",
+}
+
+
+def save_halfgames(halfgames):
+    """Saves halfgames data locally, replacing the season's halfgames on file"""
+    league = halfgames["league"].iloc[0]
+    year = halfgames["year"].iloc[0]
+    season_type = halfgames["season_type"].iloc[0]
+
+    halfgames = apply_schema(halfgames, HALFGAMES_SCHEMA)
+    os.makedirs(_halfgames_dir(), exist_ok=True)
+    halfgames.to_parquet(_halfgames_filepath(league, year, season_type), index=False)
+
+
+def update_halfgames(halfgames):
+    """
+    Merges halfgames into their season's halfgames on file, replacing those
+    of the same games, then saves the result locally. So newly played games
+    are the only ones whose possessions need aggregating. Halfgames on file
+    of games no longer in the season's local possessions, e.g. after they
+    were rebuilt without them, are dropped.
+
+    Parameters
+    ----------
+    halfgames : pd.DataFrame
+        halfgames of some games of a season, e.g. from halfgames_from_possessions
+
+    Returns
+    -------
+    pd.DataFrame
+        all the season's halfgames, sorted by game_id and off_team_id
+    """
+    if halfgames.empty:
+        return halfgames
+    league = halfgames["league"].iloc[0]
+    year = halfgames["year"].iloc[0]
+    season_type = halfgames["season_type"].iloc[0]
+    try:
+        earlier_halfgames = halfgames_from_file(league, year, season_type)
+    except FileNotFoundError:
+        pass
+    else:
+        kept = ~earlier_halfgames["game_id"].isin(halfgames["game_id"])
+        try:
+            manifest = possessions_manifest(league, year, season_type, LOCAL)
+        except FileNotFoundError:
+            pass
+        else:
+            kept &= earlier_halfgames["game_id"].isin(manifest["game_id"])
+        halfgames = pd.concat([earlier_halfgames[kept], halfgames], ignore_index=True)
+    halfgames = apply_schema(
+        halfgames.sort_values(by=HALFGAMES_KEYS, ignore_index=True), HALFGAMES_SCHEMA
+    )
+    save_halfgames(halfgames)
+    return halfgames
+
+
+def _halfgames_filename(league, year, season_type):
+    return f"{league}_{year}_{season_type}_halfgames.parquet"
+
+
+def _halfgames_dir():
+    return os.path.join(config.local_data_directory, config.halfgames_directory)
+
+
+def _halfgames_filepath(league, year, season_type):
+    return os.path.join(
+        _halfgames_dir(), _halfgames_filename(league, year, season_type)
+    )
+
 
 def halfgames_from_file(league, year, season_type):
-    """Load NBA halfgame data
+    """Load NBA halfgame data, aggregating the season's possessions
+    if its halfgames haven't been saved
 
     Parameters
     ----------
-    ...
+    league : str
+        e.g. "nba", "wnba"
+    year : int
+        e.g. 2018
+    season_type : str
+        e.g. "Regular Season", "Playoffs"
 
     Returns
     -------
     Pandas DataFrame where each row is a halfgame
     """
-    possessions = possessions_from_file(league, year, season_type)
-    return halfgames_from_possessions(possessions)
+    if config.halfgames_source == LOCAL:
+        filepath = _halfgames_filepath(league, year, season_type)
+        filepath_or_buffer = filepath if os.path.exists(filepath) else None
+    elif config.halfgames_source == S3:
+        filename = _halfgames_filename(league, year, season_type)
+        key = "/".join([config.aws_s3_key_prefix, config.halfgames_directory, filename])
+        try:
+            filepath_or_buffer = s3_filepath_or_buffer(config.aws_s3_bucket, key)
+        except FileNotFoundError:
+            filepath_or_buffer = None
+    else:
+        raise ValueError(
+            f"Incompatible config for halfgames source data: {config.halfgames_source}"
+        )
+    if filepath_or_buffer is None:
+        logger.info(
+            f"No halfgames data on file for the {league} {year} {season_type}, "
+            "so aggregating its possessions"
+        )
+        possessions = possessions_from_file(
+            league,
+            year,
+            season_type,
+            columns=HALFGAMES_KEYS + list(HALFGAMES_AGGREGATIONS),
+        )
+        return halfgames_from_possessions(possessions)
+    halfgames = pd.read_parquet(filepath_or_buffer, pre_buffer=False)
+    return apply_schema(halfgames, HALFGAMES_SCHEMA)
 
 
 def halfgames_from_possessions(possessions):
@@ -30,78 +167,119 @@ def halfgames_from_possessions(possessions):
     into a Pandas DataFrame of games, where each game has an
     entry for home-offense and visitor-offense.
     """
-    # aggregate possessions per game & offense
-    halfgames = possessions.groupby(by=["game_id", "off_team_id"], as_index=False).agg(
-        {
-            "def_team_id": "first",
-            "home_team_id": "first",
-            "league": "first",
-            "year": "first",
-            "season_type": "first",
-            "date": "first",
-            "turnovers": "sum",
-            "threes_attempted": "sum",
-            "threes_made": "sum",
-            "twos_attempted": "sum",
-            "twos_made": "sum",
-            "ft_attempted": "sum",
-            "ft_made": "sum",
-            "off_rebs": "sum",
-            "def_rebs": "sum",
-            "points_scored": "sum",
-            "duration": "sum",
-            "possession_num": "count",
-            "period": "max",
-        }
-    )
+    if possessions.empty:
+        halfgames = _aggregate_with_groupby(possessions)
+    else:
+        halfgames = _aggregate(possessions)
+    halfgames = apply_schema(halfgames, HALFGAMES_SCHEMA)
+    return halfgames.assign(**_rates(halfgames))
 
-    # calculate rate statistics
-    halfgames["three_make_rate"] = (
-        halfgames["threes_made"] / halfgames["threes_attempted"]
-    )
-    halfgames["two_make_rate"] = halfgames["twos_made"] / halfgames["twos_attempted"]
-    halfgames["three_attempt_rate"] = halfgames["threes_attempted"] / (
-        halfgames["twos_attempted"] + halfgames["threes_attempted"]
+
+def _aggregate(possessions):
+    """
+    Aggregates possessions per game & offense in a single pass over NumPy arrays,
+    sorting rows by group once, then reducing each contiguous group of rows.
+    Equivalent to _aggregate_with_groupby, up to the order of rows, which are
+    sorted by game_id, then off_team_id.
+    """
+    game_codes, _ = pd.factorize(possessions["game_id"], sort=True)
+    off_team_ids = possessions["off_team_id"].to_numpy()
+    order = np.lexsort((off_team_ids, game_codes))
+    game_codes = game_codes[order]
+    off_team_ids = off_team_ids[order]
+    is_start = np.ones(len(order), dtype=bool)
+    is_start[1:] = (game_codes[1:] != game_codes[:-1]) | (
+        off_team_ids[1:] != off_team_ids[:-1]
     )
-    halfgames["ft_attempt_rate"] = (
-        halfgames["ft_attempted"] / halfgames["possession_num"]
+    starts = np.flatnonzero(is_start)
+
+    by_function = {}
+    for column, function in HALFGAMES_AGGREGATIONS.items():
+        by_function.setdefault(function, []).append(column)
+    first_rows = order[starts]
+    columns = {
+        column: possessions[column].take(first_rows).array
+        for column in HALFGAMES_KEYS + by_function["first"]
+    }
+    # one reduction over all the counters at once, widened so sums can't overflow
+    counters = [column for column in by_function["sum"] if column != "duration"]
+    sums = np.add.reduceat(
+        possessions[counters].to_numpy(dtype=np.int64)[order], starts, axis=0
     )
-    halfgames["ft_make_rate"] = halfgames["ft_made"] / halfgames["ft_attempted"]
-    halfgames["off_reb_rate"] = halfgames["off_rebs"] / (
-        halfgames["off_rebs"] + halfgames["def_rebs"]
+    columns.update(zip(counters, sums.T))
+    columns["duration"] = np.add.reduceat(
+        possessions["duration"].to_numpy(dtype=np.float64)[order], starts
     )
-    halfgames["turnover_rate"] = halfgames["turnovers"] / halfgames["possession_num"]
-    halfgames["pace"] = halfgames["duration"] / halfgames["possession_num"]
-    halfgames["shots_per_opp"] = (
-        halfgames["threes_attempted"] + halfgames["twos_attempted"]
-    ) / (halfgames["off_rebs"] + halfgames["possession_num"])
-    halfgames["shots_per_poss"] = (
-        halfgames["twos_attempted"] + halfgames["threes_attempted"]
-    ) / halfgames["possession_num"]
-    halfgames["scoring_rate"] = halfgames["points_scored"] / halfgames["possession_num"]
-
-    # estimate scoring rate based on underlying rate statistics
-    halfgames["shots_per_opp_est"] = estimate_shots_per_opp(
-        halfgames["turnover_rate"],
-        halfgames["ft_attempt_rate"],
+    columns["possession_num"] = np.diff(np.append(starts, len(order)))
+    columns["period"] = np.maximum.reduceat(
+        possessions["period"].to_numpy()[order], starts
     )
-    halfgames["shots_per_poss_est"] = estimate_shots_per_poss(
-        halfgames["shots_per_opp_est"],
-        halfgames["three_attempt_rate"],
-        halfgames["three_make_rate"],
-        halfgames["two_make_rate"],
-        halfgames["off_reb_rate"],
+    return pd.DataFrame(
+        {
+            column: columns[column]
+            for column in HALFGAMES_KEYS + list(HALFGAMES_AGGREGATIONS)
+        }
     )
-    halfgames["scoring_rate_est"] = calc_scoring_rate(
-        halfgames["shots_per_poss_est"],
-        halfgames["three_make_rate"],
-        halfgames["two_make_rate"],
-        halfgames["three_attempt_rate"],
-        halfgames["ft_attempt_rate"],
-        halfgames["ft_make_rate"],
+
+
+def _aggregate_with_groupby(possessions):
+    """Aggregates possessions per game & offense with Pandas' groupby"""
+    return possessions.groupby(by=HALFGAMES_KEYS, as_index=False, observed=True).agg(
+        HALFGAMES_AGGREGATIONS
     )
 
-    return halfgames
+
+def _rates(halfgames):
+    """
+    Calculates rate statistics of halfgames, and estimates scoring rate
+    based on them, on NumPy arrays rather than index-aligned Series
+
+    Returns
+    -------
+    dict mapping column name to array
+    """
+    stats = {
+        column: halfgames[column].to_numpy(dtype=np.float64)
+        for column, function in HALFGAMES_AGGREGATIONS.items()
+        if function in ("sum", "count")
+    }
+    possessions = stats["possession_num"]
+    shots = stats["twos_attempted"] + stats["threes_attempted"]
+    # halfgames without e.g. a three attempted have undefined rates, i.e. NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = {
+            "three_make_rate": stats["threes_made"] / stats["threes_attempted"],
+            "two_make_rate": stats["twos_made"] / stats["twos_attempted"],
+            "three_attempt_rate": stats["threes_attempted"] / shots,
+            "ft_attempt_rate": stats["ft_attempted"] / possessions,
+            "ft_make_rate": stats["ft_made"] / stats["ft_attempted"],
+            "off_reb_rate": stats["off_rebs"] / (stats["off_rebs"] + stats["def_rebs"]),
+            "turnover_rate": stats["turnovers"] / possessions,
+            "pace": stats["duration"] / possessions,
+            "shots_per_opp": shots / (stats["off_rebs"] + possessions),
+            "shots_per_poss": shots / possessions,
+            "scoring_rate": stats["points_scored"] / possessions,
+        }
+        rates["shots_per_opp_est"] = estimate_shots_per_opp(
+            rates["turnover_rate"],
+            rates["ft_attempt_rate"],
+        )
+        rates["shots_per_poss_est"] = estimate_shots_per_poss(
+            rates["shots_per_opp_est"],
+            rates["three_attempt_rate"],
+            rates["three_make_rate"],
+            rates["two_make_rate"],
+            rates["off_reb_rate"],
+        )
+        rates["scoring_rate_est"] = calc_scoring_rate(
+            rates["shots_per_poss_est"],
+            rates["three_make_rate"],
+            rates["two_make_rate"],
+            rates["three_attempt_rate"],
+            rates["ft_attempt_rate"],
+            rates["ft_make_rate"],
+        )
+    return rates
 
 
 def estimate_shots_per_opp(turnover_rate, ft_attempt_rate):
@@ -1,10 +1,14 @@
 """Module of functions to load pbpstats data"""
 
+import os
 import logging
+import time
 
 from requests import ReadTimeout, HTTPError
 
+from pynba.config import config
 from pynba.pbpstats_client import pbpstats_client
+from pynba.web_fetch import backoff_delay, fetch_all, game_fetch_requests
 from pynba.game_id import league_from_game_id, year_from_game_id
 from pynba.constants import NBA, WNBA, FILE, WEB, STATS_NBA, DATA_NBA
 
@@ -78,21 +82,19 @@ def load_season_from_web(league, year, season_type):
     pbpstats Season object
     """
     client = pbpstats_client(WEB, LEAGUE_SEASON_PROVIDERS[league])
-    while True:
-        try:
-            season = client.Season(  # pylint: disable=no-member
+    try:
+        season = _retry_timeouts(
+            lambda: client.Season(  # pylint: disable=no-member
                 league, year, season_type
-            )
-        except HTTPError as exc:
-            if exc.response.status_code == 404:
-                raise StatsNotFound(
-                    f"Didn't find data for {league} {year} {season_type}"
-                ) from exc
-            raise exc
-        except ReadTimeout:
-            logger.debug(f"Re-requesting data for {league} {year} {season_type}.")
-        else:
-            break
+            ),
+            f"{league} {year} {season_type}",
+        )
+    except HTTPError as exc:
+        if exc.response.status_code == 404:
+            raise StatsNotFound(
+                f"Didn't find data for {league} {year} {season_type}"
+            ) from exc
+        raise exc
 
     if not season.games.final_games:
         raise StatsNotFound(f"Didn't find data for {league} {year} {season_type}")
@@ -143,19 +145,15 @@ def load_game_from_web(game_id):
     """
     stats_provider = _game_stats_provider(game_id)
     client = pbpstats_client(WEB, stats_provider)
-    while True:
-        try:
-            game = client.Game(game_id)  # pylint: disable=no-member
-        except HTTPError as exc:
-            if exc.response.status_code == 404:
-                raise StatsNotFound(
-                    f"Didn't find data for game with id {game_id}"
-                ) from exc
-            raise exc
-        except ReadTimeout:
-            logger.debug(f"Re-requesting data for game with id {game_id}.")
-        else:
-            break
+    try:
+        game = _retry_timeouts(
+            lambda: client.Game(game_id),  # pylint: disable=no-member
+            f"game with id {game_id}",
+        )
+    except HTTPError as exc:
+        if exc.response.status_code == 404:
+            raise StatsNotFound(f"Didn't find data for game with id {game_id}") from exc
+        raise exc
 
     if not game.possessions.items:
         raise StatsNotFound(f"Game with id {game_id} contains no data.")
@@ -163,6 +161,59 @@ def load_game_from_web(game_id):
     return game
 
 
+def prefetch_games(season, **kwargs):
+    """
+    Downloads the pbpstats data for a season's games from the web concurrently,
+    saving it to the local pbpstats directory so that load_game can load
+    each game from file. Games already on file are skipped.
+
+    Parameters
+    ----------
+    season : pd.DataFrame
+        each row representing a game
+    **kwargs
+        passed along to pynba.web_fetch.fetch_all_async,
+        e.g. concurrency, rate_limit, max_retries, retry_budget
+
+    Returns
+    -------
+    pynba.web_fetch.FetchSummary
+    """
+    directory = os.path.join(config.local_data_directory, config.pbpstats_directory)
+    fetch_requests = [
+        fetch_request
+        for game in season.itertuples()
+        for fetch_request in game_fetch_requests(
+            str(game.game_id),
+            game.home_team_id,
+            game.away_team_id,
+            _game_stats_provider(str(game.game_id)),
+            directory,
+        )
+    ]
+    return fetch_all(fetch_requests, **kwargs)
+
+
+def _retry_timeouts(load, description):
+    """
+    Calls load, retrying with exponential backoff if it times out,
+    up to config.web_max_retries times
+    """
+    attempt = 0
+    while True:
+        try:
+            return load()
+        except ReadTimeout:
+            if attempt >= config.web_max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.debug(
+                f"Re-requesting data for {description} in {delay:.2f} seconds."
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
 def _game_stats_provider(game_id):
     year = year_from_game_id(game_id)
     if year > STATS_NBA_CUTOFF_YEAR:
@@ -3,25 +3,59 @@
 from abc import ABCMeta
 
 
-def _make_property(name, attr_type):
-    return property(
-        lambda self: attr_type(self._settings[name])  # pylint: disable=protected-access
-    )
-
-
 class MetaConfig(ABCMeta):
-    """Metaclass for the Config object"""
+    """
+    Metaclass for the Config object, giving it a slot per annotated field,
+    filled in with the field's value, coerced to its type, by load
+    """
 
     def __new__(cls, name, bases, namespace, **kwargs):
         annotations = namespace.get("__annotations__", {})
-        for attr_name, attr_type in annotations.items():
-            namespace[attr_name] = _make_property(attr_name, attr_type)
-
-        return super().__new__(cls, name, bases, namespace, **kwargs)
+        namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + tuple(
+            annotations
+        )
+        namespace["_fields"] = dict(annotations)
+        new_cls = super().__new__(cls, name, bases, namespace, **kwargs)
+        # the slots' descriptors, to set them even if a test patches the class
+        new_cls._slot_setters = {
+            attr_name: vars(new_cls)[attr_name].__set__ for attr_name in annotations
+        }
+        return new_cls
 
 
 class AbstractConfig(metaclass=MetaConfig):  # pylint: disable=too-few-public-methods
-    """Abstract base class to inherit from for a Config object"""
+    """
+    Abstract base class to inherit from for a Config object, an immutable
+    snapshot of its settings, resolved once rather than on each access,
+    so call reload to pick up changes to them, e.g. environment variables
+    """
+
+    # _settings is set with object.__setattr__, which pylint doesn't follow
+    __slots__ = ("_settings",)
+    # set by MetaConfig for each subclass
+    _fields = {}
+    _slot_setters = {}
 
     def __init__(self, settings):
-        self._settings = settings
+        object.__setattr__(self, "_settings", settings)
+        self.load()
+
+    def load(self):
+        """Resolves each field from the settings, validating its type"""
+        for name, attr_type in self._fields.items():
+            try:
+                value = attr_type(self._settings[name])  # pylint: disable=no-member
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"Invalid config for {name}: {exc}") from exc
+            self._slot_setters[name](self, value)
+
+    def reload(self):
+        """Reloads the settings, e.g. after changing environment variables"""
+        self._settings.reload()  # pylint: disable=no-member
+        self.load()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Can't set {name}, config is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Can't delete {name}, config is immutable")
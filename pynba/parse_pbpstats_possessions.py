@@ -1,8 +1,50 @@
 """Functions to parse pbpstats data"""
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
 from pbpstats.resources.enhanced_pbp import FieldGoal, FreeThrow, Rebound, Turnover
 
 
+PLAYERS_PER_TEAM = 5
+COUNTER_COLUMNS = [
+    "threes_attempted",
+    "threes_made",
+    "twos_attempted",
+    "twos_made",
+    "ft_attempted",
+    "ft_made",
+    "off_rebs",
+    "def_rebs",
+    "turnovers",
+    "points_scored",
+]
+PLAYER_COLUMNS = [
+    f"{side}_player{ind}" for side in ["off", "def"] for ind in range(PLAYERS_PER_TEAM)
+]
+POSSESSION_COLUMN_DTYPES = {
+    "off_team_id": np.int32,
+    "def_team_id": np.int32,
+    "period": np.uint8,
+    "start_time": np.float32,
+    "end_time": np.float32,
+    "start_score_margin": np.int16,
+    "duration": np.float32,
+    **{column: np.int32 for column in PLAYER_COLUMNS},
+    **{column: np.uint8 for column in COUNTER_COLUMNS},
+}
+GAME_COLUMNS = [
+    "game_id",
+    "date",
+    "home_team_id",
+    "away_team_id",
+    "status",
+    "league",
+    "year",
+    "season_type",
+]
+
+
 def parse_possession(possession):
     """
     Parse a possession's worth of pbpstats data
@@ -55,62 +97,197 @@ def parse_events(events):
     -------
     dict
     """
-    subrow = {
-        "threes_attempted": 0,
-        "threes_made": 0,
-        "twos_attempted": 0,
-        "twos_made": 0,
-        "ft_attempted": 0,
-        "ft_made": 0,
-        "off_rebs": 0,
-        "def_rebs": 0,
-        "turnovers": 0,
-        "points_scored": 0,
-    }
+    counts = _count_events(events)
+    return dict(zip(COUNTER_COLUMNS, counts))
+
+
+class PossessionsBuilder:
+    """
+    Parses pbpstats possessions column by column into preallocated,
+    typed NumPy arrays, rather than a dict per possession, then emits
+    the whole lot as one DataFrame or Arrow table. Holds any number of games,
+    e.g. a whole season, with each game's columns (game_id, date, etc.)
+    stored once per game and only broadcast to every possession on output.
+    Players beyond the first five on either team are ignored,
+    while missing players are left null.
+    """
+
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._columns = {
+            column: np.zeros(capacity, dtype=dtype)
+            for column, dtype in POSSESSION_COLUMN_DTYPES.items()
+        }
+        self._missing_players = np.zeros(
+            (capacity, len(PLAYER_COLUMNS)), dtype=np.bool_
+        )
+        self._game_rows = []
+        self._game_values = {column: [] for column in GAME_COLUMNS}
+
+    def __len__(self):
+        return self._size
+
+    def append_game(self, possessions, **game_values):
+        """
+        Parse a game's worth of pbpstats possessions
+
+        Parameters
+        ----------
+        possessions : pbpstats game.possessions.items
+        **game_values
+            values of the GAME_COLUMNS for this game, e.g. game_id, date
+        """
+        start = self._size
+        for possession in possessions:
+            self.append(possession)
+        self._game_rows.append(self._size - start)
+        for column in GAME_COLUMNS:
+            self._game_values[column].append(game_values[column])
+
+    def append(self, possession):
+        """Parse a single pbpstats possession into the next row"""
+        if self._size == len(self._missing_players):
+            self._grow()
+        row = self._size
+        columns = self._columns
+
+        off_team_id = possession.offense_team_id
+        current_players = possession.events[0].current_players
+        for team_id in current_players:
+            if team_id != off_team_id:
+                def_team_id = team_id
+                break
+        columns["off_team_id"][row] = off_team_id
+        columns["def_team_id"][row] = def_team_id
+        columns["period"][row] = possession.period
+        start_time = clock_to_seconds_remaining(possession.start_time)
+        end_time = clock_to_seconds_remaining(possession.end_time)
+        columns["start_time"][row] = start_time
+        columns["end_time"][row] = end_time
+        columns["duration"][row] = start_time - end_time
+        columns["start_score_margin"][row] = possession.start_score_margin
+
+        self._append_players(row, current_players[off_team_id], 0)
+        self._append_players(row, current_players[def_team_id], PLAYERS_PER_TEAM)
+        for column, count in zip(COUNTER_COLUMNS, _count_events(possession.events)):
+            columns[column][row] = count
+
+        self._size += 1
+
+    def _append_players(self, row, players, offset):
+        for ind in range(PLAYERS_PER_TEAM):
+            if ind < len(players):
+                self._columns[PLAYER_COLUMNS[offset + ind]][row] = players[ind]
+            else:
+                self._missing_players[row, offset + ind] = True
+
+    def _grow(self):
+        capacity = max(1, 2 * len(self._missing_players))
+        for column, values in self._columns.items():
+            self._columns[column] = _zero_padded(values, capacity)
+        self._missing_players = _zero_padded(self._missing_players, capacity)
+
+    def _output_columns(self):
+        size = self._size
+        columns = {column: values[:size] for column, values in self._columns.items()}
+        missing_players = self._missing_players[:size]
+        for ind, column in enumerate(PLAYER_COLUMNS):
+            if missing_players[:, ind].any():
+                columns[column] = pd.arrays.IntegerArray(
+                    columns[column], missing_players[:, ind]
+                )
+
+        game_rows = np.array(self._game_rows, dtype=np.int64)
+        if self._game_rows and game_rows.sum() == size:
+            game_starts = np.repeat(np.cumsum(game_rows) - game_rows, game_rows)
+            columns["possession_num"] = np.arange(size) - game_starts
+            for column in GAME_COLUMNS:
+                values = np.empty(len(game_rows), dtype=object)
+                values[:] = self._game_values[column]
+                columns[column] = np.repeat(values, game_rows)
+        return columns
+
+    def to_frame(self):
+        """Emit the parsed possessions as a Pandas DataFrame"""
+        return pd.DataFrame(self._output_columns())
+
+    def to_arrow(self):
+        """Emit the parsed possessions as a PyArrow Table"""
+        return pa.table(self._output_columns())
+
+
+def _zero_padded(values, capacity):
+    padded = np.zeros((capacity,) + values.shape[1:], dtype=values.dtype)
+    padded[: len(values)] = values
+    return padded
+
+
+def _count_events(events):  # pylint: disable=too-many-branches
+    threes_attempted = threes_made = twos_attempted = twos_made = 0
+    ft_attempted = ft_made = off_rebs = def_rebs = turnovers = points_scored = 0
     for event in events:
-        if isinstance(event, FieldGoal):
-            _process_fg(event, subrow)
-        elif isinstance(event, FreeThrow):
-            _process_ft(event, subrow)
-        elif isinstance(event, Rebound):
-            _process_reb(event, subrow)
-        elif isinstance(event, Turnover):
-            _process_to(event, subrow)
-    return subrow
-
-
-def _process_fg(event, subrow):
-    if event.shot_value == 2:
-        subrow["twos_attempted"] += 1
-        if event.is_made:
-            subrow["twos_made"] += 1
-            subrow["points_scored"] += 2
-    else:
-        subrow["threes_attempted"] += 1
-        if event.is_made:
-            subrow["threes_made"] += 1
-            subrow["points_scored"] += 3
-
-
-def _process_ft(event, subrow):
-    if not event.is_technical_ft:
-        subrow["ft_attempted"] += 1
-        if event.is_made:
-            subrow["ft_made"] += 1
-            subrow["points_scored"] += event.shot_value
-
-
-def _process_reb(event, subrow):
-    if event.is_real_rebound:
-        if event.oreb:
-            subrow["off_rebs"] += 1
-        else:
-            subrow["def_rebs"] += 1
-
-
-def _process_to(event, subrow):
-    if not event.is_no_turnover:
-        subrow["turnovers"] += 1
+        kind = _event_kind(type(event))
+        if kind is FieldGoal:
+            if event.shot_value == 2:
+                twos_attempted += 1
+                if event.is_made:
+                    twos_made += 1
+                    points_scored += 2
+            else:
+                threes_attempted += 1
+                if event.is_made:
+                    threes_made += 1
+                    points_scored += 3
+        elif kind is FreeThrow:
+            if not event.is_technical_ft:
+                ft_attempted += 1
+                if event.is_made:
+                    ft_made += 1
+                    points_scored += event.shot_value
+        elif kind is Rebound:
+            if event.is_real_rebound:
+                if event.oreb:
+                    off_rebs += 1
+                else:
+                    def_rebs += 1
+        elif kind is Turnover:
+            if not event.is_no_turnover:
+                turnovers += 1
+    return (
+        threes_attempted,
+        threes_made,
+        twos_attempted,
+        twos_made,
+        ft_attempted,
+        ft_made,
+        off_rebs,
+        def_rebs,
+        turnovers,
+        points_scored,
+    )
+
+
+_EVENT_KINDS = {}
+
+
+def _event_kind(event_cls):
+    """
+    Which of the counted pbpstats event base classes an event class derives from,
+    if any, memoized per class to avoid an isinstance chain for every event
+    """
+    try:
+        return _EVENT_KINDS[event_cls]
+    except KeyError:
+        kind = next(
+            (
+                base
+                for base in (FieldGoal, FreeThrow, Rebound, Turnover)
+                if issubclass(event_cls, base)
+            ),
+            None,
+        )
+        _EVENT_KINDS[event_cls] = kind
+        return kind
 
 
 def clock_to_seconds_remaining(clock_str):
@@ -0,0 +1,397 @@
+"""
+Functions to store datasets as parquet files in hive-style partitions,
+e.g. league=nba/year=2019/season_type=Playoffs, with a manifest of the parts
+(e.g. games) present in each partition and the file each part is in.
+New parts are written to a file per part, so adding a few games leaves
+the rest of the partition untouched, until there are compact_parts of
+those, when the whole partition is rewritten into one compacted file,
+its parts sorted & packed into row groups.
+
+Reading a whole partition from AWS S3 costs a GET per file, and at least
+a block of S3File's per file, so per-part files are kept few: with the
+default 100, a season of possessions costs at most about 100 GETs more
+than compacted, rather than one per game. pynba.benchmarks.partition_reads
+measured a season of 1230 games, reading 5 columns from moto's stand-in
+for S3: 1,231 GETs & 62.8 MiB as per-game files, versus 11 GETs & 2.0 MiB
+compacted, and 4 GETs & 1.6 MiB as the single file of before partitions.
+"""
+
+import os
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from pynba.config import config
+from pynba.constants import LOCAL, S3
+from pynba.aws_s3 import s3_filepath_or_buffer
+from pynba.filters import read_table
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "_manifest.parquet"
+COMPACTED_FILENAME = "_compacted.parquet"
+NUM_ROWS = "num_rows"
+# manifest column of the file each part is in
+FILE = "file"
+# rows per row group of a compacted file, rounded up to whole parts
+COMPACTED_ROW_GROUP_ROWS = 2**16
+
+
+def partition_path(partition_values):
+    """
+    Relative path of a hive-style partition
+
+    Parameters
+    ----------
+    partition_values : dict
+        ordered mapping of partition column to value,
+        e.g. {"league": "nba", "year": 2019}
+
+    Returns
+    -------
+    str
+        e.g. "league=nba/year=2019"
+    """
+    return "/".join(f"{column}={value}" for column, value in partition_values.items())
+
+
+def part_filename(part):
+    """Filename of the parquet file holding a part, e.g. a game"""
+    return f"{part}.parquet"
+
+
+def write_parts(
+    frame,
+    directory,
+    part_column,
+    manifest_columns,
+    *,
+    manifest=None,
+    row_group_column=None,
+    compact_parts=None,
+):
+    """
+    Writes a DataFrame to a local partition directory, one parquet file
+    for each value of part_column, then updates the partition's manifest.
+    Parts already on file are overwritten, while the rest are left alone,
+    unless that would leave compact_parts or more files of single parts,
+    in which case the whole partition is rewritten into one compacted file.
+
+    Parameters
+    ----------
+    frame : pd.DataFrame
+        without any partition columns
+    directory : str
+        local path of the partition
+    part_column : str
+        column identifying each part, e.g. "game_id"
+    manifest_columns : list of str
+        columns, constant within each part, to record in the manifest
+    manifest : pd.DataFrame, optional
+        the partition's current manifest, defaulting to the one on file
+        in directory, if any. Useful when the rest of the partition
+        lives elsewhere, e.g. in AWS S3, though then it's never compacted.
+    row_group_column : str, optional
+        start a new row group within each part's file whenever this column
+        changes value, so filtered reads can skip row groups using their
+        statistics, e.g. "period"
+    compact_parts : int, optional
+        number of files of single parts at which to compact the partition,
+        defaulting to never
+
+    Returns
+    -------
+    pd.DataFrame
+        the updated manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    if manifest is None and os.path.exists(os.path.join(directory, MANIFEST_FILENAME)):
+        manifest = read_manifest(LOCAL, directory)
+    if manifest is None:
+        manifest = pd.DataFrame(columns=manifest_columns + [NUM_ROWS, FILE])
+    else:
+        manifest = manifest.assign(**{FILE: part_files(manifest, part_column)})
+    unchanged = manifest[~manifest[part_column].isin(frame[part_column])]
+    new_manifest = _manifest_entries(frame, part_column, manifest_columns)
+
+    n_part_files = (unchanged[FILE] != COMPACTED_FILENAME).sum() + len(new_manifest)
+    if (
+        compact_parts
+        and n_part_files >= compact_parts
+        and _all_on_file(directory, unchanged)
+    ):
+        _compact(frame, directory, part_column, unchanged)
+        new_manifest[FILE] = COMPACTED_FILENAME
+        unchanged = unchanged.assign(**{FILE: COMPACTED_FILENAME})
+        stale_files = set(manifest[FILE]) - {COMPACTED_FILENAME}
+    else:
+        _write_part_files(frame, directory, part_column, row_group_column)
+        stale_files = set()
+
+    if not unchanged.empty:
+        new_manifest = pd.concat([unchanged, new_manifest], ignore_index=True)
+    manifest = new_manifest.sort_values(by=part_column, ignore_index=True)
+    _write_atomically(
+        pa.Table.from_pandas(manifest, preserve_index=False),
+        os.path.join(directory, MANIFEST_FILENAME),
+    )
+    # removed once the manifest no longer points at them
+    for filename in stale_files:
+        _remove(os.path.join(directory, filename))
+    n_compacted = (manifest[FILE] == COMPACTED_FILENAME).sum()
+    logger.info(
+        f"Wrote {frame[part_column].nunique()} parts to {directory}, "
+        f"which now holds {len(manifest)} parts, {n_compacted} of them compacted"
+    )
+    return manifest
+
+
+def _manifest_entries(frame, part_column, manifest_columns):
+    """Manifest of the parts in frame, each in a file of its own"""
+    entries = []
+    for part, part_frame in frame.groupby(part_column, sort=False, observed=True):
+        entry = part_frame[manifest_columns].iloc[0].to_dict()
+        entry[NUM_ROWS] = len(part_frame)
+        entry[FILE] = part_filename(part)
+        entries.append(entry)
+    return pd.DataFrame(entries, columns=manifest_columns + [NUM_ROWS, FILE])
+
+
+def _write_part_files(frame, directory, part_column, row_group_column):
+    for part, part_frame in frame.groupby(part_column, sort=False, observed=True):
+        table = pa.Table.from_pandas(part_frame, preserve_index=False)
+        _write_atomically(
+            table,
+            os.path.join(directory, part_filename(part)),
+            _row_groups(table, row_group_column),
+        )
+
+
+def part_files(manifest, part_column):
+    """
+    The file each part in a manifest is in, i.e. its own file for manifests
+    from before compaction, which have no FILE column
+    """
+    if FILE in manifest:
+        return manifest[FILE]
+    return manifest[part_column].map(part_filename)
+
+
+def read_manifest(source, location):
+    """
+    Reads the manifest of a partition
+
+    Parameters
+    ----------
+    source : str
+        "local" or "s3"
+    location : str
+        local path, or AWS S3 key prefix, of the partition
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    return _read_file(source, location, MANIFEST_FILENAME).to_pandas()
+
+
+def read_parts(
+    source, location, manifest, part_column, columns=None, filter_expression=None
+):
+    """
+    Reads parts of a partition into a single PyArrow Table
+
+    Parameters
+    ----------
+    source : str
+        "local" or "s3"
+    location : str
+        local path, or AWS S3 key prefix, of the partition
+    manifest : pd.DataFrame
+        rows of the partition's manifest of the parts to read,
+        e.g. those of the games wanted
+    part_column : str
+        column identifying each part, e.g. "game_id"
+    columns : list of str, optional
+        only read these columns
+    filter_expression : pyarrow.dataset.Expression, optional
+        only read rows matching this, skipping row groups where possible
+
+    Returns
+    -------
+    pa.Table
+    """
+    files = part_files(manifest, part_column)
+    compacted = (files == COMPACTED_FILENAME).to_numpy()
+    tables = []
+    if compacted.any():
+        # only the compacted file's parts the manifest says are in it,
+        # since parts written since are in files of their own
+        compacted_filter = ds.field(part_column).isin(
+            manifest.loc[compacted, part_column].tolist()
+        )
+        if filter_expression is not None:
+            compacted_filter = compacted_filter & filter_expression
+        tables.append(
+            _read_file(source, location, COMPACTED_FILENAME, columns, compacted_filter)
+        )
+    if not compacted.all() or not tables:
+        tables.append(
+            _read_part_files(
+                source, location, files[~compacted], columns, filter_expression
+            )
+        )
+    return pa.concat_tables(tables, promote=True)
+
+
+def _read_part_files(source, location, filenames, columns, filter_expression):
+    if source == LOCAL:
+        paths = [os.path.join(location, filename) for filename in filenames]
+        for path in paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No such file {path}")
+        return ds.dataset(paths, format="parquet").to_table(
+            columns=columns, filter=filter_expression
+        )
+    if source == S3:
+        with ThreadPoolExecutor(max_workers=config.web_concurrency) as pool:
+            tables = list(
+                pool.map(
+                    lambda filename: _read_file(
+                        S3, location, filename, columns, filter_expression
+                    ),
+                    filenames,
+                )
+            )
+        return pa.concat_tables(tables)
+    raise ValueError(f"Incompatible source for partitioned data: {source}")
+
+
+def _all_on_file(directory, manifest):
+    return all(
+        os.path.exists(os.path.join(directory, filename))
+        for filename in set(manifest[FILE])
+    )
+
+
+def _compact(frame, directory, part_column, unchanged):
+    """
+    Writes the unchanged parts on file, and those in frame, to one
+    compacted file, sorted by part_column, with whole parts in each row group
+    """
+    new_table = pa.Table.from_pandas(frame, preserve_index=False)
+    tables = [new_table]
+    if not unchanged.empty:
+        table = read_parts(LOCAL, directory, unchanged, part_column).select(
+            new_table.column_names
+        )
+        # e.g. dictionaries' indices, which are int32 once read from file
+        tables = [new_table.cast(table.schema), table]
+    compacted = pa.Table.from_pandas(
+        sort_parts(pa.concat_tables(tables, promote=True).to_pandas(), [part_column]),
+        preserve_index=False,
+    )
+    _write_atomically(
+        compacted,
+        os.path.join(directory, COMPACTED_FILENAME),
+        _packed_row_groups(compacted, part_column, COMPACTED_ROW_GROUP_ROWS),
+    )
+
+
+def sort_parts(frame, by):
+    """
+    Sorts a DataFrame read from parts by columns, sorting categoricals' categories
+    first, since the dictionaries of the files read are combined in the order
+    they're read, e.g. the compacted file's parts before later parts
+    """
+    for column in by:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].cat.reorder_categories(
+                sorted(frame[column].cat.categories)
+            )
+    return frame.sort_values(by=by, kind="stable", ignore_index=True)
+
+
+def add_partition_columns(frame, partition_values):
+    """
+    Adds partition columns, constant across the frame, back to the end of it,
+    with strings as categoricals, rather than a Python object per row
+    """
+    for column, value in partition_values.items():
+        if isinstance(value, str):
+            value = pd.Categorical.from_codes(
+                np.zeros(len(frame), dtype=np.int8), [value]
+            )
+        frame[column] = value
+    return frame
+
+
+def _read_file(source, location, filename, columns=None, filter_expression=None):
+    if source == LOCAL:
+        path = os.path.join(location, filename)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No such file {path}")
+        return read_table(path, columns, filter_expression)
+    if source == S3:
+        key = f"{location}/{filename}"
+        return read_table(
+            s3_filepath_or_buffer(config.aws_s3_bucket, key),
+            columns,
+            filter_expression,
+        )
+    raise ValueError(f"Incompatible source for partitioned data: {source}")
+
+
+def _write_atomically(table, path, row_groups=None):
+    """Writes via a temporary file, so readers never see a partial file"""
+    file_descriptor, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp"
+    )
+    os.close(file_descriptor)
+    try:
+        with pq.ParquetWriter(tmp_path, table.schema, write_statistics=True) as writer:
+            for row_group in row_groups or [table]:
+                writer.write_table(row_group)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _row_groups(table, row_group_column):
+    if row_group_column is None or table.num_rows == 0:
+        return [table]
+    values = table.column(row_group_column).to_numpy()
+    starts = np.flatnonzero(np.concatenate([[True], values[1:] != values[:-1]]))
+    stops = np.append(starts[1:], len(values))
+    return [table.slice(start, stop - start) for start, stop in zip(starts, stops)]
+
+
+def _packed_row_groups(table, part_column, max_rows):
+    """Row groups of consecutive whole parts, each ending once past max_rows"""
+    groups = _row_groups(table, part_column)
+    packed = []
+    start = rows = 0
+    for group in groups:
+        rows += group.num_rows
+        if rows >= max_rows:
+            packed.append(table.slice(start, rows))
+            start += rows
+            rows = 0
+    if rows or not packed:
+        packed.append(table.slice(start, rows))
+    return packed
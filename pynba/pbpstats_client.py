@@ -1,24 +1,78 @@
-"""Function providing pbpstats client"""
+"""Function providing pbpstats clients"""
 
 import os
+import threading
 
+from pbpstats import objects
 from pbpstats.client import Client
 
 from pynba.config import config
 
 
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class IsolatedClient(Client):  # pylint: disable=too-few-public-methods
+    """
+    pbpstats Client that wires its data loaders onto its own subclasses of
+    the pbpstats objects (Game, Season, Day). The stock Client sets them as
+    attributes of the shared classes, so building a web client would switch
+    every file client in the process over to the web.
+    """
+
+    def _load_objects(self):
+        for name, object_cls in objects.__dict__.items():
+            if isinstance(object_cls, type):
+                setattr(
+                    self,
+                    name,
+                    type(name, (object_cls,), {"data_directory": self.data_directory}),
+                )
+
+
 def pbpstats_client(source, provider):
     """
     Function to provide a pbpstats client with the
     appropriate data directory, and configurable source
-    and data provider.
+    and data provider. Clients are built once per process for each
+    source, provider and directory, then reused.
     """
+    directory = os.path.join(config.local_data_directory, config.pbpstats_directory)
+    key = (source, provider, directory)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = _build_client(source, provider, directory)
+    return client
+
+
+def clear_pbpstats_clients():
+    """Drops all cached pbpstats clients, so the next ones are built fresh"""
+    with _clients_lock:
+        _clients.clear()
+
+
+def _build_client(source, provider, directory):
     settings = {
-        "dir": os.path.join(config.local_data_directory, config.pbpstats_directory),
+        "dir": directory,
         "Boxscore": {"source": source, "data_provider": provider},
         "EnhancedPbp": {"source": source, "data_provider": provider},
         "Games": {"source": source, "data_provider": provider},
         "Pbp": {"source": source, "data_provider": provider},
         "Possessions": {"source": source, "data_provider": provider},
     }
-    return Client(settings)
+    return IsolatedClient(settings)
+
+
+def _reset_after_fork():
+    _clients_lock.release()
+    _clients.clear()
+
+
+# the lock is held across forks, so no other thread holds it in the child
+os.register_at_fork(
+    before=_clients_lock.acquire,
+    after_in_parent=_clients_lock.release,
+    after_in_child=_reset_after_fork,
+)
@@ -2,26 +2,36 @@
 
 import os
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import pandas as pd
-from pyarrow import BufferReader
+import pyarrow as pa
 
 from pynba.config import config
-from pynba.parse_pbpstats_possessions import parse_possession
-from pynba import load_pbpstats
-from pynba.constants import LOCAL, S3
-from pynba.aws_s3 import get_fileobject, NoSuchKey
+from pynba.parse_pbpstats_possessions import PossessionsBuilder, GAME_COLUMNS
+from pynba import load_pbpstats, partitions
+from pynba.schemas import POSSESSIONS_SCHEMA, apply_schema, concat_frames
+from pynba.filters import build_filter, read_table
+from pynba.constants import LOCAL, S3, PROCESS, THREAD
+from pynba.aws_s3 import s3_filepath_or_buffer
 
 
 __all__ = [
     "possessions_from_file",
     "possessions_from_game",
     "possessions_from_season",
+    "possessions_manifest",
     "save_possessions",
 ]
 
 logger = logging.getLogger(__name__)
 
+PROGRESS_INTERVAL = 50
+
+
+PARTITION_COLUMNS = ["league", "year", "season_type"]
+MANIFEST_COLUMNS = ["game_id", "date", "home_team_id", "away_team_id"]
+
 
 def _possessions_filename(league, year, season_type):
     return f"{league}_{year}_{season_type}_possessions.parquet"
@@ -34,20 +44,82 @@ def _possessions_filepath(league, year, season_type):
     )
 
 
+def _partition_values(league, year, season_type):
+    return {"league": league, "year": year, "season_type": season_type}
+
+
+def _partition_location(source, league, year, season_type):
+    path = partitions.partition_path(_partition_values(league, year, season_type))
+    if source == LOCAL:
+        return os.path.join(
+            config.local_data_directory, config.possessions_directory, path
+        )
+    if source == S3:
+        return "/".join([config.aws_s3_key_prefix, config.possessions_directory, path])
+    raise ValueError(f"Incompatible config for possessions source data: {source}")
+
+
 def save_possessions(possessions):
     """
-    Saves possessions data
-    in the appropriate place and with proper partitioning
+    Saves possessions data locally, one file per game, in a partition
+    per season alongside a manifest of the games present. Only the games
+    in possessions are written, so saving newly played games leaves
+    the rest of the season on file untouched.
     """
+    if possessions.empty:
+        return
     league = possessions["league"].iloc[0]
     year = possessions["year"].iloc[0]
     season_type = possessions["season_type"].iloc[0]
-    possessions.to_parquet(_possessions_filepath(league, year, season_type))
+    directory = _partition_location(LOCAL, league, year, season_type)
+    try:
+        manifest = partitions.read_manifest(LOCAL, directory)
+    except FileNotFoundError:
+        manifest = _starting_manifest(
+            league, year, season_type, possessions["game_id"].unique()
+        )
+    _write_possessions(possessions, directory, manifest)
+
+
+def _starting_manifest(league, year, season_type, new_game_ids):
+    """
+    Manifest to build on when the local partition has none, i.e. the one in
+    the configured possessions source, or failing that, one made by moving
+    a single file of possessions for the whole season into the partition
+    """
+    if config.possessions_source != LOCAL:
+        try:
+            return possessions_manifest(league, year, season_type)
+        except FileNotFoundError:
+            pass
+    try:
+        legacy_possessions = _legacy_possessions_from_file(league, year, season_type)
+    except FileNotFoundError:
+        return None
+    directory = _partition_location(LOCAL, league, year, season_type)
+    logger.info(f"Moving possessions data from a single file into {directory}")
+    new_games = legacy_possessions["game_id"].isin(new_game_ids)
+    return _write_possessions(legacy_possessions[~new_games], directory, None)
+
+
+def _write_possessions(possessions, directory, manifest):
+    possessions = apply_schema(possessions, POSSESSIONS_SCHEMA).drop(
+        columns=PARTITION_COLUMNS
+    )
+    return partitions.write_parts(
+        possessions,
+        directory,
+        "game_id",
+        MANIFEST_COLUMNS,
+        manifest=manifest,
+        row_group_column="period",
+        compact_parts=config.possessions_compact_parts,
+    )
 
 
-def possessions_from_file(league, year, season_type):
+def possessions_manifest(league, year, season_type, source=None):
     """
-    Loads possessions data from file
+    Loads the manifest of games with possessions data on file
 
     Parameters
     ----------
@@ -57,32 +129,133 @@ def possessions_from_file(league, year, season_type):
         e.g. 2018
     season_type : str
         e.g. "Regular Season", "Playoffs"
+    source : str, optional
+        "local" or "s3", defaulting to config.possessions_source
 
     Returns
     -------
     pd.DataFrame
+        with a row per game, and its number of possessions
     """
-    if config.possessions_source == LOCAL:
-        filepath_or_buffer = pd.read_parquet(
-            _possessions_filepath(league, year, season_type)
+    if source is None:
+        source = config.possessions_source
+    location = _partition_location(source, league, year, season_type)
+    return partitions.read_manifest(source, location)
+
+
+def possessions_from_file(
+    league,
+    year,
+    season_type,
+    *,
+    game_ids=None,
+    columns=None,
+    team_ids=None,
+    date_range=None,
+    periods=None,
+):
+    """
+    Loads possessions data from file, optionally only some columns
+    and possessions, skipping the rest of the data on file where possible
+
+    Parameters
+    ----------
+    league : str
+        e.g. "nba", "wnba"
+    year : int
+        e.g. 2018
+    season_type : str
+        e.g. "Regular Season", "Playoffs"
+    game_ids : list of str, optional
+        only load these games, rather than the whole season
+    columns : list of str, optional
+        only load these columns
+    team_ids : list of int, optional
+        only load games involving these teams
+    date_range : tuple, optional
+        only load games between these start and end dates, both inclusive,
+        where either can be None, e.g. ("2019-01-01", None)
+    periods : list of int, optional
+        only load possessions in these periods
+
+    Returns
+    -------
+    pd.DataFrame
+        sorted by game_id and possession_num
+    """
+    source = config.possessions_source
+    location = _partition_location(source, league, year, season_type)
+    try:
+        manifest = partitions.read_manifest(source, location)
+    except FileNotFoundError:
+        possessions = _legacy_possessions_from_file(
+            league,
+            year,
+            season_type,
+            columns,
+            build_filter(
+                game_ids, team_ids, ["off_team_id", "def_team_id"], date_range, periods
+            ),
         )
+        return apply_schema(possessions, POSSESSIONS_SCHEMA)
+
+    games = _games_in_manifest(manifest, game_ids, team_ids, date_range)
+    if games.empty:
+        # read one game just for its schema
+        games = manifest[:1]
+        periods = []
+    partition_values = _partition_values(league, year, season_type)
+    if columns is not None:
+        partition_values = {
+            column: value
+            for column, value in partition_values.items()
+            if column in columns
+        }
+        columns = [column for column in columns if column not in partition_values]
+    table = partitions.read_parts(
+        source, location, games, "game_id", columns, build_filter(periods=periods)
+    )
+    possessions = partitions.add_partition_columns(table.to_pandas(), partition_values)
+    if "game_id" in possessions and "possession_num" in possessions:
+        possessions = partitions.sort_parts(possessions, ["game_id", "possession_num"])
+    return apply_schema(possessions, POSSESSIONS_SCHEMA)
+
+
+def _games_in_manifest(manifest, game_ids, team_ids, date_range):
+    """
+    Rows of a manifest of the games matching the filters, so files for
+    the rest of the games are never opened
+    """
+    game_filter = build_filter(
+        game_ids, team_ids, ["home_team_id", "away_team_id"], date_range
+    )
+    if game_filter is None:
+        return manifest
+    return (
+        pa.Table.from_pandas(manifest, preserve_index=False)
+        .filter(game_filter)
+        .to_pandas()
+    )
+
+
+def _legacy_possessions_from_file(
+    league, year, season_type, columns=None, filter_expression=None
+):
+    """Loads possessions data from a single file for the whole season"""
+    if config.possessions_source == LOCAL:
+        filepath_or_buffer = _possessions_filepath(league, year, season_type)
     elif config.possessions_source == S3:
         filename = _possessions_filename(league, year, season_type)
         key = "/".join(
             [config.aws_s3_key_prefix, config.possessions_directory, filename]
         )
-        try:
-            fileobject = get_fileobject(config.aws_s3_bucket, key)
-        except NoSuchKey as exc:
-            raise FileNotFoundError(
-                f"No such key {key} in bucket {config.aws_s3_bucket}"
-            ) from exc
-        filepath_or_buffer = BufferReader(fileobject.read())
+        filepath_or_buffer = s3_filepath_or_buffer(config.aws_s3_bucket, key)
     else:
         raise ValueError(
-            f"Incompatible config for possessions source data: {config.seasons_source}"
+            "Incompatible config for possessions source data: "
+            f"{config.possessions_source}"
         )
-    return pd.read_parquet(filepath_or_buffer)
+    return read_table(filepath_or_buffer, columns, filter_expression).to_pandas()
 
 
 def possessions_from_game(game_data):
@@ -98,45 +271,97 @@ def possessions_from_game(game_data):
     -------
     pd.DataFrame
     """
-    game_id = game_data["game_id"]
-    game = load_pbpstats.load_game(str(game_id))
-    possessions_data = pd.DataFrame(
-        parse_possession(possession) for possession in game.possessions.items
+    game = load_pbpstats.load_game(str(game_data["game_id"]))
+    builder = PossessionsBuilder(capacity=len(game.possessions.items))
+    builder.append_game(
+        game.possessions.items,
+        **{column: game_data[column] for column in GAME_COLUMNS},
     )
-    possessions_data["possession_num"] = possessions_data.index
-    possessions_data["game_id"] = game_id
-    possessions_data["date"] = game_data["date"]
-    possessions_data["home_team_id"] = game_data["home_team_id"]
-    possessions_data["away_team_id"] = game_data["away_team_id"]
-    possessions_data["status"] = game_data["status"]
-    possessions_data["league"] = game_data["league"]
-    possessions_data["year"] = game_data["year"]
-    possessions_data["season_type"] = game_data["season_type"]
-    return possessions_data
+    return apply_schema(builder.to_frame(), POSSESSIONS_SCHEMA)
 
 
-def possessions_from_season(season):
+def possessions_from_season(season, workers=None, executor=None):
     """
-    Loads a season's worth of possessions data from pbpstats
+    Loads a season's worth of possessions data from pbpstats,
+    optionally spreading the games across a pool of workers
 
     Parameters
     ----------
     season: pd.DataFrame
         each row representing a game
+    workers: int, optional
+        number of games to parse concurrently, defaulting to
+        config.possessions_workers. 0 uses one worker per cpu,
+        while 1 parses games serially in this process.
+    executor: str, optional
+        "process" or "thread", defaulting to config.possessions_executor
 
     Returns
     -------
     pd.DataFrame
+        sorted by game_id and possession_num
     """
-    raw_possessions = []
-    for game_tuple in season.itertuples():
-        game_data = game_tuple._asdict()
+    if workers is None:
+        workers = config.possessions_workers
+    if executor is None:
+        executor = config.possessions_executor
+    if workers == 0:
+        workers = os.cpu_count()
+
+    games = [game_tuple._asdict() for game_tuple in season.itertuples()]
+    # a PossessionsBuilder per chunk of games, rather than per game, so
+    # there's a frame to concatenate per chunk, not per game
+    chunks = [
+        games[start : start + PROGRESS_INTERVAL]
+        for start in range(0, len(games), PROGRESS_INTERVAL)
+    ]
+    if workers == 1 or len(chunks) <= 1:
+        results = map(_possessions_from_games, chunks)
+        raw_possessions = _collect_possessions(results, chunks, len(games))
+    else:
+        with _game_executor(executor, min(workers, len(chunks))) as pool:
+            results = pool.map(_possessions_from_games, chunks)
+            raw_possessions = _collect_possessions(results, chunks, len(games))
+
+    possessions = partitions.sort_parts(
+        concat_frames(raw_possessions), ["game_id", "possession_num"]
+    )
+    return apply_schema(possessions, POSSESSIONS_SCHEMA)
+
+
+def _game_executor(executor, workers):
+    if executor == PROCESS:
+        return ProcessPoolExecutor(max_workers=workers)
+    if executor == THREAD:
+        return ThreadPoolExecutor(max_workers=workers)
+    raise ValueError(f"Incompatible executor for parsing possessions: {executor}")
+
+
+def _possessions_from_games(games):
+    """
+    Parses a chunk of games' possessions into one PossessionsBuilder,
+    skipping games without stats, so one missing game doesn't sink the rest
+    of the season
+    """
+    builder = PossessionsBuilder()
+    for game_data in games:
         try:
-            raw_possessions.append(possessions_from_game(game_data))
+            game = load_pbpstats.load_game(str(game_data["game_id"]))
         except load_pbpstats.StatsNotFound as exc:
             logger.info(exc.args[0])
+            continue
+        builder.append_game(
+            game.possessions.items,
+            **{column: game_data[column] for column in GAME_COLUMNS},
+        )
+    return apply_schema(builder.to_frame(), POSSESSIONS_SCHEMA)
 
-    return pd.concat(
-        raw_possessions,
-        ignore_index=True,
-    )
+
+def _collect_possessions(results, chunks, n_games):
+    raw_possessions = []
+    n_parsed = 0
+    for possessions, chunk in zip(results, chunks):
+        raw_possessions.append(possessions)
+        n_parsed += len(chunk)
+        logger.info(f"Parsed possessions for {n_parsed} of {n_games} games")
+    return raw_possessions
@@ -0,0 +1,217 @@
+"""
+Functions to query a dataset, e.g. possessions, across many league-seasons
+at once, treating each season's data on file as a hive-style partition,
+e.g. league=nba/year=2019/season_type=Playoffs, and reading the selected
+partitions in parallel into a single DataFrame
+"""
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pynba import partitions
+from pynba.config import config
+from pynba.constants import LOCAL, S3
+from pynba.filters import read_table
+from pynba.aws_s3 import list_objects, s3_filepath_or_buffer
+from pynba.schemas import (
+    HALFGAMES_SCHEMA,
+    POSSESSIONS_SCHEMA,
+    SEASON_SCHEMA,
+    TEAMS_SCHEMA,
+    apply_schema,
+    concat_frames,
+)
+
+
+__all__ = ["partitions_on_file", "query"]
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ["league", "year", "season_type"]
+POSSESSIONS = "possessions"
+SEASONS = "seasons"
+HALFGAMES = "halfgames"
+TEAMS = "teams"
+# each dataset's schema, and the suffix of a season's file of it
+DATASETS = {
+    POSSESSIONS: (POSSESSIONS_SCHEMA, "possessions"),
+    SEASONS: (SEASON_SCHEMA, "games"),
+    HALFGAMES: (HALFGAMES_SCHEMA, "halfgames"),
+    TEAMS: (TEAMS_SCHEMA, "teams"),
+}
+
+
+def partitions_on_file(dataset):
+    """
+    Produces a Pandas DataFrame of the league-seasons a dataset has on file
+
+    Parameters
+    ----------
+    dataset : str
+        "possessions", "seasons", "halfgames" or "teams"
+
+    Returns
+    -------
+    pd.DataFrame
+        with league, year & season_type columns
+    """
+    source, location = _dataset_location(dataset)
+    if source == LOCAL:
+        paths = [
+            os.path.relpath(os.path.join(dirpath, filename), location)
+            for dirpath, _, filenames in os.walk(location)
+            for filename in filenames
+        ]
+        paths = [path.replace(os.sep, "/") for path in paths]
+    else:
+        prefix = f"{location}/"
+        paths = [
+            obj["Key"][len(prefix) :]
+            for obj in list_objects(config.aws_s3_bucket, Prefix=prefix)
+        ]
+    seasons = {
+        season
+        for season in (_parse_season(dataset, path) for path in paths)
+        if season is not None
+    }
+    return pd.DataFrame(
+        sorted(seasons, reverse=True), columns=PARTITION_COLUMNS
+    ).astype({"year": int})
+
+
+def query(
+    dataset,
+    *,
+    leagues=None,
+    years=None,
+    season_types=None,
+    columns=None,
+    filters=None,
+):
+    """
+    Loads a dataset across every league-season on file matching the given
+    leagues, years & season types, reading up to config.read_concurrency
+    seasons at once, pushing column selection and filters down to the
+    parquet reads, e.g. all NBA regular-season possessions since 2001 with
+    query("possessions", leagues="nba", years=range(2001, 2023),
+    season_types="Regular Season")
+
+    Parameters
+    ----------
+    dataset : str
+        "possessions", "seasons", "halfgames" or "teams"
+    leagues : str or list of str, optional
+        e.g. "nba", defaulting to all of them
+    years : int or iterable of int, optional
+        e.g. range(2001, 2023), defaulting to all of them
+    season_types : str or list of str, optional
+        e.g. "Regular Season", defaulting to all of them
+    columns : list of str, optional
+        only load these columns, along with league, year & season_type
+    filters : pyarrow.dataset.Expression, optional
+        only load rows matching this, e.g. from pynba.filters.build_filter,
+        on columns other than league, year & season_type
+
+    Returns
+    -------
+    pd.DataFrame
+        with the seasons' data in the order of partitions_on_file
+    """
+    schema, _ = _dataset_spec(dataset)
+    seasons = partitions_on_file(dataset)
+    for column, values in [
+        ("league", leagues),
+        ("year", years),
+        ("season_type", season_types),
+    ]:
+        if values is not None:
+            if isinstance(values, (str, int, np.integer)):
+                values = [values]
+            seasons = seasons[seasons[column].isin(list(values))]
+    if columns is not None:
+        columns = [column for column in columns if column not in PARTITION_COLUMNS]
+    logger.info(f"Reading {dataset} of {len(seasons)} seasons")
+    with ThreadPoolExecutor(max_workers=config.read_concurrency) as executor:
+        frames = list(
+            executor.map(
+                lambda season: _read_season(dataset, *season, columns, filters),
+                seasons.itertuples(index=False),
+            )
+        )
+    if not frames:
+        return apply_schema(
+            pd.DataFrame(columns=(columns or []) + PARTITION_COLUMNS), schema
+        )
+    # categories differ between seasons, e.g. their game_ids
+    return apply_schema(concat_frames(frames), schema)
+
+
+def _dataset_spec(dataset):
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset {dataset}, expected one of {list(DATASETS)}")
+    return DATASETS[dataset]
+
+
+def _dataset_location(dataset):
+    """The dataset's configured source, and its local path or AWS S3 key prefix"""
+    _dataset_spec(dataset)
+    source = getattr(config, f"{dataset}_source")
+    directory = getattr(config, f"{dataset}_directory")
+    if source == LOCAL:
+        return source, os.path.join(config.local_data_directory, directory)
+    if source == S3:
+        return source, "/".join([config.aws_s3_key_prefix, directory])
+    raise ValueError(f"Incompatible config for {dataset} source data: {source}")
+
+
+def _parse_season(dataset, path):
+    """
+    The (league, year, season_type) of a path within a dataset's directory,
+    i.e. a hive-style partition's manifest, or a season's file,
+    or None for anything else
+    """
+    _, suffix = _dataset_spec(dataset)
+    parts = path.split("/")
+    if parts[-1] == partitions.MANIFEST_FILENAME and len(parts) == 4:
+        values = dict(part.split("=", 1) for part in parts[:3] if "=" in part)
+        if list(values) == PARTITION_COLUMNS:
+            return values["league"], int(values["year"]), values["season_type"]
+    elif len(parts) == 1 and parts[0].endswith(f"_{suffix}.parquet"):
+        league, year, season_type = parts[0].split("_")[:3]
+        return league, int(year), season_type
+    return None
+
+
+def _read_season(  # pylint: disable=too-many-locals
+    dataset, league, year, season_type, columns, filters
+):
+    """A season's data, from its partition if it has one, else its file"""
+    source, location = _dataset_location(dataset)
+    partition_values = dict(zip(PARTITION_COLUMNS, [league, year, season_type]))
+    partition_path = partitions.partition_path(partition_values)
+    if source == LOCAL:
+        partition = os.path.join(location, partition_path)
+    else:
+        partition = "/".join([location, partition_path])
+    try:
+        manifest = partitions.read_manifest(source, partition)
+    except FileNotFoundError:
+        _, suffix = _dataset_spec(dataset)
+        filename = f"{league}_{year}_{season_type}_{suffix}.parquet"
+        if source == LOCAL:
+            filepath_or_buffer = os.path.join(location, filename)
+        else:
+            filepath_or_buffer = s3_filepath_or_buffer(
+                config.aws_s3_bucket, f"{location}/{filename}"
+            )
+        frame = read_table(filepath_or_buffer, columns, filters).to_pandas()
+        return partitions.add_partition_columns(frame, partition_values)
+    # partition columns aren't stored within a partition's files
+    table = partitions.read_parts(
+        source, partition, manifest, "game_id", columns, filters
+    )
+    return partitions.add_partition_columns(table.to_pandas(), partition_values)
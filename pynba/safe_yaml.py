@@ -1,12 +1,14 @@
 """Module for safe, high-performance yaml manipulation"""
 
+import functools
 from collections.abc import Mapping, Iterable
 
 import yaml
-import numpy as np
 
 
 def _np_types():
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
     type_dict = {bool: [], np.integer: [], np.floating: [], np.character: []}
     for value in np.ScalarType:
         for py_type, np_types in type_dict.items():
@@ -18,15 +20,25 @@ def _np_types():
     return type_dict
 
 
-NP_TYPES = _np_types()
 DICT_TYPES = (Mapping,)
 LIST_TYPES = (Iterable,)
-SCALAR_TYPES = {
-    bool: tuple(set(NP_TYPES[bool])),
-    int: tuple(set(NP_TYPES[np.integer])),
-    float: tuple(set(NP_TYPES[np.floating])),
-    str: tuple(set(NP_TYPES[np.character])),
-}
+
+
+@functools.lru_cache(maxsize=None)
+def _scalar_types():
+    """
+    Numpy scalar types of each native type, for dumping them, only importing
+    numpy when dumping, so loading, e.g. logging.yaml on import, doesn't
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    np_types = _np_types()
+    return {
+        bool: tuple(set(np_types[bool])),
+        int: tuple(set(np_types[np.integer])),
+        float: tuple(set(np_types[np.floating])),
+        str: tuple(set(np_types[np.character])),
+    }
 
 
 def load(stream_or_string):
@@ -43,7 +55,7 @@ def dump(data, *args, **kwargs):
 def _convert_to_native_types(data):
     if data is None:
         return data
-    for native_type, subclasses in SCALAR_TYPES.items():
+    for native_type, subclasses in _scalar_types().items():
         if isinstance(data, subclasses):
             return native_type(data)
     if isinstance(data, DICT_TYPES):
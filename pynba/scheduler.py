@@ -0,0 +1,145 @@
+"""
+Module to run a job per season across a pool of processes, e.g. to rebuild
+every season on file, sharing a budget of cpus between concurrent seasons
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pynba.config import config
+from pynba import safe_yaml
+from pynba.possessions import possessions_manifest
+from pynba.seasons import season_from_file
+
+
+logger = logging.getLogger(__name__)
+
+# to estimate the size of seasons without possessions on file
+POSSESSIONS_PER_GAME = 200
+
+
+def season_sizes(season_info):
+    """
+    Number of possessions in each season, i.e. how long jobs for them
+    should take, estimated from their number of games when their
+    possessions aren't on file
+
+    Parameters
+    ----------
+    season_info : pd.DataFrame
+        with league, year & season_type columns, e.g. from seasons_on_file
+
+    Returns
+    -------
+    list of int
+    """
+    sizes = []
+    for league, year, season_type in zip(
+        season_info["league"], season_info["year"], season_info["season_type"]
+    ):
+        try:
+            sizes.append(
+                int(possessions_manifest(league, year, season_type)["num_rows"].sum())
+            )
+        except FileNotFoundError:
+            season = season_from_file(league, year, season_type, columns=["game_id"])
+            sizes.append(POSSESSIONS_PER_GAME * len(season))
+    return sizes
+
+
+def run_seasons(
+    job, season_info, *, cpus_per_season=1, cpu_budget=None, checkpoint=None
+):
+    """
+    Runs a job for each season in a pool of processes, as many at a time as
+    the cpu budget allows, longest first, so the last to finish are short.
+    A season's job failing doesn't stop the others. Seasons done are recorded
+    in a checkpoint file as they finish, and skipped when run again, so an
+    interrupted run picks up where it left off. Once every season is done,
+    the checkpoint file is removed.
+
+    Parameters
+    ----------
+    job : callable
+        taking a season's league, year & season_type, defined at module level,
+        so it can be pickled to send to other processes
+    season_info : pd.DataFrame
+        with league, year & season_type columns, e.g. from seasons_on_file
+    cpus_per_season : int
+        number of cpus each job uses, e.g. pymc3 chains sampled in parallel
+    cpu_budget : int, optional
+        number of cpus to use at most, defaulting to config.cpu_budget,
+        where 0 uses every cpu
+    checkpoint : str, optional
+        path of the checkpoint file, if any
+
+    Returns
+    -------
+    dict
+        mapping (league, year, season_type) to the exception raised,
+        for each season whose job failed
+    """
+    if cpu_budget is None:
+        cpu_budget = config.cpu_budget
+    if cpu_budget == 0:
+        cpu_budget = os.cpu_count()
+    done = _read_checkpoint(checkpoint)
+    seasons = [
+        (size, (league, int(year), season_type))
+        for size, league, year, season_type in zip(
+            season_sizes(season_info),
+            season_info["league"],
+            season_info["year"],
+            season_info["season_type"],
+        )
+        if (league, int(year), season_type) not in done
+    ]
+    seasons.sort(key=lambda size_season: size_season[0], reverse=True)
+    processes = max(1, min(cpu_budget // cpus_per_season, len(seasons)))
+    logger.info(
+        f"Running {len(seasons)} seasons, {len(done)} already done, "
+        f"{processes} at a time"
+    )
+
+    failures = {}
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # the pool starts jobs in the order they're submitted
+        futures = {pool.submit(job, *season): season for _, season in seasons}
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.exception(f"Job for {season} failed")
+                failures[season] = exc
+            else:
+                done.add(season)
+                _write_checkpoint(checkpoint, done)
+    if checkpoint is not None and not failures and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return failures
+
+
+def _read_checkpoint(checkpoint):
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return set()
+    with open(checkpoint, encoding="utf-8") as checkpoint_file:
+        return {tuple(season) for season in safe_yaml.load(checkpoint_file) or []}
+
+
+def _write_checkpoint(checkpoint, done):
+    if checkpoint is None:
+        return
+    os.makedirs(os.path.dirname(checkpoint), exist_ok=True)
+    tmp_checkpoint = f"{checkpoint}.tmp"
+    with open(tmp_checkpoint, "w", encoding="utf-8") as checkpoint_file:
+        safe_yaml.dump(sorted(list(season) for season in done), checkpoint_file)
+    os.replace(tmp_checkpoint, checkpoint)
+
+
+def checkpoint_path(name):
+    """Path of a checkpoint file for run_seasons, in config.cache_directory"""
+    return os.path.join(
+        config.local_data_directory, config.cache_directory, f"{name}_checkpoint.yaml"
+    )
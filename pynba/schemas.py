@@ -0,0 +1,160 @@
+"""
+Declared column dtypes for pynba's DataFrames, applied as they're built,
+and again when they're written to and read from file. Strings repeated
+across rows are categoricals, which parquet stores dictionary encoded,
+while numbers use the narrowest dtype that safely fits them.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pynba.parse_pbpstats_possessions import (
+    COUNTER_COLUMNS,
+    PLAYER_COLUMNS,
+    POSSESSION_COLUMN_DTYPES,
+)
+
+
+__all__ = [
+    "POSSESSIONS_SCHEMA",
+    "SEASON_SCHEMA",
+    "HALFGAMES_SCHEMA",
+    "TEAMS_SCHEMA",
+    "apply_schema",
+]
+
+CATEGORY = "category"
+DATETIME = "datetime64[ns]"
+
+# columns shared by the season, possessions and halfgames of a game
+GAME_SCHEMA = {
+    "date": DATETIME,
+    "home_team_id": "int32",
+    "away_team_id": "int32",
+    "status": CATEGORY,
+    "league": CATEGORY,
+    "year": "int16",
+    "season_type": CATEGORY,
+}
+
+SEASON_SCHEMA = {
+    "game_id": "string",
+    **GAME_SCHEMA,
+}
+
+POSSESSIONS_SCHEMA = {
+    **POSSESSION_COLUMN_DTYPES,
+    # players are nullable, since a few possessions are missing some
+    **{column: "Int32" for column in PLAYER_COLUMNS},
+    "possession_num": "int16",
+    "game_id": CATEGORY,
+    **GAME_SCHEMA,
+}
+
+HALFGAMES_SCHEMA = {
+    "game_id": "string",
+    "off_team_id": "int32",
+    "def_team_id": "int32",
+    **{column: "int16" for column in COUNTER_COLUMNS},
+    "duration": "float64",
+    "possession_num": "int16",
+    "period": "uint8",
+    **GAME_SCHEMA,
+}
+
+# a team's posterior means, in the order TeamsModel's results have them
+TEAMS_STATS_COLUMNS = [
+    "off_three_attempt_rate",
+    "off_two_make_rate",
+    "off_three_make_rate",
+    "off_reb_rate",
+    "off_turnover_rate",
+    "off_ft_attempt_rate",
+    "off_ft_make_rate",
+    "def_three_attempt_rate",
+    "def_two_make_rate",
+    "def_three_make_rate",
+    "def_reb_rate",
+    "def_turnover_rate",
+    "def_ft_attempt_rate",
+    "off_scoring_rate",
+    "def_scoring_rate",
+    "off_scoring_above_average",
+    "def_scoring_above_average",
+    "net_scoring_rate",
+    "off_pace",
+    "def_pace",
+    "off_pace_above_average",
+    "def_pace_above_average",
+    "total_pace",
+    "scoring_margin",
+]
+
+TEAMS_SCHEMA = {
+    "team": CATEGORY,
+    **{column: "float64" for column in TEAMS_STATS_COLUMNS},
+    "league": CATEGORY,
+    "year": "int16",
+    "season_type": CATEGORY,
+}
+
+
+def apply_schema(frame, schema):
+    """
+    Casts a DataFrame's columns to the dtypes declared in a schema
+
+    Parameters
+    ----------
+    frame : pd.DataFrame
+    schema : dict
+        mapping column name to dtype, where columns not in the frame
+        are skipped, while columns not in the schema are left alone
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    columns = {}
+    for column, dtype in schema.items():
+        if column not in frame:
+            continue
+        values = frame[column]
+        if dtype == DATETIME:
+            columns[column] = pd.to_datetime(values)
+        elif dtype == CATEGORY and isinstance(values.dtype, pd.CategoricalDtype):
+            # e.g. after filtering rows, so no unused categories are stored,
+            # checked first, as removing them sorts every row's code
+            codes = values.cat.codes.to_numpy()
+            used = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories))
+            if not used.all():
+                values = values.cat.remove_unused_categories()
+            columns[column] = values
+        else:
+            columns[column] = values.astype(dtype)
+    return frame.assign(**columns)
+
+
+def concat_frames(frames):
+    """
+    Concatenates DataFrames, first giving their categorical columns the union
+    of their categories, as pd.concat turns categoricals that differ into
+    objects, only for apply_schema to factorize them all over again
+
+    Parameters
+    ----------
+    frames : list of pd.DataFrame
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    for column in frames[0].columns:
+        if all(
+            isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames
+        ):
+            categories = pd.Index(
+                np.concatenate([frame[column].cat.categories for frame in frames])
+            ).unique()
+            for frame in frames:
+                frame[column] = frame[column].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
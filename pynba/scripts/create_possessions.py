@@ -3,30 +3,53 @@
 import logging
 
 from pynba import (
+    halfgames_from_possessions,
     possessions_from_season,
     save_possessions,
     seasons_on_file,
     season_from_file,
+    update_halfgames,
 )
+from pynba.config import config
+from pynba.scheduler import run_seasons, checkpoint_path
 
 
 logger = logging.getLogger(__name__)
 
 
+def create_possessions(league, year, season_type):
+    """
+    Load possessions from pbpstats for a season on file, and store them,
+    along with the halfgames aggregated from them
+    """
+    logger.info(f"Loading season data for {league} {year} {season_type} from file")
+    season = season_from_file(league, year, season_type)
+    logger.info(
+        f"Parsing possessions data for {league} {year} {season_type} from pbpstats"
+    )
+    possessions = possessions_from_season(season, workers=_workers_per_season())
+    logger.info(f"Saving possessions data for {league} {year} {season_type}")
+    save_possessions(possessions)
+    # halfgames on file are aggregated from possessions, so would be stale
+    logger.info(f"Updating halfgames data for {league} {year} {season_type}")
+    update_halfgames(halfgames_from_possessions(possessions))
+
+
+def _workers_per_season():
+    # seasons run concurrently, so by default each parses its games serially
+    return config.possessions_workers or 1
+
+
 def main():
     """Load possessions from pbpstats for all seasons on file, and store them"""
-    season_info = seasons_on_file()
-    for league, year, season_type in zip(
-        season_info["league"], season_info["year"], season_info["season_type"]
-    ):
-        logger.info(f"Loading season data for {league} {year} {season_type} from file")
-        season = season_from_file(league, year, season_type)
-        logger.info(
-            f"Parsing possessions data for {league} {year} {season_type} from pbpstats"
-        )
-        possessions = possessions_from_season(season)
-        logger.info(f"Saving possessions data for {league} {year} {season_type}")
-        save_possessions(possessions)
+    failures = run_seasons(
+        create_possessions,
+        seasons_on_file(),
+        cpus_per_season=_workers_per_season(),
+        checkpoint=checkpoint_path("create_possessions"),
+    )
+    if failures:
+        raise RuntimeError(f"Failed to create possessions for {list(failures)}")
     logger.info("Complete")
 
 
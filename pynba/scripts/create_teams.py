@@ -5,34 +5,46 @@ import logging
 from pynba import (
     seasons_on_file,
     halfgames_from_file,
+    save_halfgames,
     teams_from_halfgames,
     save_teams,
     save_stats_plot,
 )
+from pynba.config import config
+from pynba.scheduler import run_seasons, checkpoint_path
 
 
 logger = logging.getLogger(__name__)
 
 
+def create_teams(league, year, season_type):
+    """Calculate and save teams data for a season on file"""
+    logger.info(f"Loading halfgame data for {league} {year} {season_type} from file")
+    halfgames = halfgames_from_file(league, year, season_type)
+    logger.info(f"Saving halfgame data for {league} {year} {season_type}")
+    save_halfgames(halfgames)
+    logger.info(
+        f"Calculating team statistics for {league} {year} {season_type} from halfgames"
+    )
+    teams = teams_from_halfgames(halfgames)
+    logger.info(f"Saving teams data for {league} {year} {season_type}")
+    save_teams(teams)
+    logger.info("Plotting & saving team ratings & pace")
+    save_stats_plot(teams)
+
+
 def main():
     """Calculate and save teams data for all seasons on file"""
     logger.info("Loading seasons on file")
-    season_info = seasons_on_file()
-    for league, year, season_type in zip(
-        season_info["league"], season_info["year"], season_info["season_type"]
-    ):
-        logger.info(
-            f"Loading halfgame data for {league} {year} {season_type} from file"
-        )
-        halfgames = halfgames_from_file(league, year, season_type)
-        logger.info(
-            f"Calculating team statistics for {league} {year} {season_type} from halfgames"
-        )
-        teams = teams_from_halfgames(halfgames)
-        logger.info(f"Saving teams data for {league} {year} {season_type}")
-        save_teams(teams)
-        logger.info("Plotting & saving team ratings & pace")
-        save_stats_plot(teams)
+    failures = run_seasons(
+        create_teams,
+        seasons_on_file(),
+        # each season samples its chains in parallel
+        cpus_per_season=config.pymc3_chains,
+        checkpoint=checkpoint_path("create_teams"),
+    )
+    if failures:
+        raise RuntimeError(f"Failed to create teams for {list(failures)}")
     logger.info("Complete")
 
 
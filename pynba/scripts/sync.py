@@ -1,8 +1,8 @@
 """Script to sync data directory to s3"""
 
 import logging
-import subprocess
 
+from pynba.aws_s3 import sync_directory
 from pynba.config import config
 
 
@@ -10,24 +10,21 @@ logger = logging.getLogger(__name__)
 
 
 def main():
-    """Syncs local data directory to s3"""
+    """Syncs local data directory to s3, only uploading changed files"""
     source = config.local_data_directory
     dest = f"s3://{config.aws_s3_bucket}/{config.aws_s3_key_prefix}"
-    logger.info(f"Copying local data directory {source} to {dest}")
-    subprocess.run(
-        [
-            "aws",
-            "s3",
-            "cp",
-            source,
-            dest,
-            "--recursive",
-            "--exclude",
+    logger.info(f"Syncing local data directory {source} to {dest}")
+    sync_directory(
+        source,
+        config.aws_s3_bucket,
+        config.aws_s3_key_prefix,
+        exclude=[
             "*.gitignore",
-            "--exclude",
             "*.DS_Store",
+            f"{config.cache_directory}/*",
+            # posterior draws are large, and rewritten by every fit
+            f"{config.traces_directory}/*",
         ],
-        check=True,
     )
     logger.info("Sync complete!")
 
@@ -5,16 +5,14 @@ import os
 import datetime
 import time
 
-import pandas as pd
-
 from pynba import (
     season_from_file,
     season_from_pbpstats,
     save_season,
-    possessions_from_file,
     possessions_from_season,
     save_possessions,
     halfgames_from_possessions,
+    update_halfgames,
     teams_from_halfgames,
     save_teams,
     save_stats_plot,
@@ -22,7 +20,7 @@ from pynba import (
 from pynba.config import config
 from pynba.constants import NBA, WNBA, MULTIYEAR_LEAGUES, SEASON_TYPES
 from pynba import safe_yaml
-from pynba.load_pbpstats import StatsNotFound
+from pynba.load_pbpstats import StatsNotFound, prefetch_games
 
 
 logger = logging.getLogger(__name__)
@@ -35,13 +33,16 @@ def update_season(league, year, season_type):
         2) Loads season data from file.
         3) If there are no missing games, quits.
         4) Saves updated season data to file.
-        5) Loads possession data for the missing games from pbpstats.
-        6) Loads possessions data from earlier games from file.
-        7) Saves the combined possession data to file.
-        8) Calculates halfgame data from the possessions.
-        9) Calculates team data from the joined halfgame data.
-        10) Saves updated team data to file.
-        11) Saves updated team plots to file.
+        5) Prefetches pbpstats data for the missing games concurrently,
+           then loads their possession data from pbpstats.
+        6) Saves the missing games' possession data to file, leaving
+           the files for earlier games untouched.
+        7) Calculates halfgame data for the missing games from their
+           possessions, then merges it into the halfgame data on file,
+           saving the result.
+        8) Calculates team data from the updated halfgame data.
+        9) Saves updated team data to file.
+        10) Saves updated team plots to file.
     """
     logger.info(
         f"Loading season data for the {league} {year} {season_type} from pbpstats"
@@ -77,28 +78,21 @@ def update_season(league, year, season_type):
     )
     filt = updated_season["game_id"].map(lambda game_id: game_id in missing_games)
     missing_season = updated_season[filt]
+    fetch_summary = prefetch_games(missing_season)
+    logger.info(f"Prefetched pbpstats data: {fetch_summary}")
     missing_possessions = possessions_from_season(missing_season)
 
-    try:
-        earlier_possessions = possessions_from_file(league, year, season_type)
-    except FileNotFoundError:
-        if missing_games != set(updated_season["game_id"]):
-            raise
-        logger.info(
-            f"No possessions data for the {league} {year} {season_type} found from file, "
-            "but this is alright since saved season contained no games."
-        )
-        updated_possessions = missing_possessions
-    else:
-        updated_possessions = pd.concat(
-            [earlier_possessions, missing_possessions], ignore_index=True
-        )
-
-    logger.info(f"Saving possessions data for the {league} {year} {season_type}")
-    save_possessions(updated_possessions)
+    logger.info(
+        f"Saving possessions data for {len(missing_games)} missing games "
+        f"for the {league} {year} {season_type}"
+    )
+    save_possessions(missing_possessions)
 
-    logger.info("Calculating halfgames data " f"for the {league} {year} {season_type}")
-    halfgames = halfgames_from_possessions(updated_possessions)
+    logger.info(
+        f"Calculating halfgames data for {len(missing_games)} missing games "
+        f"for the {league} {year} {season_type}, and merging them into those on file"
+    )
+    halfgames = update_halfgames(halfgames_from_possessions(missing_possessions))
 
     logger.info(
         "Calculating team statistics "
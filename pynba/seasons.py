@@ -4,12 +4,12 @@ import os
 import logging
 
 import pandas as pd
-from pyarrow import BufferReader
 
 from pynba.config import config
 from pynba.constants import WNBA, LOCAL, S3
-from pynba import load_pbpstats
-from pynba.aws_s3 import list_objects, get_fileobject, NoSuchKey
+from pynba.aws_s3 import list_objects, s3_filepath_or_buffer
+from pynba.schemas import SEASON_SCHEMA, apply_schema
+from pynba.filters import build_filter, read_table
 
 
 __all__ = [
@@ -28,6 +28,7 @@ def save_season(season):
     year = season["year"].iloc[0]
     season_type = season["season_type"].iloc[0]
 
+    season = apply_schema(season, SEASON_SCHEMA)
     season.to_parquet(_season_filepath(league, year, season_type))
 
 
@@ -68,9 +69,18 @@ def seasons_on_file():
     ).sort_values(by=["league", "year", "season_type"], ascending=False)
 
 
-def season_from_file(league, year, season_type):
+def season_from_file(
+    league,
+    year,
+    season_type,
+    *,
+    game_ids=None,
+    columns=None,
+    team_ids=None,
+    date_range=None,
+):
     """
-    Loads season data from file
+    Loads season data from file, optionally only some columns and games
 
     Parameters
     ----------
@@ -80,6 +90,15 @@ def season_from_file(league, year, season_type):
         e.g. 2018
     season_type : str
         e.g. "Regular Season", "Playoffs"
+    game_ids : list of str, optional
+        only load these games
+    columns : list of str, optional
+        only load these columns
+    team_ids : list of int, optional
+        only load games involving these teams
+    date_range : tuple, optional
+        only load games between these start and end dates, both inclusive,
+        where either can be None, e.g. ("2019-01-01", None)
 
     Returns
     -------
@@ -90,18 +109,16 @@ def season_from_file(league, year, season_type):
     elif config.seasons_source == S3:
         filename = _season_filename(league, year, season_type)
         key = "/".join([config.aws_s3_key_prefix, config.seasons_directory, filename])
-        try:
-            fileobject = get_fileobject(config.aws_s3_bucket, key)
-        except NoSuchKey as exc:
-            raise FileNotFoundError(
-                f"No such key {key} in bucket {config.aws_s3_bucket}"
-            ) from exc
-        filepath_or_buffer = BufferReader(fileobject.read())
+        filepath_or_buffer = s3_filepath_or_buffer(config.aws_s3_bucket, key)
     else:
         raise ValueError(
             f"Incompatible config for season source data: {config.seasons_source}"
         )
-    return pd.read_parquet(filepath_or_buffer)
+    filter_expression = build_filter(
+        game_ids, team_ids, ["home_team_id", "away_team_id"], date_range
+    )
+    season = read_table(filepath_or_buffer, columns, filter_expression).to_pandas()
+    return apply_schema(season, SEASON_SCHEMA)
 
 
 def season_from_pbpstats(league, year, season_type):
@@ -121,6 +138,9 @@ def season_from_pbpstats(league, year, season_type):
     -------
     pd.DataFrame
     """
+    # pbpstats & requests are only needed here, so aren't imported with pynba
+    from pynba import load_pbpstats  # pylint: disable=import-outside-toplevel
+
     pbpstats_year = _parse_year(year, league)
     pbpstats_season = load_pbpstats.load_season_from_web(
         league, pbpstats_year, season_type
@@ -133,7 +153,7 @@ def season_from_pbpstats(league, year, season_type):
         season.rename(
             columns={"visitor_team_id": "away_team_id"}, copy=False, inplace=True
         )
-    return season
+    return apply_schema(season, SEASON_SCHEMA)
 
 
 def _parse_year(year, league):
@@ -0,0 +1,328 @@
+"""Functions to simulate games & seasons from a fitted TeamsModel's posterior"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from pynba.halfgames import (
+    estimate_shots_per_opp,
+    estimate_shots_per_poss,
+)
+from pynba.stats import log5
+
+
+__all__ = ["simulate_season"]
+
+logger = logging.getLogger(__name__)
+
+# simulated seasons per block, so each block's (games x seasons) arrays stay small
+SIMULATION_BLOCK_SEASONS = 1000
+# seconds in regulation, shared between both teams' possessions
+REGULATION_SECONDS = 12 * 4 * 60
+# rates with a home & away adjustment, i.e. a home_{rate} variable
+HOME_RATES = [
+    "three_make_rate",
+    "two_make_rate",
+    "off_reb_rate",
+    "turnover_rate",
+    "ft_attempt_rate",
+    "ft_make_rate",
+]
+
+
+def simulate_season(  # pylint: disable=too-many-locals
+    teams_model,
+    schedule,
+    n_seasons=10000,
+    *,
+    random_seed=None,
+    conferences=None,
+    playoff_spots=None,
+    keep_played=True,
+):
+    """
+    Simulates a schedule of games many times over from a fitted TeamsModel's
+    posterior, each simulated season using one posterior draw, so results
+    account for uncertainty in the teams' rates as well as in each game.
+    Each game's possessions come from both offenses' pace, then each side's
+    free throws, shots, threes and makes are drawn from its rates, estimated
+    like the model does, i.e. with log5 of the offense, defense & home team.
+    Games tied after regulation are a coin flip. All the simulated seasons'
+    games are drawn together, as (games x seasons) arrays, in blocks of
+    SIMULATION_BLOCK_SEASONS seasons.
+
+    Parameters
+    ----------
+    teams_model : TeamsModel
+        fitted, or with a loaded trace, for the season of the schedule
+    schedule : pd.DataFrame
+        with game_id, home_team_id & away_team_id columns, e.g. the season's
+        played games plus those still to play. season_from_pbpstats only
+        has games already played, so simulating its schedule needs
+        keep_played=False, or every game keeps its actual result
+    n_seasons : int, optional
+        number of seasons to simulate
+    random_seed : int, optional
+        seed for the simulation's random number generator
+    conferences : dict, optional
+        mapping each conference's name to its teams' abbreviations,
+        whose standings are ranked separately for playoff spots,
+        defaulting to the whole league
+    playoff_spots : int, optional
+        number of teams in each conference making the playoffs,
+        defaulting to half of them, with ties broken at random
+    keep_played : bool, optional
+        whether games of the schedule the model was fit on keep their
+        actual result rather than being simulated
+
+    Returns
+    -------
+    games : pd.DataFrame
+        the schedule's games, with each team's mean points and the home
+        team's probability of winning
+    standings : pd.DataFrame
+        each team's mean wins and losses, and the probability they make
+        the playoffs, sorted by mean wins
+    """
+    rng = np.random.default_rng(random_seed)
+    home_inds = schedule["home_team_id"].map(teams_model.team_id_to_team_ind)
+    away_inds = schedule["away_team_id"].map(teams_model.team_id_to_team_ind)
+    if home_inds.isna().any() or away_inds.isna().any():
+        raise ValueError("Schedule has teams the model wasn't fit on")
+    home_inds = home_inds.to_numpy(dtype=np.int64)
+    away_inds = away_inds.to_numpy(dtype=np.int64)
+    played_home_wins = _played_home_wins(teams_model, schedule, keep_played)
+    played = ~np.isnan(played_home_wins)
+
+    simulated = _simulate_schedule(
+        teams_model, home_inds[~played], away_inds[~played], n_seasons, rng
+    )
+    # games played count for every simulated season
+    team_wins = simulated["team_wins"] + np.bincount(
+        np.concatenate(
+            [home_inds[played_home_wins == 1], away_inds[played_home_wins == 0]]
+        ),
+        minlength=teams_model.n_teams,
+    ).reshape(-1, 1)
+
+    games = schedule[["game_id", "home_team_id", "away_team_id"]].copy()
+    games["home_team"] = [teams_model.team_ind_to_team_abb[ind] for ind in home_inds]
+    games["away_team"] = [teams_model.team_ind_to_team_abb[ind] for ind in away_inds]
+    games["played"] = played
+    for column, played_values in [
+        ("home_win_probability", played_home_wins),
+        ("home_points", np.nan),
+        ("away_points", np.nan),
+    ]:
+        games[column] = played_values
+        games.loc[~played, column] = simulated[column]
+
+    teams = [teams_model.team_ind_to_team_abb[ind] for ind in range(len(team_wins))]
+    team_games = np.bincount(
+        np.concatenate([home_inds, away_inds]), minlength=len(teams)
+    )
+    standings = pd.DataFrame(
+        {
+            "team": teams,
+            "wins": team_wins.mean(axis=1),
+            "losses": team_games - team_wins.mean(axis=1),
+            "playoff_odds": _playoff_odds(
+                team_wins, teams, conferences, playoff_spots, rng
+            ),
+        }
+    ).sort_values("wins", ascending=False, ignore_index=True)
+    standings.loc[:, "league"] = teams_model.league
+    standings.loc[:, "year"] = teams_model.year
+    standings.loc[:, "season_type"] = teams_model.season_type
+    return games, standings
+
+
+def _simulate_schedule(  # pylint: disable=too-many-locals
+    teams_model, home_inds, away_inds, n_seasons, rng
+):
+    """
+    Simulates games n_seasons times over, a block of seasons at a time,
+    returning each game's home_win_probability, mean home_points &
+    away_points, and each team's team_wins, a (teams x seasons) array
+    """
+    draws = _posterior_draws(teams_model)
+    # each season uses a different draw, cycling through them if need be
+    draw_inds = rng.permutation(np.resize(np.arange(len(draws["off_pace"])), n_seasons))
+    home_games = _team_games(home_inds, teams_model.n_teams)
+    away_games = _team_games(away_inds, teams_model.n_teams)
+    totals = {
+        "home_win_probability": np.zeros(len(home_inds)),
+        "home_points": np.zeros(len(home_inds)),
+        "away_points": np.zeros(len(home_inds)),
+    }
+    team_wins = np.zeros((teams_model.n_teams, n_seasons))
+    for start in range(0, n_seasons, SIMULATION_BLOCK_SEASONS):
+        block = slice(start, start + SIMULATION_BLOCK_SEASONS)
+        home_points, away_points = _simulate_games(
+            teams_model,
+            {name: values[draw_inds[block]] for name, values in draws.items()},
+            home_inds,
+            away_inds,
+            rng,
+        )
+        home_wins = home_points > away_points
+        ties = home_points == away_points
+        home_wins[ties] = rng.random(ties.sum()) < 0.5
+        totals["home_win_probability"] += home_wins.sum(axis=1)
+        totals["home_points"] += home_points.sum(axis=1)
+        totals["away_points"] += away_points.sum(axis=1)
+        team_wins[:, block] = home_games @ home_wins + away_games @ ~home_wins
+    return {
+        **{name: total / n_seasons for name, total in totals.items()},
+        "team_wins": team_wins,
+    }
+
+
+def _team_games(team_inds, n_teams):
+    """(teams x games) indicator of each game's team, to sum games by team"""
+    team_games = np.zeros((n_teams, len(team_inds)))
+    team_games[team_inds, np.arange(len(team_inds))] = 1
+    return team_games
+
+
+def _posterior_draws(teams_model):
+    """
+    Draws of the variables the simulation needs, each read from the trace
+    once, since reading a MultiTrace's variable concatenates its chains
+    """
+    names = (
+        [f"{side}_{rate}" for rate in HOME_RATES for side in ["off", "def"]]
+        + [f"home_{rate}" for rate in HOME_RATES]
+        + [
+            "off_three_attempt_rate",
+            "def_three_attempt_rate",
+            "off_pace",
+            "def_pace",
+            "sigma_ft_attempt_rate",
+            "sigma_pace",
+        ]
+    )
+    return {
+        name: np.asarray(teams_model.trace[name])
+        for name in names
+        # defenses don't affect free throw make rates
+        if name != "def_ft_make_rate"
+    }
+
+
+def _simulate_games(teams_model, draws, home_inds, away_inds, rng):
+    """
+    Points scored by the home & away teams of each game, as
+    (games x draws) arrays, with a draw of the posterior per column
+    """
+    sides = [(0, home_inds, away_inds), (1, away_inds, home_inds)]
+    # each offense's seconds per possession, with the model's noise per game
+    paces = []
+    for _, off_inds, def_inds in sides:
+        pace = _halfgame_rate(teams_model.mu_pace, draws, "pace", off_inds, def_inds)
+        paces.append(
+            rng.gamma(
+                (pace / draws["sigma_pace"]) ** 2, draws["sigma_pace"] ** 2 / pace
+            )
+        )
+    possessions = np.rint(REGULATION_SECONDS / sum(paces)).astype(np.int64)
+    return tuple(
+        _simulate_points(
+            teams_model, draws, off_inds, def_inds, is_away, possessions, rng
+        )
+        for is_away, off_inds, def_inds in sides
+    )
+
+
+def _simulate_points(teams_model, draws, off_inds, def_inds, is_away, possessions, rng):
+    """Points scored by an offense over its possessions, as a (games x draws) array"""
+    rates = {}
+    for rate in HOME_RATES + ["three_attempt_rate"]:
+        rates[rate] = _halfgame_rate(
+            getattr(teams_model, f"mu_{rate}"),
+            draws,
+            rate,
+            off_inds,
+            None if rate == "ft_make_rate" else def_inds,
+            is_away if rate in HOME_RATES else None,
+        )
+    ft_attempt_rate = np.maximum(
+        rng.normal(rates["ft_attempt_rate"], draws["sigma_ft_attempt_rate"]), 0
+    )
+    shots_per_poss = estimate_shots_per_poss(
+        estimate_shots_per_opp(rates["turnover_rate"], ft_attempt_rate),
+        rates["three_attempt_rate"],
+        rates["three_make_rate"],
+        rates["two_make_rate"],
+        rates["off_reb_rate"],
+    )
+    ft_made = rng.binomial(
+        np.rint(possessions * ft_attempt_rate).astype(np.int64),
+        rates["ft_make_rate"],
+    )
+    shots = rng.poisson(possessions * shots_per_poss)
+    threes = rng.binomial(shots, rates["three_attempt_rate"])
+    return (
+        3 * rng.binomial(threes, rates["three_make_rate"])
+        + 2 * rng.binomial(shots - threes, rates["two_make_rate"])
+        + ft_made
+    )
+
+
+def _halfgame_rate(mean, draws, rate, off_inds, def_inds=None, is_away=None):
+    """
+    A rate of the offenses against the defenses, as a (games x draws) array,
+    from log5 of the offenses', defenses' (if def_inds isn't None)
+    and home or away (if is_away isn't None) rates
+    """
+    args = [draws[f"off_{rate}"][:, off_inds].T]
+    if def_inds is not None:
+        args.append(draws[f"def_{rate}"][:, def_inds].T)
+    if is_away is not None:
+        home_rate = draws[f"home_{rate}"]
+        args.append(2 * mean - home_rate if is_away else home_rate)
+    return log5(mean, *args)
+
+
+def _played_home_wins(teams_model, schedule, keep_played):
+    """
+    1 or 0 for each game of the schedule the model was fit on, if the home
+    team won or lost, otherwise NaN, i.e. all NaN unless keep_played
+    """
+    played_home_wins = np.full(len(schedule), np.nan)
+    if not keep_played:
+        return played_home_wins
+    halfgames = teams_model.halfgames
+    is_home = halfgames["off_team_id"] == halfgames["home_team_id"]
+    points = pd.DataFrame(
+        {
+            "home_points": halfgames[is_home].groupby("game_id")["points_scored"].sum(),
+            "away_points": halfgames[~is_home]
+            .groupby("game_id")["points_scored"]
+            .sum(),
+        }
+    ).reindex(schedule["game_id"].to_numpy())
+    home_win = (points["home_points"] > points["away_points"]).to_numpy(dtype=float)
+    home_win[points.isna().any(axis=1).to_numpy()] = np.nan
+    return home_win
+
+
+def _playoff_odds(team_wins, teams, conferences, playoff_spots, rng):
+    """
+    Fraction of simulated seasons each team finishes in its conference's
+    top playoff_spots by wins, from a (teams x seasons) array of wins
+    """
+    if conferences is None:
+        conferences = {None: teams}
+    made_playoffs = np.zeros(team_wins.shape, dtype=bool)
+    # random fractions of a win break ties without reordering different records
+    wins = team_wins + rng.random(team_wins.shape) / 2
+    for conference_teams in conferences.values():
+        team_inds = np.array(
+            [teams.index(team) for team in conference_teams if team in teams]
+        )
+        spots = len(team_inds) // 2 if playoff_spots is None else playoff_spots
+        ranks = np.argsort(np.argsort(-wins[team_inds], axis=0), axis=0)
+        made_playoffs[team_inds] = ranks < spots
+    return made_playoffs.mean(axis=1)
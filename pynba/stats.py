@@ -0,0 +1,10 @@
+"""Module of statistical helpers, shared by the model and simulations"""
+
+
+def log5(mean, *args):
+    """Calculate expected value given mean and samples from the population"""
+    odds0 = mean / (1 - mean)
+    odds = args[0] / (1 - args[0]) / odds0 ** (len(args) - 1)
+    for arg in args[1:]:
+        odds *= arg / (1 - arg)
+    return odds / (odds + 1)
@@ -1,27 +1,207 @@
 """Module for loading NBA team information"""
 
-from pkg_resources import resource_filename
+import functools
+import hashlib
+import logging
+import os
+import tempfile
+import zipfile
+from importlib import resources
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
 
 from pynba import safe_yaml
+from pynba.config import config
+
 
+__all__ = ["team_id_to_abb", "team_ids_to_abbs"]
 
-__all__ = ["team_id_to_abb"]
+logger = logging.getLogger(__name__)
 
+TEAMS_FILENAME = "teams.yaml"
+TEAM_INDEX_FILENAME = "team_index.npz"
+# columns of a TeamIndex's arrays, one row per team per league-season
+TEAM_INDEX_COLUMNS = ["league", "year", "team_id", "abbreviation"]
 
-def __load_team_info():
-    team_info_path = resource_filename("pynba", "teams.yaml")
-    with open(team_info_path, encoding="utf-8") as teams_file:
+
+@functools.lru_cache(maxsize=None)
+def _team_info():
+    """Team info by league & year, parsed from teams.yaml on first use"""
+    with resources.files("pynba").joinpath(TEAMS_FILENAME).open(
+        encoding="utf-8"
+    ) as teams_file:
         return safe_yaml.load(teams_file)
 
 
+def __getattr__(name):
+    """team_info, loaded on first use rather than on import"""
+    if name == "team_info":
+        return _team_info()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class TeamIndex:
+    """
+    Immutable index of every league-season's teams, mapping their ids to
+    abbreviations and back, built from arrays with a row per team per
+    league-season, e.g. from TeamIndex.from_team_info
+    """
+
+    __slots__ = ("_seasons", "_arrays")
+
+    def __init__(self, league, year, team_id, abbreviation):
+        arrays = {
+            "league": np.asarray(league, dtype=str),
+            "year": np.asarray(year, dtype=np.int64),
+            "team_id": np.asarray(team_id, dtype=np.int64),
+            "abbreviation": np.asarray(abbreviation, dtype=str),
+        }
+        order = np.lexsort((arrays["team_id"], arrays["year"], arrays["league"]))
+        for name, values in arrays.items():
+            values = values[order]
+            values.flags.writeable = False
+            arrays[name] = values
+        self._seasons = self._index_seasons(arrays)
+        self._arrays = arrays
+
+    @staticmethod
+    def _index_seasons(arrays):
+        """
+        Each league-season's team ids, abbreviations, and mappings between
+        them, from arrays sorted by league & year
+        """
+        keys = list(zip(arrays["league"].tolist(), arrays["year"].tolist()))
+        starts = [
+            ind for ind, key in enumerate(keys) if not ind or key != keys[ind - 1]
+        ]
+        seasons = {}
+        for start, stop in zip(starts, starts[1:] + [len(keys)]):
+            team_ids = arrays["team_id"][start:stop]
+            abbreviations = arrays["abbreviation"][start:stop]
+            id_to_abb = dict(zip(team_ids.tolist(), abbreviations.tolist()))
+            seasons[keys[start]] = (
+                team_ids,
+                abbreviations,
+                MappingProxyType(id_to_abb),
+                MappingProxyType({abb: key for key, abb in id_to_abb.items()}),
+            )
+        return seasons
+
+    @classmethod
+    def from_team_info(cls, team_info):
+        """Builds the index from team info by league & year, e.g. from teams.yaml"""
+        rows = [
+            (league, year, team_id, info["abbreviation"])
+            for league, years in team_info.items()
+            for year, teams in years.items()
+            for team_id, info in teams.items()
+        ]
+        return cls(*zip(*rows))
+
+    def save(self, file, **metadata):
+        """Saves the index as a .npz file, along with any metadata arrays"""
+        np.savez(file, **self._arrays, **metadata)
+
+    def id_to_abb(self, league, year):
+        """Read-only mapping of the league-season's team ids to abbreviations"""
+        return self._seasons[league, year][2]
+
+    def abb_to_id(self, league, year):
+        """Read-only mapping of the league-season's team abbreviations to ids"""
+        return self._seasons[league, year][3]
+
+    def ids_to_abbs(self, league, year, team_ids):
+        """
+        Maps an array of the league-season's team ids to a Categorical of
+        their abbreviations, with NaN for ids of teams not in it
+        """
+        season_ids, abbreviations, _, _ = self._seasons[league, year]
+        team_ids = np.asarray(team_ids)
+        inds = np.searchsorted(season_ids, team_ids).clip(max=len(season_ids) - 1)
+        codes = np.where(season_ids[inds] == team_ids, inds, -1)
+        return pd.Categorical.from_codes(codes, categories=abbreviations)
+
+
+def _teams_digest():
+    """Digest of teams.yaml, to tell if a cached index was built from it"""
+    teams_bytes = resources.files("pynba").joinpath(TEAMS_FILENAME).read_bytes()
+    return hashlib.sha256(teams_bytes).hexdigest()
+
+
+def _team_index_filepath():
+    return os.path.join(
+        config.local_data_directory, config.cache_directory, TEAM_INDEX_FILENAME
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def team_index():
+    """
+    The process's TeamIndex of teams.yaml, built on first use, and if
+    config.team_index_cache is on, loaded from its cache in
+    config.cache_directory instead of parsing teams.yaml, if it's current
+    """
+    if not config.team_index_cache:
+        return TeamIndex.from_team_info(_team_info())
+    filepath = _team_index_filepath()
+    digest = _teams_digest()
+    try:
+        with np.load(filepath, allow_pickle=False) as arrays:
+            if str(arrays["digest"]) == digest:
+                return TeamIndex(*(arrays[column] for column in TEAM_INDEX_COLUMNS))
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass  # i.e. no cache yet, or a corrupt one, so rebuild it
+    index = TeamIndex.from_team_info(_team_info())
+    try:
+        _save_team_index(index, filepath, digest)
+    except OSError as exc:
+        logger.warning(f"Couldn't cache the team index: {exc}")
+    return index
+
+
+def _save_team_index(index, filepath, digest):
+    """Saves via a temporary file, so readers never see a partial index"""
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    file_descriptor, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(filepath), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as tmp_file:
+            index.save(tmp_file, digest=np.array(digest))
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
 def team_id_to_abb(league, year):
-    """Returns a dictionary mapping a team's id to its abbreviation for that league/year"""
-    return {key: val["abbreviation"] for key, val in team_info[league][year].items()}
+    """Returns a mapping of a team's id to its abbreviation for that league/year"""
+    return team_index().id_to_abb(league, year)
 
 
 def team_abb_to_id(league, year):
-    """Returns a dictionary mapping a team's abbreviation to its id for that league/year"""
-    return {val["abbreviation"]: key for key, val in team_info[league][year].items()}
+    """Returns a mapping of a team's abbreviation to its id for that league/year"""
+    return team_index().abb_to_id(league, year)
+
+
+def team_ids_to_abbs(league, year, team_ids):
+    """
+    Maps many team ids to their abbreviations at once, e.g. a column of
+    possessions, rather than looking each one up
 
+    Parameters
+    ----------
+    league : str
+        e.g. "nba", "wnba"
+    year : int
+        e.g. 2018
+    team_ids : array-like of int
 
-team_info = __load_team_info()
+    Returns
+    -------
+    pd.Categorical
+        of the teams' abbreviations, NaN for ids not in the league-season
+    """
+    return team_index().ids_to_abbs(league, year, team_ids)
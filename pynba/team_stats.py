@@ -1,7 +1,15 @@
 """Model team statistics"""
 
+import json
+import logging
+import os
+
+import arviz as az
+import numpy as np
 import pandas as pd
 import pymc3 as pm
+from pymc3.step_methods.hmc.quadpotential import QuadPotentialDiagAdapt
+from pymc3.theanof import inputvars
 
 from pynba.team_info import team_id_to_abb
 from pynba.halfgames import (
@@ -10,7 +18,39 @@ from pynba.halfgames import (
     calc_scoring_rate,
 )
 from pynba.config import config
+from pynba.constants import NUTS, ADVI, FULLRANK_ADVI, LAPLACE
+from pynba.schemas import TEAMS_SCHEMA, TEAMS_STATS_COLUMNS, apply_schema
+from pynba.stats import log5
+from pynba.traces import TRACE_DTYPE, TRACE_METADATA_FILENAME
+
+
+logger = logging.getLogger(__name__)
 
+# keys of a warm start state's posterior means & variances, per free variable
+WARM_START_MEAN = "mean__"
+WARM_START_VAR = "var__"
+# initial weight of the warm start's variances in the adapted mass matrix,
+# as pm.sample gives its initial guess with init="adapt_diag"
+WARM_START_MASS_MATRIX_WEIGHT = 10
+# step for the Laplace approximation's finite differences, relative to each value
+LAPLACE_RELATIVE_STEP = 1e-5
+
+# sides of a team's rates in the trace, e.g. off_pace & def_pace
+TEAM_SIDES = ["off", "def"]
+# rates of each team in the trace, in the order of the results' columns
+TEAM_RATES = [
+    "three_attempt_rate",
+    "two_make_rate",
+    "three_make_rate",
+    "off_reb_rate",
+    "turnover_rate",
+    "ft_attempt_rate",
+    "ft_make_rate",
+    "pace",
+]
+# draws per block of the results' estimates, small enough to stay in cache
+RESULTS_BLOCK_DRAWS = 1024
+RESULTS_COLUMNS = ["team"] + TEAMS_STATS_COLUMNS
 
 DEFAULT_PRIORS = {
     "off_three_make_rate_sigma": 0.02,
@@ -47,11 +87,14 @@ DEFAULT_PRIORS = {
 }
 
 
-class TeamsModel:
+class TeamsModel:  # pylint: disable=too-many-instance-attributes
     """Class wrapper for teams PyMC3 model"""
 
-    def __init__(self, halfgames, priors=None):
+    def __init__(self, halfgames, priors=None, collapse_binomials=None):
         self.priors = self._process_priors(priors)
+        if collapse_binomials is None:
+            collapse_binomials = config.pymc3_collapse_binomials
+        self.collapse_binomials = collapse_binomials
         self._assign_halfgames(halfgames)
         self._assign_model()
         self._trace = None
@@ -166,6 +209,29 @@ class TeamsModel:
             self._model_pace(off_index, def_index)
             self._model_ft_made(off_index, home_index)
 
+    def _binomial_data(self, trials, observed, *indices):
+        """
+        Trials & successes of a binomial variable, along with the team & home
+        indices its probability depends on. With collapse_binomials, these
+        are summed over the halfgames sharing the same indices, since
+        binomials with the same probability sum to a binomial, so the
+        likelihood only differs by a constant, i.e. the posterior is the same,
+        but has a term per unique set of indices rather than per halfgame.
+        """
+        trials = np.asarray(trials, dtype=np.int64)
+        observed = np.asarray(observed, dtype=np.int64)
+        if not self.collapse_binomials:
+            return (trials, observed, *indices)
+        cells, cell_index = np.unique(np.stack(indices), axis=1, return_inverse=True)
+        n_cells = cells.shape[1]
+        return (
+            np.bincount(cell_index, weights=trials, minlength=n_cells).astype(np.int64),
+            np.bincount(cell_index, weights=observed, minlength=n_cells).astype(
+                np.int64
+            ),
+            *cells,
+        )
+
     def _model_threes_made(self, off_index, def_index, home_index):
         off_three_make_rate = pm.Beta(
             "off_three_make_rate",
@@ -185,6 +251,13 @@ class TeamsModel:
             sigma=self.priors["home_three_make_rate_sigma"],
         )
         away_three_make_rate = 2 * self.mu_three_make_rate - home_three_make_rate
+        trials, observed, off_index, def_index, home_index = self._binomial_data(
+            self.halfgames["threes_attempted"],
+            self.halfgames["threes_made"],
+            off_index,
+            def_index,
+            home_index,
+        )
         halfgames_three_make_rate = log5(
             self.mu_three_make_rate,
             off_three_make_rate[off_index],
@@ -193,9 +266,9 @@ class TeamsModel:
         )
         pm.Binomial(
             "threes_made",
-            n=self.halfgames["threes_attempted"].to_numpy(),
+            n=trials,
             p=halfgames_three_make_rate,
-            observed=self.halfgames["threes_made"].to_numpy(),
+            observed=observed,
         )
 
     def _model_twos_made(self, off_index, def_index, home_index):
@@ -217,6 +290,13 @@ class TeamsModel:
             sigma=self.priors["home_two_make_rate_sigma"],
         )
         away_two_make_rate = 2 * self.mu_two_make_rate - home_two_make_rate
+        trials, observed, off_index, def_index, home_index = self._binomial_data(
+            self.halfgames["twos_attempted"],
+            self.halfgames["twos_made"],
+            off_index,
+            def_index,
+            home_index,
+        )
         halfgames_two_make_rate = log5(
             self.mu_two_make_rate,
             off_two_make_rate[off_index],
@@ -225,9 +305,9 @@ class TeamsModel:
         )
         pm.Binomial(
             "twos_made",
-            n=self.halfgames["twos_attempted"].to_numpy(),
+            n=trials,
             p=halfgames_two_make_rate,
-            observed=self.halfgames["twos_made"].to_numpy(),
+            observed=observed,
         )
 
     def _model_threes_attempted(self, off_index, def_index):
@@ -243,6 +323,12 @@ class TeamsModel:
             sigma=self.priors["def_three_attempt_rate_sigma"],
             shape=self.n_teams,
         )
+        trials, observed, off_index, def_index = self._binomial_data(
+            self.halfgames["twos_attempted"] + self.halfgames["threes_attempted"],
+            self.halfgames["threes_attempted"],
+            off_index,
+            def_index,
+        )
         halfgames_three_attempt_rate = log5(
             self.mu_three_attempt_rate,
             off_three_attempt_rate[off_index],
@@ -250,11 +336,9 @@ class TeamsModel:
         )
         pm.Binomial(
             "threes_attempted",
-            n=(
-                self.halfgames["twos_attempted"] + self.halfgames["threes_attempted"]
-            ).to_numpy(),
+            n=trials,
             p=halfgames_three_attempt_rate,
-            observed=self.halfgames["threes_attempted"].to_numpy(),
+            observed=observed,
         )
 
     def _model_off_rebs(self, off_index, def_index, home_index):
@@ -276,6 +360,13 @@ class TeamsModel:
             sigma=self.priors["home_off_reb_rate_sigma"],
         )
         away_off_reb_rate = 2 * self.mu_off_reb_rate - home_off_reb_rate
+        trials, observed, off_index, def_index, home_index = self._binomial_data(
+            self.halfgames["off_rebs"] + self.halfgames["def_rebs"],
+            self.halfgames["off_rebs"],
+            off_index,
+            def_index,
+            home_index,
+        )
         halfgames_off_reb_rate = log5(
             self.mu_off_reb_rate,
             off_off_reb_rate[off_index],
@@ -284,9 +375,9 @@ class TeamsModel:
         )
         pm.Binomial(
             "off_rebs",
-            n=(self.halfgames["off_rebs"] + self.halfgames["def_rebs"]).to_numpy(),
+            n=trials,
             p=halfgames_off_reb_rate,
-            observed=self.halfgames["off_rebs"].to_numpy(),
+            observed=observed,
         )
 
     def _model_turnovers(self, off_index, def_index, home_index):
@@ -308,6 +399,13 @@ class TeamsModel:
             sigma=self.priors["home_turnover_rate_sigma"],
         )
         away_turnover_rate = 2 * self.mu_turnover_rate - home_turnover_rate
+        trials, observed, off_index, def_index, home_index = self._binomial_data(
+            self.halfgames["possession_num"],
+            self.halfgames["turnovers"],
+            off_index,
+            def_index,
+            home_index,
+        )
         halfgames_turnover_rate = log5(
             self.mu_turnover_rate,
             off_turnover_rate[off_index],
@@ -316,9 +414,9 @@ class TeamsModel:
         )
         pm.Binomial(
             "turnovers",
-            n=self.halfgames["possession_num"].to_numpy(),
+            n=trials,
             p=halfgames_turnover_rate,
-            observed=self.halfgames["turnovers"].to_numpy(),
+            observed=observed,
         )
 
     def _model_ft_attempt_rate(self, off_index, def_index, home_index):
@@ -401,6 +499,12 @@ class TeamsModel:
             sigma=self.priors["home_ft_make_rate_sigma"],
         )
         away_ft_make_rate = 2 * self.mu_ft_make_rate - home_ft_make_rate
+        trials, observed, off_index, home_index = self._binomial_data(
+            self.halfgames["ft_attempted"],
+            self.halfgames["ft_made"],
+            off_index,
+            home_index,
+        )
         halfgames_ft_make_rate = log5(
             self.mu_ft_make_rate,
             off_ft_make_rate[off_index],
@@ -408,9 +512,9 @@ class TeamsModel:
         )
         pm.Binomial(
             "ft_made",
-            n=self.halfgames["ft_attempted"].to_numpy(),
+            n=trials,
             p=halfgames_ft_make_rate,
-            observed=self.halfgames["ft_made"].to_numpy(),
+            observed=observed,
         )
 
     def fit(
@@ -420,23 +524,237 @@ class TeamsModel:
         chains=config.pymc3_chains,
         random_seed=config.pymc3_random_seed,
         return_inferencedata=False,
+        *,
+        warm_start=None,
+        backend=None,
         **kwargs,
     ):
         """
         Fit PyMC3 model to provided data. This is a wrapper of
         pm.sample with some defaults.
+
+        Given a warm_start, i.e. the warm_start_state of an earlier fit
+        of the season, e.g. before its latest games, chains start near its
+        posterior, with its tuned step size and mass matrix, so tune for only
+        config.pymc3_warm_tune steps. If the chains then haven't converged,
+        i.e. an R-hat is above config.pymc3_max_rhat, or the warm start
+        doesn't match the model, e.g. a new team has played, the model is
+        fit from scratch instead.
+
+        The backend, defaulting to config.pymc3_backend, is the inference
+        method: "nuts" samples the posterior, while the much faster "advi",
+        "fullrank_advi" and "laplace" draw from an approximation of it,
+        fit with pm.fit or around the MAP estimate respectively, in which case
+        init, chains, return_inferencedata, warm_start and kwargs are unused.
         """
-        with self.model:
-            self._trace = pm.sample(
+        backend = backend or config.pymc3_backend
+        if backend == NUTS:
+            self._trace = self._sample_nuts(
                 draws=draws,
                 init=init,
                 chains=chains,
                 random_seed=random_seed,
                 return_inferencedata=return_inferencedata,
+                warm_start=warm_start,
                 **kwargs,
             )
+        elif backend in (ADVI, FULLRANK_ADVI):
+            with self.model:
+                # full-rank ADVI's optimization can diverge from the test point
+                start = (
+                    pm.find_MAP(progressbar=False) if backend == FULLRANK_ADVI else None
+                )
+                approx = pm.fit(
+                    n=config.pymc3_advi_iterations,
+                    method=backend,
+                    start=start,
+                    random_seed=random_seed,
+                    callbacks=[
+                        pm.callbacks.CheckParametersConvergence(diff="absolute")
+                    ],
+                    progressbar=False,
+                )
+            self._trace = approx.sample(draws)
+        elif backend == LAPLACE:
+            self._trace = self._sample_laplace(draws, random_seed)
+        else:
+            raise ValueError(f"Invalid inference backend {backend}")
         self._results = self._calc_results()
 
+    def _sample_nuts(self, *, draws, init, chains, random_seed, warm_start, **kwargs):
+        if warm_start is not None:
+            step_and_start = self._warm_step_and_start(warm_start, chains, random_seed)
+            if step_and_start is None:
+                logger.info(
+                    "Warm start doesn't match the model, so fitting from scratch"
+                )
+            else:
+                step, start = step_and_start
+                with self.model:
+                    trace = pm.sample(
+                        draws=draws,
+                        step=step,
+                        start=start,
+                        chains=chains,
+                        random_seed=random_seed,
+                        **{"tune": config.pymc3_warm_tune, **kwargs},
+                    )
+                max_rhat = self._max_rhat(trace)
+                if max_rhat <= config.pymc3_max_rhat:
+                    return trace
+                logger.info(
+                    f"Warm started chains haven't converged, with an R-hat of "
+                    f"{max_rhat:.3f}, so fitting from scratch"
+                )
+        with self.model:
+            return pm.sample(
+                draws=draws,
+                init=init,
+                chains=chains,
+                random_seed=random_seed,
+                **kwargs,
+            )
+
+    def _sample_laplace(self, draws, random_seed):
+        """
+        Draws from a normal approximation of the posterior, in the sampler's
+        transformed space, centered on its mode with the inverse of its
+        negative log density's Hessian there as covariance
+
+        Returns
+        -------
+        dict
+            mapping each variable's name to an array of its draws
+        """
+        with self.model:
+            map_point = pm.find_MAP(progressbar=False)
+        mean = self.model.dict_to_array(map_point)
+        # with precision L @ L.T, mean + inv(L.T) @ z has covariance inv(L @ L.T)
+        chol = np.linalg.cholesky(self._neg_hessian(mean))
+        rng = np.random.default_rng(random_seed)
+        free_draws = (
+            mean + np.linalg.solve(chol.T, rng.standard_normal((mean.size, draws))).T
+        )
+        names = [var.name for var in self.model.unobserved_RVs]
+        values = self.model.fastfn([self.model[name] for name in names])
+        point_draws = [
+            values(self.model.bijection.rmap(free_draw)) for free_draw in free_draws
+        ]
+        return {
+            name: np.stack([point[ind] for point in point_draws])
+            for ind, name in enumerate(names)
+        }
+
+    def _neg_hessian(self, free_point):
+        """
+        Negative Hessian of the log density at a point in the sampler's space,
+        by central differences of its gradient, which avoids compiling
+        Theano's symbolic Hessian, a scan over the gradient's elements
+        """
+        # ordered like the model's bijection between points and arrays
+        dlogp = self.model.fastdlogp(inputvars(self.model.vars))
+        steps = LAPLACE_RELATIVE_STEP * np.maximum(np.abs(free_point), 1)
+        columns = []
+        for ind, step in enumerate(steps):
+            offset = np.zeros_like(free_point)
+            offset[ind] = step
+            columns.append(
+                (
+                    dlogp(self.model.bijection.rmap(free_point + offset))
+                    - dlogp(self.model.bijection.rmap(free_point - offset))
+                )
+                / (2 * step)
+            )
+        hessian = np.column_stack(columns)
+        return -(hessian + hessian.T) / 2
+
+    def warm_start_state(self):
+        """
+        Summary of the fitted posterior for a later fit to warm start from,
+        i.e. the posterior mean and variance of each free variable, in the
+        sampler's transformed space, the team ids they're for, and NUTS'
+        tuned step size. Requires fitting with return_inferencedata=False.
+
+        Returns
+        -------
+        dict
+            mapping str to np.ndarray, e.g. to save with np.savez
+        """
+        state = {
+            "team_ids": np.array(list(self.team_id_to_team_ind)),
+            "step_size": np.median(self.trace.get_sampler_stats("step_size")),
+        }
+        for var in self.model.free_RVs:
+            values = self.trace.get_values(var.name)
+            state[WARM_START_MEAN + var.name] = values.mean(0)
+            state[WARM_START_VAR + var.name] = values.var(0)
+        return state
+
+    def _warm_start_point(self, state):
+        """
+        The posterior means & variances of a warm start state, as arrays
+        ordered like the model's free variables, or None if they don't match
+        """
+        team_ids = list(state["team_ids"])
+        if not set(self.team_id_to_team_ind).issubset(team_ids):
+            return None
+        team_inds = [team_ids.index(team_id) for team_id in self.team_id_to_team_ind]
+        means = {}
+        variances = {}
+        for var in self.model.free_RVs:
+            if WARM_START_MEAN + var.name not in state:
+                return None
+            mean = state[WARM_START_MEAN + var.name]
+            variance = state[WARM_START_VAR + var.name]
+            if mean.shape == (len(team_ids),):
+                mean = mean[team_inds]
+                variance = variance[team_inds]
+            if mean.shape != self.model.test_point[var.name].shape:
+                return None
+            means[var.name] = mean
+            variances[var.name] = variance
+        return self.model.dict_to_array(means), self.model.dict_to_array(variances)
+
+    def _warm_step_and_start(self, state, chains, random_seed):
+        """
+        NUTS step method and a start point per chain from a warm start state,
+        or None if it doesn't match the model. Start points are drawn from
+        a normal approximation of the posterior, so chains start dispersed.
+        """
+        point = self._warm_start_point(state)
+        if point is None:
+            return None
+        mean, variance = point
+        rng = np.random.default_rng(random_seed)
+        start = [
+            self.model.bijection.rmap(
+                mean + np.sqrt(variance) * rng.standard_normal(mean.size)
+            )
+            for _ in range(chains)
+        ]
+        potential = QuadPotentialDiagAdapt(
+            mean.size, mean, variance, WARM_START_MASS_MATRIX_WEIGHT
+        )
+        with self.model:
+            # NUTS scales step_scale down by the number of dimensions
+            step = pm.NUTS(
+                potential=potential,
+                step_scale=float(state["step_size"]) * mean.size**0.25,
+            )
+        return step, start
+
+    def _max_rhat(self, trace):
+        """Largest R-hat of the model's free variables, in the sampler's space"""
+        if isinstance(trace, az.InferenceData):
+            rhat = az.rhat(trace)
+        else:
+            draws = {
+                var.name: np.stack(trace.get_values(var.name, combine=False))
+                for var in self.model.free_RVs
+            }
+            rhat = az.rhat(az.convert_to_dataset(draws))
+        return max(float(rhat[name].max()) for name in rhat.data_vars)
+
     @property
     def trace(self):
         """Property method to get PyMC3 model trace"""
@@ -455,109 +773,207 @@ class TeamsModel:
             )
         return self._results
 
-    def _calc_results(self):
-        off_shots_per_opp_est = estimate_shots_per_opp(
-            self.trace["off_turnover_rate"],
-            self.trace["off_ft_attempt_rate"],
-        )
-        off_shots_per_poss_est = estimate_shots_per_poss(
-            off_shots_per_opp_est,
-            self.trace["off_three_attempt_rate"],
-            self.trace["off_three_make_rate"],
-            self.trace["off_two_make_rate"],
-            self.trace["off_off_reb_rate"],
-        )
-        off_scoring_rate_est = calc_scoring_rate(
-            off_shots_per_poss_est,
-            self.trace["off_three_make_rate"],
-            self.trace["off_two_make_rate"],
-            self.trace["off_three_attempt_rate"],
-            self.trace["off_ft_attempt_rate"],
-            self.trace["off_ft_make_rate"],
-        )
-
-        def_shots_per_opp_est = estimate_shots_per_opp(
-            self.trace["def_turnover_rate"],
-            self.trace["def_ft_attempt_rate"],
-        )
-        def_shots_per_poss_est = estimate_shots_per_poss(
-            def_shots_per_opp_est,
-            self.trace["def_three_attempt_rate"],
-            self.trace["def_three_make_rate"],
-            self.trace["def_two_make_rate"],
-            self.trace["def_off_reb_rate"],
-        )
-        def_scoring_rate_est = calc_scoring_rate(
-            def_shots_per_poss_est,
-            self.trace["def_three_make_rate"],
-            self.trace["def_two_make_rate"],
-            self.trace["def_three_attempt_rate"],
-            self.trace["def_ft_attempt_rate"],
-            self.mu_ft_make_rate,
-        )
+    def _trace_array(self):
+        """
+        Draws of each team's offensive & defensive rates, as one contiguous
+        (rate x side x draw x team) array, with rates in TEAM_RATES and sides
+        in TEAM_SIDES, each variable's draws in the trace's own order, so
+        it's copied in without a transpose. Each variable's chains are copied
+        straight in, since reading a MultiTrace's variable concatenates its
+        chains into a new array. Defenses don't affect free throw make rates,
+        so theirs are the mean.
+        """
+        off_pace = np.asarray(self.trace["off_pace"])
+        trace = np.empty((len(TEAM_RATES), len(TEAM_SIDES)) + off_pace.shape)
+        for rate_ind, rate in enumerate(TEAM_RATES):
+            for side_ind, side in enumerate(TEAM_SIDES):
+                name = f"{side}_{rate}"
+                if name == "def_ft_make_rate":
+                    trace[rate_ind, side_ind] = self.mu_ft_make_rate
+                else:
+                    np.concatenate(
+                        _chains(self.trace, name), out=trace[rate_ind, side_ind]
+                    )
+        return trace
 
-        results = pd.DataFrame()
-        results["team"] = [
-            self.team_ind_to_team_abb[ind]
-            for ind in range(self.trace["off_pace"].shape[1])
-        ]
-        results["off_three_attempt_rate"] = (
-            self.trace["off_three_attempt_rate"].mean(0) * 100
-        )
-        results["off_two_make_rate"] = self.trace["off_two_make_rate"].mean(0) * 100
-        results["off_three_make_rate"] = self.trace["off_three_make_rate"].mean(0) * 100
-        results["off_reb_rate"] = self.trace["off_off_reb_rate"].mean(0) * 100
-        results["off_turnover_rate"] = self.trace["off_turnover_rate"].mean(0) * 100
-        results["off_ft_attempt_rate"] = self.trace["off_ft_attempt_rate"].mean(0) * 100
-        results["off_ft_make_rate"] = self.trace["off_ft_make_rate"].mean(0) * 100
-        results["def_three_attempt_rate"] = (
-            self.trace["def_three_attempt_rate"].mean(0) * 100
-        )
-        results["def_two_make_rate"] = self.trace["def_two_make_rate"].mean(0) * 100
-        results["def_three_make_rate"] = self.trace["def_three_make_rate"].mean(0) * 100
-        results["def_reb_rate"] = (1 - self.trace["def_off_reb_rate"].mean(0)) * 100
-        results["def_turnover_rate"] = self.trace["def_turnover_rate"].mean(0) * 100
-        results["def_ft_attempt_rate"] = self.trace["def_ft_attempt_rate"].mean(0) * 100
-        results["off_scoring_rate"] = off_scoring_rate_est.mean(0) * 100
-        results["def_scoring_rate"] = def_scoring_rate_est.mean(0) * 100
+    def _calc_results(self, quantiles=None):
+        """
+        Post-processes the trace into each team's posterior means, along with
+        posterior quantiles of the statistics estimated per draw, given as
+        fractions, defaulting to config.results_quantiles, e.g. [0.05, 0.95]
+        adds a "{column}_p5" & "{column}_p95" column for each
+        """
+        if quantiles is None:
+            quantiles = config.results_quantiles
+        trace = self._trace_array()
+        rates = dict(zip(TEAM_RATES, trace))
+        # offense & defense scoring rates, net scoring rate & total pace,
+        # a block of draws at a time, so intermediate arrays stay in cache
+        derived = np.empty((4,) + trace.shape[2:])
+        for start in range(0, trace.shape[2], RESULTS_BLOCK_DRAWS):
+            block = slice(start, start + RESULTS_BLOCK_DRAWS)
+            derived[:2, block] = _scoring_rate(
+                {rate: values[:, block] for rate, values in rates.items()}
+            )
+        np.subtract(derived[0], derived[1], out=derived[2])
+        np.divide(12 * 4 * 60, rates["pace"].sum(axis=0), out=derived[3])
+
+        # in place from here on, into the results' columns' units, but for
+        # percentages, which _results_columns scales once summarized
+        def_reb_rate = rates["off_reb_rate"][1]
+        np.subtract(1, def_reb_rate, out=def_reb_rate)
+        np.divide(12 * 4 * 60 / 2, rates["pace"], out=rates["pace"])
+
+        results = pd.DataFrame(
+            {
+                "team": [
+                    self.team_ind_to_team_abb[ind] for ind in range(trace.shape[-1])
+                ],
+                **_results_columns(trace.mean(axis=-2), derived.mean(axis=-2)),
+            }
+        )
         results["off_scoring_above_average"] = (
             results["off_scoring_rate"] - self.mu_scoring_rate_est * 100
         )
         results["def_scoring_above_average"] = (
             self.mu_scoring_rate_est * 100 - results["def_scoring_rate"]
         )
-        results["net_scoring_rate"] = (
-            results["off_scoring_rate"] - results["def_scoring_rate"]
-        )
-        results["off_pace"] = (12 * 4 * 60 / self.trace["off_pace"] / 2).mean(0)
-        results["def_pace"] = (12 * 4 * 60 / self.trace["def_pace"] / 2).mean(0)
         results["off_pace_above_average"] = (
             results["off_pace"] - results["off_pace"].mean()
         )
         results["def_pace_above_average"] = (
             results["def_pace"] - results["def_pace"].mean()
         )
-        results["total_pace"] = (
-            12 * 4 * 60 / (self.trace["off_pace"] + self.trace["def_pace"])
-        ).mean(0)
         results["scoring_margin"] = (
             results["net_scoring_rate"] * results["total_pace"] / 100
         )
+        results = results[RESULTS_COLUMNS]
+        if len(quantiles) > 0:
+            results = pd.concat(
+                [results]
+                + [
+                    pd.DataFrame(
+                        _results_columns(trace_quantile, derived_quantile)
+                    ).add_suffix(f"_p{quantile * 100:g}")
+                    for quantile, trace_quantile, derived_quantile in zip(
+                        quantiles,
+                        np.quantile(trace, quantiles, axis=-2, overwrite_input=True),
+                        np.quantile(derived, quantiles, axis=-2, overwrite_input=True),
+                    )
+                ],
+                axis=1,
+            )
         results = results.sort_values("net_scoring_rate", ascending=False)
         results.loc[:, "league"] = self.league
         results.loc[:, "year"] = self.year
         results.loc[:, "season_type"] = self.season_type
-        return results
+        return apply_schema(results, TEAMS_SCHEMA)
 
     def traceplot(self):
         """Wrapper for pm.traceplot"""
         pm.traceplot(self.trace)
 
+    def save_trace(self, directory):
+        """
+        Saves the posterior draws of every variable in the model to a
+        directory, as a .npy file per variable, with draws along its last
+        axis, so each team's draws are contiguous, and a json file of the
+        teams, chains and variables, for load_trace to memory map.
+        Requires fitting with return_inferencedata=False.
+
+        Parameters
+        ----------
+        directory : str
+            path of the directory to save the trace in, created if need be
+        """
+        os.makedirs(directory, exist_ok=True)
+        names = [var.name for var in self.model.unobserved_RVs]
+        for name in names:
+            # moveaxis gives a transposed view, which np.save would write in
+            # Fortran order, spreading each team's draws across the file
+            values = np.moveaxis(np.asarray(self.trace[name], dtype=TRACE_DTYPE), 0, -1)
+            np.save(
+                os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(values)
+            )
+        metadata = {
+            "league": self.league,
+            "year": int(self.year),
+            "season_type": self.season_type,
+            "team_ids": [int(team_id) for team_id in self.team_id_to_team_ind],
+            "teams": [self.team_ind_to_team_abb[ind] for ind in range(self.n_teams)],
+            "chains": getattr(self.trace, "nchains", 1),
+            "variables": names,
+        }
+        # written last, so a directory with metadata has every variable
+        metadata_path = os.path.join(directory, TRACE_METADATA_FILENAME)
+        with open(metadata_path, "w", encoding="utf-8") as metadata_file:
+            json.dump(metadata, metadata_file)
+
+    def load_trace(self, trace):
+        """
+        Uses posterior draws saved by an earlier fit of the same season,
+        e.g. from load_trace, instead of fitting the model
+
+        Parameters
+        ----------
+        trace : pynba.traces.SavedTrace
+        """
+        if trace.teams != [
+            self.team_ind_to_team_abb[ind] for ind in range(self.n_teams)
+        ]:
+            raise ValueError(
+                f"Trace's teams {trace.teams} don't match the model's teams "
+                f"{list(self.team_ind_to_team_abb.values())}"
+            )
+        self._trace = trace
+        self._results = self._calc_results()
+
 
-def log5(mean, *args):
-    """Calculate expected value given mean and samples from the population"""
-    odds0 = mean / (1 - mean)
-    odds = args[0] / (1 - args[0]) / odds0 ** (len(args) - 1)
-    for arg in args[1:]:
-        odds *= arg / (1 - arg)
-    return odds / (odds + 1)
+def _chains(trace, name):
+    """A trace variable's draws per chain, without concatenating them"""
+    if isinstance(trace, pm.backends.base.MultiTrace):
+        return trace.get_values(name, combine=False, squeeze=False)
+    return [trace[name]]
+
+
+def _scoring_rate(rates):
+    """Scoring rate estimated from a dict of TEAM_RATES' values"""
+    shots_per_poss_est = estimate_shots_per_poss(
+        estimate_shots_per_opp(rates["turnover_rate"], rates["ft_attempt_rate"]),
+        rates["three_attempt_rate"],
+        rates["three_make_rate"],
+        rates["two_make_rate"],
+        rates["off_reb_rate"],
+    )
+    return calc_scoring_rate(
+        shots_per_poss_est,
+        rates["three_make_rate"],
+        rates["two_make_rate"],
+        rates["three_attempt_rate"],
+        rates["ft_attempt_rate"],
+        rates["ft_make_rate"],
+    )
+
+
+def _results_columns(trace, derived):
+    """
+    Results' columns from a summary over draws, e.g. their mean, of
+    TeamsModel._calc_results' (rate x side x team) trace and (4 x team)
+    derived statistics, in the columns' units but for percentages, which are
+    scaled here, as summaries like means & quantiles scale with their draws
+    """
+    columns = {}
+    for side_ind, side in enumerate(TEAM_SIDES):
+        for rate_ind, rate in enumerate(TEAM_RATES):
+            if rate == "pace" or (side, rate) == ("def", "ft_make_rate"):
+                continue
+            name = f"{side}_reb_rate" if rate == "off_reb_rate" else f"{side}_{rate}"
+            columns[name] = trace[rate_ind, side_ind] * 100
+    for name, values in zip(
+        ["off_scoring_rate", "def_scoring_rate", "net_scoring_rate"], derived
+    ):
+        columns[name] = values * 100
+    columns["total_pace"] = derived[3]
+    columns["off_pace"] = trace[TEAM_RATES.index("pace"), 0]
+    columns["def_pace"] = trace[TEAM_RATES.index("pace"), 1]
+    return columns
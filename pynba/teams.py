@@ -2,41 +2,68 @@
 
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pandas as pd
 
 from pynba.config import config
-from pynba.team_stats import TeamsModel
-from pynba.constants import LOCAL, S3
-from pynba.aws_s3 import get_fileobject
+from pynba.constants import LOCAL, S3, NUTS
+from pynba.aws_s3 import s3_filepath_or_buffer
+from pynba.schemas import TEAMS_SCHEMA, apply_schema
+from pynba.traces import SavedTrace
 
 
 __all__ = [
     "save_teams",
+    "save_trace",
     "teams_from_file",
+    "teams_from_files",
     "teams_from_halfgames",
+    "trace_from_file",
 ]
 
 logger = logging.getLogger(__name__)
 
+# columns identifying each season of teams data
+SEASON_COLUMNS = ["league", "year", "season_type"]
 
-def save_teams(teams):
-    """Saves teams data as a csv in the appropriate place"""
+
+def save_teams(teams, *, csv=None):
+    """
+    Saves teams data as parquet in the appropriate place, and optionally
+    as a csv alongside it, which the web app reads
+
+    Parameters
+    ----------
+    teams : pd.DataFrame
+        e.g. from teams_from_halfgames
+    csv : bool, optional
+        whether to also save a csv, defaulting to config.teams_csv
+    """
+    if csv is None:
+        csv = config.teams_csv
     league = teams["league"].iloc[0]
     year = teams["year"].iloc[0]
     season_type = teams["season_type"].iloc[0]
 
-    teams.to_csv(_teams_filepath(league, year, season_type), index=False)
+    teams = apply_schema(teams, TEAMS_SCHEMA)
+    os.makedirs(_teams_dir(), exist_ok=True)
+    teams.to_parquet(_teams_filepath(league, year, season_type), index=False)
+    if csv:
+        teams.to_csv(
+            _teams_filepath(league, year, season_type, extension="csv"), index=False
+        )
 
 
-def _teams_filename(league, year, season_type):
-    return f"{league}_{year}_{season_type}_teams.csv"
+def _teams_filename(league, year, season_type, extension="parquet"):
+    return f"{league}_{year}_{season_type}_teams.{extension}"
 
 
-def _teams_filepath(league, year, season_type):
+def _teams_filepath(league, year, season_type, extension="parquet"):
     return os.path.join(
         _teams_dir(),
-        _teams_filename(league, year, season_type),
+        _teams_filename(league, year, season_type, extension),
     )
 
 
@@ -44,9 +71,10 @@ def _teams_dir():
     return os.path.join(config.local_data_directory, config.teams_directory)
 
 
-def teams_from_file(league, year, season_type):
+def teams_from_file(league, year, season_type, *, columns=None):
     """
-    Loads teams data from file
+    Loads teams data from file, or from its csv for seasons saved before
+    teams data was saved as parquet
 
     Parameters
     ----------
@@ -56,28 +84,240 @@ def teams_from_file(league, year, season_type):
         e.g. 2018
     season_type : str
         e.g. "Regular Season", "Playoffs"
+    columns : list of str, optional
+        only load these columns
 
     Returns
     -------
     pd.DataFrame
     """
+    try:
+        teams = pd.read_parquet(
+            _teams_filepath_or_buffer(league, year, season_type),
+            columns=columns,
+            pre_buffer=False,
+        )
+    except FileNotFoundError:
+        teams = _legacy_teams_from_file(league, year, season_type, columns)
+    return apply_schema(teams, TEAMS_SCHEMA)
+
+
+def _teams_filepath_or_buffer(league, year, season_type, extension="parquet"):
     if config.teams_source == LOCAL:
-        filepath_or_buffer = _teams_filepath(league, year, season_type)
-    elif config.teams_source == S3:
-        filename = _teams_filename(league, year, season_type)
+        return _teams_filepath(league, year, season_type, extension)
+    if config.teams_source == S3:
+        filename = _teams_filename(league, year, season_type, extension)
         key = "/".join([config.aws_s3_key_prefix, config.teams_directory, filename])
-        filepath_or_buffer = get_fileobject(config.aws_s3_bucket, key)
-    else:
-        raise ValueError(
-            f"Incompatible config for teams source data: {config.teams_source}"
+        return s3_filepath_or_buffer(config.aws_s3_bucket, key)
+    raise ValueError(
+        f"Incompatible config for teams source data: {config.teams_source}"
+    )
+
+
+def _legacy_teams_from_file(league, year, season_type, columns=None):
+    """Loads teams data from the csv saved before teams data was saved as parquet"""
+    teams = pd.read_csv(
+        _teams_filepath_or_buffer(league, year, season_type, extension="csv"),
+        usecols=columns,
+    )
+    return teams if columns is None else teams[columns]
+
+
+def teams_from_files(seasons, *, columns=None):
+    """
+    Loads the teams data of many seasons into one DataFrame, e.g. to compare
+    teams across seasons, reading up to config.read_concurrency seasons'
+    files at once
+
+    Parameters
+    ----------
+    seasons : pd.DataFrame or iterable of tuples
+        a row or tuple of league, year & season_type per season,
+        e.g. seasons_on_file()
+    columns : list of str, optional
+        only load these columns, along with league, year & season_type
+
+    Returns
+    -------
+    pd.DataFrame
+        with the seasons' teams in the order of seasons
+    """
+    if isinstance(seasons, pd.DataFrame):
+        seasons = zip(seasons["league"], seasons["year"], seasons["season_type"])
+    if columns is not None:
+        columns = list(columns) + [
+            column for column in SEASON_COLUMNS if column not in columns
+        ]
+    with ThreadPoolExecutor(max_workers=config.read_concurrency) as executor:
+        frames = list(
+            executor.map(
+                lambda season: teams_from_file(*season, columns=columns), seasons
+            )
         )
-    return pd.read_csv(filepath_or_buffer)
+    if not frames:
+        return apply_schema(pd.DataFrame(columns=columns or []), TEAMS_SCHEMA)
+    # categories differ between seasons, so are unioned by applying the schema
+    return apply_schema(pd.concat(frames, ignore_index=True), TEAMS_SCHEMA)
+
+
+def teams_from_halfgames(
+    halfgames, *, warm_start=None, backend=None, save_trace_to_file=None
+):
+    """
+    Calculates teams data from halfgames data
+
+    Parameters
+    ----------
+    halfgames : pd.DataFrame
+    warm_start : bool, optional
+        whether to warm start the model's fit from the season's previous fit
+        on file, if any, then save this fit for the next one to warm start
+        from, defaulting to config.pymc3_warm_start. Only NUTS fits are
+        warm started.
+    backend : str, optional
+        the model's inference backend, e.g. "nuts", "advi", "fullrank_advi"
+        or "laplace", defaulting to config.pymc3_backend
+    save_trace_to_file : bool, optional
+        whether to save the model's posterior draws, for trace_from_file,
+        defaulting to config.pymc3_save_trace
 
+    Returns
+    -------
+    pd.DataFrame
+    """
+    # PyMC3 is slow to import, so only is when fitting
+    from pynba.team_stats import (  # pylint: disable=import-outside-toplevel
+        TeamsModel,
+    )
 
-def teams_from_halfgames(halfgames):
-    """Calculates teams data from halfgames data"""
+    backend = backend or config.pymc3_backend
+    if save_trace_to_file is None:
+        save_trace_to_file = config.pymc3_save_trace
+    if warm_start is None:
+        warm_start = config.pymc3_warm_start
+    warm_start = warm_start and backend == NUTS
     logger.info("Building model")
     teams_model = TeamsModel(halfgames)
-    logger.info("Fitting model")
-    teams_model.fit()
+    state = None
+    if warm_start:
+        state = _warm_start_from_file(
+            teams_model.league, teams_model.year, teams_model.season_type
+        )
+    if state is None:
+        logger.info(f"Fitting model with {backend}")
+    else:
+        logger.info(f"Fitting model with {backend}, warm started from its previous fit")
+    teams_model.fit(warm_start=state, backend=backend)
+    if warm_start:
+        _save_warm_start(
+            teams_model.warm_start_state(),
+            teams_model.league,
+            teams_model.year,
+            teams_model.season_type,
+        )
+    if save_trace_to_file:
+        save_trace(teams_model)
     return teams_model.results
+
+
+def save_trace(teams_model):
+    """Saves a fitted TeamsModel's posterior draws in the appropriate place"""
+    teams_model.save_trace(
+        _trace_dirpath(teams_model.league, teams_model.year, teams_model.season_type)
+    )
+
+
+def _trace_dirname(league, year, season_type):
+    return f"{league}_{year}_{season_type}_trace"
+
+
+def _traces_dir():
+    return os.path.join(config.local_data_directory, config.traces_directory)
+
+
+def _trace_dirpath(league, year, season_type):
+    return os.path.join(_traces_dir(), _trace_dirname(league, year, season_type))
+
+
+def trace_from_file(league, year, season_type, mmap_mode="r"):
+    """
+    Loads a season's posterior draws saved by teams_from_halfgames, without
+    reading any variable until it's accessed, then memory mapping it,
+    e.g. trace_from_file("nba", 2018, "Regular Season")["off_pace"][:, 3]
+    only reads the fourth team's draws from disk.
+    Pass it to TeamsModel.load_trace to reuse it instead of refitting.
+
+    Parameters
+    ----------
+    league : str
+        e.g. "nba", "wnba"
+    year : int
+        e.g. 2018
+    season_type : str
+        e.g. "Regular Season", "Playoffs"
+    mmap_mode : str, optional
+        np.load's mmap_mode for local files, defaulting to "r",
+        or None to read variables into memory
+
+    Returns
+    -------
+    SavedTrace
+        mapping variable names to arrays of their draws, like a MultiTrace
+    """
+    if config.teams_source == LOCAL:
+        dirpath = _trace_dirpath(league, year, season_type)
+
+        def filepath_or_buffer(filename):
+            return os.path.join(dirpath, filename)
+
+    elif config.teams_source == S3:
+        dirname = _trace_dirname(league, year, season_type)
+
+        def filepath_or_buffer(filename):
+            key = "/".join(
+                [config.aws_s3_key_prefix, config.traces_directory, dirname, filename]
+            )
+            return s3_filepath_or_buffer(config.aws_s3_bucket, key)
+
+    else:
+        raise ValueError(
+            f"Incompatible config for teams source data: {config.teams_source}"
+        )
+    return SavedTrace(filepath_or_buffer, mmap_mode=mmap_mode)
+
+
+def _warm_start_filename(league, year, season_type):
+    return f"{league}_{year}_{season_type}_warm_start.npz"
+
+
+def _warm_starts_dir():
+    return os.path.join(config.local_data_directory, config.warm_starts_directory)
+
+
+def _save_warm_start(state, league, year, season_type):
+    os.makedirs(_warm_starts_dir(), exist_ok=True)
+    filepath = os.path.join(
+        _warm_starts_dir(), _warm_start_filename(league, year, season_type)
+    )
+    np.savez(filepath, **state)
+
+
+def _warm_start_from_file(league, year, season_type):
+    """The warm start state saved by the season's previous fit, or None"""
+    filename = _warm_start_filename(league, year, season_type)
+    try:
+        if config.teams_source == LOCAL:
+            filepath_or_buffer = os.path.join(_warm_starts_dir(), filename)
+        elif config.teams_source == S3:
+            key = "/".join(
+                [config.aws_s3_key_prefix, config.warm_starts_directory, filename]
+            )
+            filepath_or_buffer = s3_filepath_or_buffer(config.aws_s3_bucket, key)
+        else:
+            raise ValueError(
+                f"Incompatible config for teams source data: {config.teams_source}"
+            )
+        with np.load(filepath_or_buffer) as state:
+            return dict(state)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,94 @@
+"""Local stand-in for the pbpstats web APIs, for use in tests"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class StandInServer:
+    """
+    Serves json over http on localhost from a background thread.
+    Use as a context manager.
+
+    Parameters
+    ----------
+    routes : dict
+        maps a url path to a list of responses, served in order, each
+        either a json-serializable payload, served with a 200 status code,
+        or an int status code, served with an empty body.
+        The last response for a path is repeated once the others are used up.
+        Paths without a route get a 404.
+    delay : float
+        seconds to wait before responding to each request
+    """
+
+    def __init__(self, routes, delay=0):
+        self.routes = {path: list(responses) for path, responses in routes.items()}
+        self.delay = delay
+        self.requests = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def url(self, path):
+        """Full url for the given path on this server"""
+        host, port = self._server.server_address
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def start_request(self, path):
+        """Record a request, returning the response to serve for it"""
+        with self._lock:
+            self.requests.append(path)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            responses = self.routes.get(path, [404])
+            if len(responses) > 1:
+                return responses.pop(0)
+            return responses[0]
+
+    def finish_request(self):
+        """Record that a request has been responded to"""
+        with self._lock:
+            self._in_flight -= 1
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Request handler serving the stand-in's routes"""
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Respond to a GET request"""
+                response = stand_in.start_request(urlparse(self.path).path)
+                try:
+                    time.sleep(stand_in.delay)
+                    if isinstance(response, int):
+                        self.send_response(response)
+                        self.end_headers()
+                    else:
+                        body = json.dumps(response).encode()
+                        self.send_response(200)
+                        self.send_header("Content-Type", "application/json")
+                        self.send_header("Content-Length", str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+                finally:
+                    stand_in.finish_request()
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        return Handler
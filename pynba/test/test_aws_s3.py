@@ -0,0 +1,232 @@
+"""Unit tests for the aws_s3 module"""
+
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import boto3
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from moto import mock_aws
+
+from pynba import aws_s3
+from pynba.aws_s3 import S3File, S3Cache, sync_directory
+from pynba.config import Config
+
+
+BUCKET = "pynba-test"
+
+
+class MockS3TestCase(unittest.TestCase):
+    """Test case base class, setting up moto's stand-in for AWS S3"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(
+            os.environ,
+            {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing"},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        mock_s3 = mock_aws()
+        mock_s3.start()
+        self.addCleanup(mock_s3.stop)
+        self.client = boto3.client("s3", region_name="us-east-1")
+        self.client.create_bucket(Bucket=BUCKET)
+        patcher = mock.patch.object(aws_s3, "s3_client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.data = bytes(range(256)) * 40
+
+
+class TestS3File(MockS3TestCase):
+    """Test case for S3File"""
+
+    def test_seek_and_read(self):
+        """Test reads match the object's bytes wherever they start and end"""
+        self.client.put_object(Bucket=BUCKET, Key="data", Body=self.data)
+        fileobject = S3File(BUCKET, "data", block_size=1000, readahead_blocks=2)
+        self.assertEqual(fileobject.size, len(self.data))
+        for offset, whence, size, position in [
+            (-8, io.SEEK_END, 8, len(self.data) - 8),
+            (0, io.SEEK_SET, 10, 0),
+            (990, io.SEEK_SET, 20, 990),
+            (3000, io.SEEK_CUR, 2500, 4010),
+            (10_000, io.SEEK_SET, 10, 10_000),
+        ]:
+            self.assertEqual(fileobject.seek(offset, whence), position)
+            self.assertEqual(
+                fileobject.read(size), self.data[position : position + size]
+            )
+        fileobject.seek(5)
+        self.assertEqual(fileobject.read(), self.data[5:])
+
+    def test_block_cache(self):
+        """Test cached blocks aren't fetched again, and blocks are read ahead"""
+        self.client.put_object(Bucket=BUCKET, Key="data", Body=self.data)
+        fileobject = S3File(BUCKET, "data", block_size=1000, readahead_blocks=3)
+        self.assertEqual(fileobject.requests, 1)  # the tail
+        fileobject.read(10)
+        self.assertEqual(fileobject.requests, 2)
+        self.assertEqual(fileobject.bytes_fetched, 1000 + 3000)
+        fileobject.seek(2500)
+        fileobject.read(10)
+        fileobject.seek(-100, io.SEEK_END)
+        fileobject.read()
+        self.assertEqual(fileobject.requests, 2)
+
+    def test_small_object(self):
+        """Test an object smaller than a block is fetched in one request"""
+        self.client.put_object(Bucket=BUCKET, Key="small", Body=b"0123456789")
+        fileobject = S3File(BUCKET, "small", block_size=1000)
+        self.assertEqual(fileobject.read(), b"0123456789")
+        self.assertEqual(fileobject.requests, 1)
+
+    def test_missing_key(self):
+        """Test a missing key raises FileNotFoundError"""
+        with self.assertRaises(FileNotFoundError):
+            S3File(BUCKET, "missing")
+
+    def test_parquet_columns(self):
+        """Test reading a subset of a parquet file's columns fetches a subset"""
+        n_columns = 10
+        table = pa.table(
+            {
+                f"column{ind}": np.random.default_rng(ind).random(50_000)
+                for ind in range(n_columns)
+            }
+        )
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer, compression="none")
+        self.client.put_object(Bucket=BUCKET, Key="table", Body=buffer.getvalue())
+
+        fileobject = S3File(BUCKET, "table", block_size=2**16, readahead_blocks=1)
+        result = pq.read_table(fileobject, columns=["column3"], pre_buffer=False)
+        self.assertTrue(result.equals(table.select(["column3"])))
+        self.assertLess(
+            fileobject.bytes_fetched, 2 * len(buffer.getvalue()) / n_columns
+        )
+
+
+class TestS3Cache(MockS3TestCase):
+    """Test case for S3Cache"""
+
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache = S3Cache(tmp_dir.name, max_bytes=2 * len(self.data))
+
+    def _read(self, key):
+        with open(self.cache.filepath(BUCKET, key), "rb") as cached_file:
+            return cached_file.read()
+
+    def test_hits_and_misses(self):
+        """Test unchanged objects are hits, and changed objects are misses"""
+        self.client.put_object(Bucket=BUCKET, Key="data", Body=self.data)
+        self.assertEqual(self._read("data"), self.data)
+        self.assertEqual(self._read("data"), self.data)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        self.client.put_object(Bucket=BUCKET, Key="data", Body=b"changed")
+        self.assertEqual(self._read("data"), b"changed")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+        self.assertEqual(self.cache.bytes_downloaded, len(self.data) + 7)
+        object_dir = os.path.dirname(self.cache.filepath(BUCKET, "data"))
+        self.assertEqual(len(os.listdir(object_dir)), 1)
+
+    def test_max_age(self):
+        """Test copies checked within max_age are used without a request"""
+        self.cache.max_age = 60
+        self.client.put_object(Bucket=BUCKET, Key="data", Body=self.data)
+        self.assertEqual(self._read("data"), self.data)
+        self.client.put_object(Bucket=BUCKET, Key="data", Body=b"changed")
+        with mock.patch.object(
+            self.client, "get_object", wraps=self.client.get_object
+        ) as get_object:
+            self.assertEqual(self._read("data"), self.data)
+            get_object.assert_not_called()
+            os.utime(self.cache.filepath(BUCKET, "data"), (0, 0))
+            self.assertEqual(self._read("data"), b"changed")
+            get_object.assert_called_once()
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+
+    def test_eviction(self):
+        """Test the least recently checked copies are evicted"""
+        for key in ["a", "b", "c"]:
+            self.client.put_object(Bucket=BUCKET, Key=key, Body=self.data)
+        paths = {key: self.cache.filepath(BUCKET, key) for key in ["a", "b"]}
+        os.utime(paths["a"], (0, 0))
+        self.cache.filepath(BUCKET, "b")
+        self.cache.filepath(BUCKET, "c")
+        self.assertFalse(os.path.exists(paths["a"]))
+        self.assertTrue(os.path.exists(paths["b"]))
+
+    def test_missing_key(self):
+        """Test a missing key raises FileNotFoundError"""
+        with self.assertRaises(FileNotFoundError):
+            self.cache.filepath(BUCKET, "missing")
+
+
+class TestSyncDirectory(MockS3TestCase):
+    """Test case for sync_directory"""
+
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.directory = tmp_dir.name
+        # the smallest part AWS S3 allows
+        self.chunksize = 5 * 2**20
+        patcher = mock.patch.object(
+            Config, "aws_s3_multipart_chunksize", self.chunksize
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.files = {
+            "small": self.data,
+            "seasons/large": bytes(self.chunksize + 1000),
+            "cache/excluded": self.data,
+        }
+        for relpath, data in self.files.items():
+            self._write(relpath, data)
+
+    def _write(self, relpath, data):
+        filepath = os.path.join(self.directory, relpath)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "wb") as file:
+            file.write(data)
+
+    def _sync(self):
+        return sync_directory(self.directory, BUCKET, "prefix", exclude=["cache/*"])
+
+    def test_uploads_changed(self):
+        """Test only new & changed files are uploaded, in parts if large"""
+        summary = self._sync()
+        self.assertEqual(summary.files_uploaded, 2)
+        self.assertEqual(summary.bytes_uploaded, len(self.data) + self.chunksize + 1000)
+        for relpath in ["small", "seasons/large"]:
+            response = self.client.get_object(Bucket=BUCKET, Key=f"prefix/{relpath}")
+            self.assertEqual(response["Body"].read(), self.files[relpath])
+        response = self.client.head_object(Bucket=BUCKET, Key="prefix/seasons/large")
+        self.assertTrue(response["ETag"].strip('"').endswith("-2"))
+        keys = [
+            obj["Key"] for obj in self.client.list_objects_v2(Bucket=BUCKET)["Contents"]
+        ]
+        self.assertNotIn("prefix/cache/excluded", keys)
+
+        summary = self._sync()
+        self.assertEqual((summary.files_uploaded, summary.files_skipped), (0, 2))
+        self.assertEqual(summary.bytes_skipped, len(self.data) + self.chunksize + 1000)
+
+        # same size, different contents
+        self._write("small", bytes(len(self.data)))
+        summary = self._sync()
+        self.assertEqual((summary.files_uploaded, summary.files_skipped), (1, 1))
+        self.assertEqual(summary.bytes_uploaded, len(self.data))
+
+
+if __name__ == "__main__":
+    unittest.main()
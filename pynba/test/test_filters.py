@@ -0,0 +1,62 @@
+"""Unit tests for the filters module"""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from pynba.filters import TIMESTAMP, build_filter, read_table
+
+
+class TestReadTable(unittest.TestCase):
+    """Test case for reading parquet files with filters from build_filter"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "season.parquet")
+        self.season = pd.DataFrame(
+            {
+                "date": pd.date_range("2019-10-22", periods=40).repeat(5),
+                "home_team_id": [1, 2] * 100,
+            }
+        )
+
+    def test_date_row_groups(self):
+        """Test a date filter skips row groups by their statistics"""
+        self.season.to_parquet(self.path, index=False, row_group_size=50)
+        fragment = next(ds.dataset(self.path).get_fragments())
+        date_filter = build_filter(date_range=("2019-11-30", None))
+        self.assertEqual(len(fragment.split_by_row_group(date_filter)), 1)
+        result = read_table(self.path, filter_expression=date_filter).to_pandas()
+        pd.testing.assert_frame_equal(
+            result, self.season[-5:].reset_index(drop=True), check_dtype=False
+        )
+
+    def test_string_dates(self):
+        """Test string dates, as in older files, are parsed, then filtered"""
+        self.season.assign(date=self.season["date"].dt.strftime("%Y-%m-%d")).to_parquet(
+            self.path, index=False
+        )
+        expected = self.season[
+            (self.season["date"] <= "2019-10-23") & (self.season["home_team_id"] == 2)
+        ]
+        result = read_table(
+            self.path,
+            ["date"],
+            build_filter(
+                team_ids=[2],
+                team_columns=["home_team_id"],
+                date_range=(None, "2019-10-23"),
+            ),
+        ).to_pandas()
+        pd.testing.assert_frame_equal(
+            result, expected[["date"]].reset_index(drop=True), check_dtype=False
+        )
+        self.assertEqual(read_table(self.path).schema.field("date").type, TIMESTAMP)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Unit tests for the game_id module"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from pynba.game_id import (
+    league_from_game_id,
+    parse_game_ids,
+    season_type_from_game_id,
+    year_from_game_id,
+)
+
+
+GAME_IDS = ["0021900001", "0041900101", "1022100003", "0029900002", "0052000121"]
+
+
+class TestParseGameIds(unittest.TestCase):
+    """Test case for parsing many game_ids at once"""
+
+    def test_matches_single(self):
+        """Parsing a column agrees with parsing each game_id"""
+        game_ids = pd.Series(GAME_IDS * 2, index=np.arange(10) * 2)
+        for values in [
+            game_ids,
+            game_ids.astype("category"),
+            game_ids.astype("string"),
+        ]:
+            with self.subTest(dtype=values.dtype):
+                parsed = parse_game_ids(values)
+                self.assertListEqual(list(parsed.index), list(game_ids.index))
+                self.assertListEqual(
+                    list(parsed["league"]), list(game_ids.map(league_from_game_id))
+                )
+                self.assertListEqual(
+                    list(parsed["year"]), list(game_ids.map(year_from_game_id))
+                )
+                self.assertListEqual(
+                    list(parsed["season_type"]),
+                    list(game_ids.map(season_type_from_game_id)),
+                )
+                self.assertEqual(parsed["year"].dtype, np.int16)
+                self.assertIsInstance(parsed["league"].dtype, pd.CategoricalDtype)
+
+    def test_arrow(self):
+        """Arrow arrays parse like Series"""
+        pd.testing.assert_frame_equal(
+            parse_game_ids(pa.array(GAME_IDS)), parse_game_ids(pd.Series(GAME_IDS))
+        )
+
+    def test_invalid(self):
+        """Every invalid game_id is reported at once"""
+        for game_ids, message in [
+            (
+                GAME_IDS + ["2021900001", "3021900001"],
+                "2 game_ids have unrecognized prefix",
+            ),
+            (GAME_IDS + ["0091900001"], "1 game_ids have unrecognized third digit"),
+            (GAME_IDS + ["002ab00001", "002"], "2 game_ids have unrecognized year"),
+        ]:
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(ValueError, message):
+                    parse_game_ids(game_ids)
+        with self.assertRaisesRegex(ValueError, "missing"):
+            parse_game_ids(pd.Series(GAME_IDS + [None]))
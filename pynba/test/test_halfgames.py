@@ -0,0 +1,176 @@
+"""Unit tests for the halfgames module"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from pynba import halfgames as halfgames_module
+from pynba.config import Config
+from pynba.constants import LOCAL
+from pynba.parse_pbpstats_possessions import COUNTER_COLUMNS
+from pynba.possessions import save_possessions, _partition_location
+from pynba.schemas import HALFGAMES_SCHEMA, POSSESSIONS_SCHEMA, apply_schema
+from pynba.scripts import create_possessions as create_possessions_script
+from pynba.halfgames import (
+    halfgames_from_file,
+    halfgames_from_possessions,
+    update_halfgames,
+    _aggregate,
+    _aggregate_with_groupby,
+)
+
+
+def _possessions(n_games, n_possessions, seed=0):
+    """Shuffled possessions of games between random teams"""
+    rng = np.random.default_rng(seed)
+    n_rows = n_games * n_possessions
+    game_nums = np.repeat(np.arange(n_games), n_possessions)
+    home_team_ids = rng.integers(1, 30, n_games)[game_nums]
+    is_home = rng.integers(0, 2, n_rows).astype(bool)
+    possessions = pd.DataFrame(
+        {
+            **{column: rng.integers(0, 3, n_rows) for column in COUNTER_COLUMNS},
+            "duration": rng.uniform(0, 24, n_rows),
+            "off_team_id": np.where(is_home, home_team_ids, home_team_ids + 100),
+            "def_team_id": np.where(is_home, home_team_ids + 100, home_team_ids),
+            "period": rng.integers(1, 5, n_rows),
+            "possession_num": np.tile(np.arange(n_possessions), n_games),
+            "game_id": [f"{ind:010d}" for ind in game_nums[::-1]],
+            "date": pd.Timestamp("2019-01-01")
+            + pd.to_timedelta(game_nums // 10, unit="D"),
+            "home_team_id": home_team_ids,
+            "league": "nba",
+            "year": 2019,
+            "season_type": "Regular Season",
+        }
+    )
+    possessions = apply_schema(possessions, POSSESSIONS_SCHEMA)
+    return possessions.sample(frac=1, random_state=seed, ignore_index=True)
+
+
+class TestHalfgames(unittest.TestCase):
+    """Test case for aggregating possessions into halfgames"""
+
+    def test_matches_groupby(self):
+        """Test the single pass aggregation matches Pandas' groupby"""
+        possessions = _possessions(n_games=50, n_possessions=20)
+        result, expected = [
+            apply_schema(aggregate(possessions), HALFGAMES_SCHEMA)
+            .sort_values(["game_id", "off_team_id"])
+            .reset_index(drop=True)
+            for aggregate in [_aggregate, _aggregate_with_groupby]
+        ]
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_rates(self):
+        """Test rates are calculated per halfgame, undefined without attempts"""
+        possessions = _possessions(n_games=2, n_possessions=10)
+        possessions["threes_attempted"] = 0
+        possessions["threes_made"] = 0
+        halfgames = halfgames_from_possessions(possessions)
+        self.assertEqual(len(halfgames), 4)
+        self.assertTrue(halfgames["three_make_rate"].isna().all())
+        self.assertTrue((halfgames["three_attempt_rate"] == 0).all())
+        expected = halfgames["points_scored"] / halfgames["possession_num"]
+        np.testing.assert_allclose(halfgames["scoring_rate"], expected)
+
+    def test_empty(self):
+        """Test no possessions make no halfgames"""
+        possessions = _possessions(n_games=1, n_possessions=1).iloc[:0]
+        halfgames = halfgames_from_possessions(possessions)
+        self.assertTrue(halfgames.empty)
+        self.assertIn("scoring_rate_est", halfgames.columns)
+
+
+class TestHalfgamesStore(unittest.TestCase):
+    """Test case for saving, updating and loading halfgames"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        for name, value in [
+            ("local_data_directory", tmp_dir.name),
+            ("halfgames_directory", "halfgames"),
+            ("halfgames_source", LOCAL),
+        ]:
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.season = ("nba", 2019, "Regular Season")
+        self.halfgames = halfgames_from_possessions(
+            _possessions(n_games=4, n_possessions=10)
+        )
+
+    def test_update(self):
+        """Test updating adds new games and replaces those already on file"""
+        games = self.halfgames["game_id"].unique()
+        update_halfgames(self.halfgames[self.halfgames["game_id"].isin(games[:3])])
+        replacement = self.halfgames[self.halfgames["game_id"].isin(games[2:])].copy()
+        replacement["points_scored"] = 1000
+        result = update_halfgames(replacement)
+        self.assertEqual(len(result), len(self.halfgames))
+        replaced = result["game_id"].isin(games[2:])
+        self.assertTrue((result.loc[replaced, "points_scored"] == 1000).all())
+        self.assertTrue((result.loc[~replaced, "points_scored"] < 1000).all())
+
+        with mock.patch.object(halfgames_module, "possessions_from_file") as load:
+            pd.testing.assert_frame_equal(halfgames_from_file(*self.season), result)
+            load.assert_not_called()
+
+    def test_not_on_file(self):
+        """Test halfgames are aggregated from possessions when not on file"""
+        with mock.patch.object(
+            halfgames_module, "possessions_from_file", side_effect=FileNotFoundError
+        ):
+            with self.assertRaises(FileNotFoundError):
+                halfgames_from_file(*self.season)
+            result = update_halfgames(self.halfgames)
+        pd.testing.assert_frame_equal(result, self.halfgames)
+        filenames = os.listdir(os.path.join(Config.local_data_directory, "halfgames"))
+        self.assertEqual(filenames, ["nba_2019_Regular Season_halfgames.parquet"])
+
+    def test_dropped_games(self):
+        """Test halfgames of games no longer in the season's possessions are dropped"""
+        possessions = _possessions(n_games=4, n_possessions=10)
+        possessions["away_team_id"] = possessions["home_team_id"] + 100
+        games = sorted(possessions["game_id"].unique())
+        with mock.patch.object(Config, "possessions_source", LOCAL):
+            save_possessions(possessions)
+            update_halfgames(halfgames_from_possessions(possessions))
+            # the season's possessions rebuilt without its last game
+            shutil.rmtree(_partition_location(LOCAL, *self.season))
+            save_possessions(possessions[possessions["game_id"].isin(games[:3])])
+            result = update_halfgames(
+                self.halfgames[self.halfgames["game_id"] == games[0]]
+            )
+        self.assertEqual(sorted(result["game_id"].unique()), games[:3])
+        pd.testing.assert_frame_equal(halfgames_from_file(*self.season), result)
+
+    def test_rebuilt_possessions(self):
+        """Test rebuilding a season's possessions updates its halfgames on file"""
+        update_halfgames(self.halfgames)
+        possessions = _possessions(n_games=4, n_possessions=10, seed=1)
+        with mock.patch.multiple(
+            create_possessions_script,
+            season_from_file=mock.DEFAULT,
+            save_possessions=mock.DEFAULT,
+            possessions_from_season=mock.Mock(return_value=possessions),
+        ):
+            create_possessions_script.create_possessions(*self.season)
+        result = halfgames_from_file(*self.season)
+        self.assertEqual(len(result), len(self.halfgames))
+        self.assertEqual(
+            result["points_scored"].sum(), possessions["points_scored"].sum()
+        )
+        self.assertNotEqual(
+            result["points_scored"].sum(), self.halfgames["points_scored"].sum()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Unit tests for the time taken to import pynba"""
+
+import ast
+import importlib
+import inspect
+import unittest
+
+import pynba
+from pynba.benchmarks.import_time import HEAVY_MODULES, import_times
+
+
+# generous, since it's wall time on whatever machine runs the tests
+IMPORT_TIME_BUDGET = 3
+
+
+class TestImportTime(unittest.TestCase):
+    """Test case for importing pynba lazily"""
+
+    def test_budget(self):
+        """Importing data loading functions is quick, and doesn't import PyMC3 etc."""
+        _, total, modules = import_times()
+        self.assertLess(total, IMPORT_TIME_BUDGET)
+        self.assertIn("pynba.possessions", modules)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_introspection(self):
+        """Loading every public function, e.g. by introspection, doesn't import PyMC3"""
+        _, _, modules = import_times(
+            "import pynba; [getattr(pynba, name) for name in dir(pynba)]"
+        )
+        self.assertIn("pynba.simulate", modules)
+        for module in ["pymc3", "theano", "arviz"]:
+            self.assertNotIn(module, modules)
+
+    def test_api(self):
+        """The lazily loaded API is each module's __all__"""
+        api_modules = pynba._API_MODULES  # pylint: disable=protected-access
+        for module, names in api_modules.items():
+            with self.subTest(module=module):
+                self.assertCountEqual(
+                    names, importlib.import_module(f"pynba.{module}").__all__
+                )
+        self.assertIn("season_from_file", dir(pynba))
+        with self.assertRaises(AttributeError):
+            pynba.not_a_function  # pylint: disable=pointless-statement
+
+    def test_type_checking_imports(self):
+        """The API's static imports, for pylint etc., match the lazily loaded API"""
+        tree = ast.parse(inspect.getsource(pynba))
+        (block,) = [
+            node
+            for node in tree.body
+            if isinstance(node, ast.If) and ast.unparse(node.test) == "TYPE_CHECKING"
+        ]
+        imported = {
+            alias.name: node.module.removeprefix("pynba.")
+            for node in block.body
+            for alias in node.names
+        }
+        self.assertEqual(imported, pynba._API)  # pylint: disable=protected-access
@@ -0,0 +1,64 @@
+"""Unit tests for the meta_config module"""
+
+import unittest
+from unittest import mock
+
+from pynba.meta_config import AbstractConfig
+
+
+class _Settings(dict):
+    """Stand-in for Dynaconf settings, counting lookups"""
+
+    lookups = 0
+    reloaded = None
+
+    def __getitem__(self, key):
+        self.lookups += 1
+        return super().__getitem__(key)
+
+    def reload(self):
+        """Updates the settings, like new environment variables would"""
+        self.update(self.reloaded or {})
+
+
+class _Config(AbstractConfig):  # pylint: disable=too-few-public-methods
+    number: int
+    name: str
+
+
+class TestMetaConfig(unittest.TestCase):
+    """Test case for typed config snapshots"""
+
+    def test_snapshot(self):
+        """Fields are coerced to their types, and only looked up once"""
+        settings = _Settings(number="3", name="nba")
+        config = _Config(settings)
+        for _ in range(3):
+            self.assertEqual(config.number, 3)
+            self.assertEqual(config.name, "nba")
+        self.assertEqual(settings.lookups, 2)
+        self.assertFalse(hasattr(config, "__dict__"))
+
+    def test_immutable(self):
+        """Fields can't be changed, except by reloading"""
+        settings = _Settings(number=3, name="nba")
+        config = _Config(settings)
+        with self.assertRaises(AttributeError):
+            config.number = 4
+        settings.reloaded = {"number": 4}
+        config.reload()
+        self.assertEqual(config.number, 4)
+
+    def test_invalid(self):
+        """Missing or mistyped fields fail when loaded"""
+        with self.assertRaisesRegex(ValueError, "number"):
+            _Config(_Settings(number="three", name="nba"))
+        with self.assertRaisesRegex(ValueError, "name"):
+            _Config(_Settings(number=3))
+
+    def test_patch(self):
+        """Fields can be patched on the class, e.g. in tests"""
+        config = _Config(_Settings(number=3, name="nba"))
+        with mock.patch.object(_Config, "name", "wnba"):
+            self.assertEqual(config.name, "wnba")
+        self.assertEqual(config.name, "nba")
@@ -0,0 +1,155 @@
+"""Unit tests for the parse_pbpstats_possessions module"""
+
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from pbpstats.resources.enhanced_pbp import FieldGoal, FreeThrow, Rebound, Turnover
+
+from pynba.parse_pbpstats_possessions import (
+    PossessionsBuilder,
+    parse_possession,
+    GAME_COLUMNS,
+)
+
+
+class _FieldGoal(FieldGoal):  # pylint: disable=abstract-method
+    is_made = shot_value = None
+
+
+class _FreeThrow(FreeThrow):  # pylint: disable=abstract-method
+    is_made = shot_value = is_technical_ft = None
+
+
+_FreeThrow.__abstractmethods__ = frozenset()
+
+
+class _Foul:  # pylint: disable=too-few-public-methods
+    pass
+
+
+class _Rebound(Rebound):  # pylint: disable=abstract-method
+    is_real_rebound = oreb = None
+
+
+class _Turnover(Turnover):  # pylint: disable=abstract-method
+    is_no_turnover = None
+
+
+def _event(cls, current_players=None, **attrs):
+    event = cls()
+    event.current_players = current_players
+    for name, value in attrs.items():
+        setattr(event, name, value)
+    return event
+
+
+def _possession(off_team_id, def_team_id, start_time, margin, events, *, n_def=5):
+    events[0].current_players = {
+        off_team_id: [off_team_id * 10 + ind for ind in range(5)],
+        def_team_id: [def_team_id * 10 + ind for ind in range(n_def)],
+    }
+    return SimpleNamespace(
+        offense_team_id=off_team_id,
+        period=1,
+        start_time=start_time,
+        end_time="11:30",
+        start_score_margin=margin,
+        events=events,
+    )
+
+
+def _possessions():
+    return [
+        _possession(
+            1,
+            2,
+            "12:00",
+            0,
+            [
+                _event(_FieldGoal, is_made=False, shot_value=3),
+                _event(_Rebound, is_real_rebound=True, oreb=True),
+                _event(_FieldGoal, is_made=True, shot_value=2),
+            ],
+        ),
+        _possession(
+            2,
+            1,
+            "11:45.5",
+            -2,
+            [
+                _event(_FreeThrow, is_made=True, shot_value=1, is_technical_ft=False),
+                _event(_FreeThrow, is_made=True, shot_value=1, is_technical_ft=True),
+                _event(_Turnover, is_no_turnover=False),
+                _event(_Foul),
+            ],
+        ),
+    ]
+
+
+def _game_values(game_id):
+    values = {column: column for column in GAME_COLUMNS}
+    values["game_id"] = game_id
+    return values
+
+
+class TestPossessionsBuilder(unittest.TestCase):
+    """Test case for PossessionsBuilder"""
+
+    def test_matches_dict_path(self):
+        """Test the builder produces the same values as parse_possession"""
+        possessions = _possessions()
+        expected = pd.DataFrame(parse_possession(poss) for poss in possessions)
+        builder = PossessionsBuilder()
+        builder.append_game(possessions, **_game_values("0021900001"))
+        result = builder.to_frame()
+        self.assertEqual(
+            list(result.columns),
+            list(expected.columns) + ["possession_num"] + GAME_COLUMNS,
+        )
+        pd.testing.assert_frame_equal(
+            result[expected.columns], expected, check_dtype=False
+        )
+        self.assertEqual(result["points_scored"].tolist(), [2, 1])
+        self.assertEqual(result["off_rebs"].tolist(), [1, 0])
+        self.assertEqual(result["turnovers"].tolist(), [0, 1])
+        self.assertEqual(result["ft_attempted"].tolist(), [0, 1])
+
+    def test_dtypes(self):
+        """Test columns use compact dtypes"""
+        builder = PossessionsBuilder()
+        builder.append_game(_possessions(), **_game_values("0021900001"))
+        dtypes = builder.to_frame().dtypes
+        self.assertEqual(dtypes["off_team_id"], np.int32)
+        self.assertEqual(dtypes["def_player4"], np.int32)
+        self.assertEqual(dtypes["start_time"], np.float32)
+        self.assertEqual(dtypes["threes_made"], np.uint8)
+
+    def test_many_games(self):
+        """Test game columns and possession numbers across games and regrowth"""
+        builder = PossessionsBuilder(capacity=1)
+        for game_id in ["a", "b", "c"]:
+            builder.append_game(_possessions(), **_game_values(game_id))
+        result = builder.to_frame()
+        self.assertEqual(len(builder), 6)
+        self.assertEqual(result["game_id"].tolist(), ["a", "a", "b", "b", "c", "c"])
+        self.assertEqual(result["possession_num"].tolist(), [0, 1, 0, 1, 0, 1])
+        self.assertEqual(builder.to_arrow().num_rows, 6)
+
+    def test_missing_players(self):
+        """Test missing players are null"""
+        possessions = [
+            _possession(
+                1, 2, "12:00", 0, [_event(_Turnover, is_no_turnover=True)], n_def=4
+            )
+        ]
+        builder = PossessionsBuilder()
+        builder.append_game(possessions, **_game_values("a"))
+        result = builder.to_frame()
+        self.assertTrue(pd.isna(result["def_player4"].iloc[0]))
+        self.assertEqual(result["def_player3"].iloc[0], 23)
+
+
+if __name__ == "__main__":
+    unittest.main()
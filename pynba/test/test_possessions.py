@@ -0,0 +1,302 @@
+"""Unit tests for the possessions module"""
+
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from pynba import load_pbpstats
+from pynba.config import Config
+from pynba.constants import LOCAL, S3, THREAD
+from pynba.parse_pbpstats_possessions import GAME_COLUMNS, PLAYER_COLUMNS
+from pynba.schemas import POSSESSIONS_SCHEMA, apply_schema
+from pynba.possessions import (
+    possessions_from_file,
+    possessions_from_season,
+    possessions_manifest,
+    save_possessions,
+    _possessions_filepath,
+    _partition_location,
+)
+from pynba.test.test_aws_s3 import BUCKET, MockS3TestCase
+from pynba.test.test_parse_pbpstats_possessions import (
+    _possessions as _pbpstats_possessions,
+)
+
+
+def _possessions(game_ids, n_possessions=3):
+    rows = []
+    for game_id in game_ids:
+        for possession_num in range(n_possessions):
+            home_team_id = int(game_id)
+            row = {
+                "off_team_id": home_team_id + possession_num % 2,
+                "def_team_id": home_team_id + 1 - possession_num % 2,
+                "period": 1 + possession_num // 2,
+                "points_scored": possession_num,
+                **{column: 10 + ind for ind, column in enumerate(PLAYER_COLUMNS)},
+                "possession_num": possession_num,
+                "game_id": game_id,
+                "date": f"2019-01-{game_id[-2:]}",
+                "home_team_id": home_team_id,
+                "away_team_id": home_team_id + 1,
+                "status": "Final",
+                "league": "nba",
+                "year": 2019,
+                "season_type": "Regular Season",
+            }
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+class TestPossessionsStore(unittest.TestCase):
+    """Test case for saving and loading possessions, partitioned by game"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        for name, value in [
+            ("local_data_directory", tmp_dir.name),
+            ("possessions_directory", "possessions"),
+            ("possessions_source", LOCAL),
+        ]:
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        os.makedirs(os.path.join(tmp_dir.name, "possessions"))
+        self.season = ("nba", 2019, "Regular Season")
+
+    def test_round_trip(self):
+        """Test saved possessions load back the same"""
+        possessions = _possessions(["002", "001"])
+        save_possessions(possessions)
+        result = possessions_from_file(*self.season)
+        expected = apply_schema(
+            possessions.sort_values(
+                by=["game_id", "possession_num"], ignore_index=True
+            ),
+            POSSESSIONS_SCHEMA,
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_append_only(self):
+        """Test saving new games leaves earlier games' files untouched"""
+        save_possessions(_possessions(["001", "002"]))
+        partition = _partition_location(LOCAL, *self.season)
+        earlier_file = os.path.join(partition, "001.parquet")
+        mtime = os.stat(earlier_file).st_mtime_ns
+
+        save_possessions(_possessions(["003"], n_possessions=5))
+        self.assertEqual(os.stat(earlier_file).st_mtime_ns, mtime)
+        manifest = possessions_manifest(*self.season)
+        self.assertEqual(manifest["game_id"].tolist(), ["001", "002", "003"])
+        self.assertEqual(manifest["num_rows"].tolist(), [3, 3, 5])
+        self.assertEqual(len(possessions_from_file(*self.season)), 11)
+
+    def test_subset(self):
+        """Test loading only some games"""
+        save_possessions(_possessions(["001", "002", "003"]))
+        result = possessions_from_file(*self.season, game_ids=["003", "001", "004"])
+        self.assertEqual(result["game_id"].unique().tolist(), ["001", "003"])
+        empty = possessions_from_file(*self.season, game_ids=[])
+        self.assertTrue(empty.empty)
+        self.assertIn("off_team_id", empty.columns)
+
+    def test_filters(self):
+        """Test loading only some columns, games and periods"""
+        save_possessions(_possessions(["001", "002", "003"]))
+        result = possessions_from_file(
+            *self.season,
+            columns=["game_id", "points_scored", "league"],
+            team_ids=[2, 3],
+            date_range=("2019-01-02", None),
+            periods=[1],
+        )
+        self.assertEqual(list(result.columns), ["game_id", "points_scored", "league"])
+        self.assertEqual(result["game_id"].tolist(), ["002", "002", "003", "003"])
+        self.assertEqual(result["points_scored"].tolist(), [0, 1, 0, 1])
+
+        result = possessions_from_file(*self.season, date_range=(None, "2019-01-02"))
+        self.assertEqual(result["game_id"].unique().tolist(), ["001", "002"])
+
+    def test_period_row_groups(self):
+        """Test each period is written to its own row group"""
+        save_possessions(_possessions(["001"], n_possessions=5))
+        path = os.path.join(_partition_location(LOCAL, *self.season), "001.parquet")
+        metadata = pq.ParquetFile(path).metadata
+        self.assertEqual(metadata.num_row_groups, 3)
+        period = metadata.schema.names.index("period")
+        statistics = metadata.row_group(1).column(period).statistics
+        self.assertEqual((statistics.min, statistics.max), (2, 2))
+
+    def test_compaction(self):
+        """Test games are compacted into one file once there are enough files"""
+        partition = _partition_location(LOCAL, *self.season)
+        with mock.patch.object(Config, "possessions_compact_parts", 3):
+            save_possessions(_possessions(["001", "002"]))
+            self.assertCountEqual(
+                os.listdir(partition),
+                ["_manifest.parquet", "001.parquet", "002.parquet"],
+            )
+            save_possessions(_possessions(["003"]))
+            self.assertCountEqual(
+                os.listdir(partition), ["_manifest.parquet", "_compacted.parquet"]
+            )
+            save_possessions(_possessions(["002"], n_possessions=5))
+        manifest = possessions_manifest(*self.season)
+        self.assertEqual(
+            manifest["file"].tolist(),
+            ["_compacted.parquet", "002.parquet", "_compacted.parquet"],
+        )
+        self.assertEqual(manifest["num_rows"].tolist(), [3, 5, 3])
+
+        expected = pd.concat(
+            [
+                _possessions(["001"]),
+                _possessions(["002"], n_possessions=5),
+                _possessions(["003"]),
+            ],
+            ignore_index=True,
+        )
+        pd.testing.assert_frame_equal(
+            possessions_from_file(*self.season),
+            apply_schema(expected, POSSESSIONS_SCHEMA),
+        )
+        result = possessions_from_file(
+            *self.season, columns=["game_id", "possession_num"], periods=[2]
+        )
+        self.assertEqual(result["game_id"].tolist(), ["001", "002", "002", "003"])
+
+    def test_legacy_file(self):
+        """Test a single file per season is read, then moved into partitions"""
+        _possessions(["001", "002"]).to_parquet(_possessions_filepath(*self.season))
+        self.assertEqual(len(possessions_from_file(*self.season)), 6)
+        result = possessions_from_file(*self.season, team_ids=[3], columns=["period"])
+        self.assertEqual(result["period"].tolist(), [1, 1, 2])
+
+        save_possessions(_possessions(["002", "003"], n_possessions=4))
+        manifest = possessions_manifest(*self.season)
+        self.assertEqual(manifest["game_id"].tolist(), ["001", "002", "003"])
+        self.assertEqual(manifest["num_rows"].tolist(), [3, 4, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestPossessionsFromS3(MockS3TestCase):
+    """Test case for loading possessions from AWS S3"""
+
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        for name, value in [
+            ("local_data_directory", tmp_dir.name),
+            ("possessions_directory", "possessions"),
+            ("possessions_source", LOCAL),
+            ("aws_s3_bucket", BUCKET),
+            ("aws_s3_key_prefix", "test"),
+        ]:
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.season = ("nba", 2019, "Regular Season")
+
+    def _upload_season(self, possessions):
+        save_possessions(possessions)
+        partition = _partition_location(LOCAL, *self.season)
+        sizes = {}
+        for filename in os.listdir(partition):
+            key = f"{_partition_location(S3, *self.season)}/{filename}"
+            with open(os.path.join(partition, filename), "rb") as file:
+                self.client.put_object(Bucket=BUCKET, Key=key, Body=file)
+            sizes[key] = os.path.getsize(os.path.join(partition, filename))
+        return sizes
+
+    def test_ranged_columns(self):
+        """Test a subset of columns is read with ranged GETs, not whole objects"""
+        rng = np.random.default_rng(0)
+        possessions = _possessions(["001"], n_possessions=30_000)
+        # a few row groups, like a game's periods
+        possessions["period"] = 1 + np.arange(len(possessions)) * 4 // len(possessions)
+        for column in PLAYER_COLUMNS:
+            possessions[column] = rng.integers(0, 2**30, len(possessions))
+        sizes = self._upload_season(possessions)
+        game_key = f"{_partition_location(S3, *self.season)}/001.parquet"
+
+        with mock.patch.object(Config, "possessions_source", S3), mock.patch.object(
+            self.client, "get_object", wraps=self.client.get_object
+        ) as get_object:
+            result = possessions_from_file(
+                *self.season, columns=["possession_num", PLAYER_COLUMNS[0]]
+            )
+        np.testing.assert_array_equal(
+            result[PLAYER_COLUMNS[0]], possessions[PLAYER_COLUMNS[0]]
+        )
+        game_ranges = [
+            call.kwargs.get("Range")
+            for call in get_object.call_args_list
+            if call.kwargs["Key"] == game_key
+        ]
+        self.assertTrue(game_ranges)
+        self.assertNotIn(None, game_ranges)
+        fetched = 0
+        for byte_range in game_ranges:
+            start, stop = byte_range.removeprefix("bytes=").split("-")
+            fetched += int(stop) - int(start) + 1 if start else int(stop)
+        self.assertLess(fetched, sizes[game_key])
+
+
+class TestPossessionsFromSeason(unittest.TestCase):
+    """Test case for parsing a season's possessions from pbpstats"""
+
+    def setUp(self):
+        # more games than PROGRESS_INTERVAL, so they're parsed in chunks
+        self.season = pd.DataFrame(
+            {
+                "game_id": [f"{game:010d}" for game in range(120, 0, -1)],
+                "date": "2019-01-01",
+                "home_team_id": 1,
+                "away_team_id": 2,
+                "status": "Final",
+                "league": "nba",
+                "year": 2019,
+                "season_type": "Regular Season",
+            }
+        )[GAME_COLUMNS]
+
+        def load_game(game_id):
+            if game_id == "0000000007":
+                raise load_pbpstats.StatsNotFound(f"No stats for {game_id}")
+            return types.SimpleNamespace(
+                possessions=types.SimpleNamespace(items=_pbpstats_possessions())
+            )
+
+        patcher = mock.patch.object(load_pbpstats, "load_game", load_game)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_games(self):
+        """Test every game's possessions are parsed, skipping missing games"""
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                possessions = possessions_from_season(
+                    self.season, workers=workers, executor=THREAD
+                )
+                game_ids = sorted(set(self.season["game_id"]) - {"0000000007"})
+                np.testing.assert_array_equal(
+                    possessions["game_id"], np.repeat(game_ids, 2)
+                )
+                np.testing.assert_array_equal(
+                    possessions["possession_num"], np.tile([0, 1], len(game_ids))
+                )
+                np.testing.assert_array_equal(
+                    possessions["off_team_id"], np.tile([1, 2], len(game_ids))
+                )
+                self.assertEqual(possessions["game_id"].dtype, "category")
@@ -0,0 +1,92 @@
+"""Unit tests for the query module"""
+
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from pynba.config import Config
+from pynba.constants import LOCAL
+from pynba.filters import build_filter
+from pynba.possessions import save_possessions
+from pynba.query import partitions_on_file, query
+from pynba.teams import save_teams
+from pynba.test.test_possessions import _possessions
+from pynba.test.test_teams import _teams
+
+
+class TestQuery(unittest.TestCase):
+    """Test case for querying datasets across many seasons"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        for name, value in [
+            ("local_data_directory", tmp_dir.name),
+            ("possessions_directory", "possessions"),
+            ("possessions_source", LOCAL),
+            ("teams_directory", "teams"),
+            ("teams_source", LOCAL),
+        ]:
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for year, game_ids in [(2019, ["001", "002"]), (2020, ["003"])]:
+            save_possessions(_possessions(game_ids).assign(year=year))
+        save_possessions(
+            _possessions(["004"]).assign(league="wnba", season_type="Playoffs")
+        )
+        for league, year in [("nba", 2019), ("nba", 2020), ("wnba", 2019)]:
+            save_teams(_teams(league, year, "Regular Season"), csv=False)
+
+    def test_partitions_on_file(self):
+        """Test partitions and season files are both found"""
+        pd.testing.assert_frame_equal(
+            partitions_on_file("possessions"),
+            pd.DataFrame(
+                {
+                    "league": ["wnba", "nba", "nba"],
+                    "year": [2019, 2020, 2019],
+                    "season_type": ["Playoffs", "Regular Season", "Regular Season"],
+                }
+            ),
+        )
+        self.assertEqual(len(partitions_on_file("teams")), 3)
+
+    def test_possessions(self):
+        """Test partitions are selected, then read with columns and filters"""
+        possessions = query(
+            "possessions",
+            leagues="nba",
+            years=range(2019, 2021),
+            columns=["game_id", "points_scored"],
+            filters=build_filter(periods=[1]),
+        )
+        self.assertEqual(
+            list(possessions.columns),
+            ["game_id", "points_scored", "league", "year", "season_type"],
+        )
+        self.assertEqual(sorted(possessions["game_id"].unique()), ["001", "002", "003"])
+        self.assertEqual(len(possessions), 6)
+        self.assertEqual(sorted(possessions["year"].unique()), [2019, 2020])
+        self.assertIsInstance(possessions["game_id"].dtype, pd.CategoricalDtype)
+
+    def test_teams(self):
+        """Test season files are read like partitions"""
+        teams = query("teams", years=2019, columns=["team"])
+        self.assertEqual(list(teams["league"]), ["wnba"] * 3 + ["nba"] * 3)
+        self.assertEqual(list(teams.columns), ["team", "league", "year", "season_type"])
+
+    def test_no_partitions(self):
+        """Test a query matching nothing is empty"""
+        self.assertTrue(query("teams", season_types="Playoffs").empty)
+
+    def test_unknown_dataset(self):
+        """Test an unknown dataset raises"""
+        with self.assertRaises(ValueError):
+            query("players")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Unit tests for the scheduler module"""
+
+import functools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from pynba import scheduler
+from pynba.scheduler import run_seasons
+
+
+def _record(filepath, failing_year, league, year, season_type):
+    """Job appending the season to a file, failing for failing_year"""
+    if year == failing_year:
+        raise ValueError(f"Failed for {year}")
+    with open(filepath, "a", encoding="utf-8") as seasons_file:
+        seasons_file.write(f"{league} {year} {season_type}\n")
+
+
+class TestRunSeasons(unittest.TestCase):
+    """Test case for running a job per season in a pool of processes"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.filepath = os.path.join(tmp_dir.name, "seasons.txt")
+        self.checkpoint = os.path.join(tmp_dir.name, "checkpoint.yaml")
+        self.season_info = pd.DataFrame(
+            {
+                "league": "nba",
+                "year": [2000, 2001, 2002, 2003],
+                "season_type": "Playoffs",
+            }
+        )
+        patcher = mock.patch.object(
+            scheduler, "season_sizes", return_value=[20, 10, 30, 40]
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _seasons_run(self):
+        with open(self.filepath, encoding="utf-8") as seasons_file:
+            return [int(line.split()[1]) for line in seasons_file]
+
+    def test_longest_first(self):
+        """Test seasons run largest first, and failures don't stop the rest"""
+        failures = run_seasons(
+            functools.partial(_record, self.filepath, 2001),
+            self.season_info,
+            cpu_budget=1,
+            checkpoint=self.checkpoint,
+        )
+        self.assertEqual(list(failures), [("nba", 2001, "Playoffs")])
+        self.assertIsInstance(failures["nba", 2001, "Playoffs"], ValueError)
+        self.assertEqual(self._seasons_run(), [2003, 2002, 2000])
+
+    def test_resume(self):
+        """Test seasons done are skipped when run again, until all are done"""
+        run_seasons(
+            functools.partial(_record, self.filepath, 2001),
+            self.season_info,
+            cpu_budget=1,
+            checkpoint=self.checkpoint,
+        )
+        self.assertTrue(os.path.exists(self.checkpoint))
+        failures = run_seasons(
+            functools.partial(_record, self.filepath, None),
+            self.season_info,
+            cpus_per_season=2,
+            cpu_budget=4,
+            checkpoint=self.checkpoint,
+        )
+        self.assertEqual(failures, {})
+        self.assertEqual(sorted(self._seasons_run()), [2000, 2001, 2002, 2003])
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Unit tests for the schemas module"""
+
+import unittest
+
+import pandas as pd
+
+from pynba.schemas import POSSESSIONS_SCHEMA, SEASON_SCHEMA, apply_schema
+
+
+class TestApplySchema(unittest.TestCase):
+    """Test case for apply_schema"""
+
+    def test_dtypes(self):
+        """Test columns are cast, while columns outside the schema are left alone"""
+        season = pd.DataFrame(
+            {
+                "game_id": ["0021900001", "0021900002"],
+                "date": ["2019-10-22", "2019-10-23T00:00:00"],
+                "home_team_id": [1610612738, 1610612739],
+                "status": ["Final", "Final"],
+                "year": [2020, 2020],
+                "extra": [1.5, 2.5],
+            }
+        )
+        result = apply_schema(season, SEASON_SCHEMA)
+        self.assertEqual(result["game_id"].dtype, "string")
+        self.assertEqual(
+            result["date"].tolist(),
+            [pd.Timestamp("2019-10-22"), pd.Timestamp("2019-10-23")],
+        )
+        self.assertEqual(result["home_team_id"].dtype, "int32")
+        self.assertIsInstance(result["status"].dtype, pd.CategoricalDtype)
+        self.assertEqual(result["year"].dtype, "int16")
+        self.assertEqual(result["extra"].dtype, "float64")
+        self.assertEqual(season["year"].dtype, "int64")
+
+    def test_unused_categories(self):
+        """Test categories left unused, e.g. by filtering, are dropped"""
+        possessions = apply_schema(
+            pd.DataFrame({"game_id": ["a", "a", "b"], "def_player4": [1, 2, None]}),
+            POSSESSIONS_SCHEMA,
+        )
+        self.assertEqual(possessions["def_player4"].dtype, "Int32")
+        result = apply_schema(possessions.iloc[:2], POSSESSIONS_SCHEMA)
+        self.assertEqual(result["game_id"].cat.categories.tolist(), ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
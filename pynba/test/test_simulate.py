@@ -0,0 +1,111 @@
+"""Unit tests for the simulate module"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pynba.simulate import simulate_season
+from pynba.team_info import team_id_to_abb
+from pynba.team_stats import TeamsModel
+from pynba.test.test_team_stats import _halfgames
+
+
+class TestSimulateSeason(unittest.TestCase):
+    """Test case for simulating seasons from a TeamsModel's posterior"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.team_ids = list(team_id_to_abb("nba", 2019))[:4]
+        self.model = TeamsModel(_halfgames(self.team_ids))
+        model = self.model.model
+        test_point = dict(
+            zip(
+                [var.name for var in model.unobserved_RVs],
+                model.fastfn(model.unobserved_RVs)(model.test_point),
+            )
+        )
+        self.model._trace = {  # pylint: disable=protected-access
+            name: value * rng.uniform(0.98, 1.02, (200,) + np.shape(value))
+            for name, value in test_point.items()
+        }
+        # every pair of teams, home & away
+        home_team_ids, away_team_ids = zip(
+            *[
+                (home_team_id, away_team_id)
+                for home_team_id in self.team_ids
+                for away_team_id in self.team_ids
+                if home_team_id != away_team_id
+            ]
+        )
+        self.schedule = pd.DataFrame(
+            {
+                "game_id": [f"{game:010d}" for game in range(100, 112)],
+                "home_team_id": home_team_ids,
+                "away_team_id": away_team_ids,
+            }
+        )
+
+    def test_simulated(self):
+        """Test unplayed games are simulated into plausible standings"""
+        games, standings = simulate_season(
+            self.model, self.schedule, 2500, random_seed=1, playoff_spots=2
+        )
+        self.assertFalse(games["played"].any())
+        self.assertTrue(games["home_win_probability"].between(0, 1).all())
+        self.assertTrue(games["home_points"].between(80, 140).all())
+        self.assertTrue(games["away_points"].between(80, 140).all())
+        np.testing.assert_allclose(standings["wins"] + standings["losses"], 6)
+        np.testing.assert_allclose(standings["wins"].sum(), 12)
+        np.testing.assert_allclose(standings["playoff_odds"].sum(), 2)
+        self.assertTrue(standings["wins"].is_monotonic_decreasing)
+
+    def test_played(self):
+        """Test games the model was fit on keep their actual results"""
+        halfgames = self.model.halfgames
+        schedule = halfgames[
+            halfgames["off_team_id"] == halfgames["home_team_id"]
+        ].rename(columns={"def_team_id": "away_team_id"})
+        games, standings = simulate_season(self.model, schedule, 100, random_seed=1)
+        self.assertTrue(games["played"].all())
+        self.assertTrue(games["home_win_probability"].isin([0, 1]).all())
+        np.testing.assert_array_equal(standings["wins"], standings["wins"].round())
+
+    def test_replayed(self):
+        """Test a season already played is simulated without keep_played"""
+        halfgames = self.model.halfgames
+        schedule = halfgames[
+            halfgames["off_team_id"] == halfgames["home_team_id"]
+        ].rename(columns={"def_team_id": "away_team_id"})
+        games, standings = simulate_season(
+            self.model, schedule, 2500, random_seed=1, keep_played=False
+        )
+        self.assertFalse(games["played"].any())
+        self.assertTrue(games["home_win_probability"].between(0, 1).all())
+        self.assertFalse(games["home_win_probability"].isin([0, 1]).all())
+        np.testing.assert_allclose(standings["wins"].sum(), len(schedule))
+
+    def test_partly_played(self):
+        """Test played games keep their results as the rest are simulated"""
+        halfgames = self.model.halfgames
+        played = halfgames[
+            halfgames["off_team_id"] == halfgames["home_team_id"]
+        ].rename(columns={"def_team_id": "away_team_id"})
+        schedule = pd.concat([played, self.schedule], ignore_index=True)
+        games, standings = simulate_season(self.model, schedule, 2500, random_seed=1)
+        np.testing.assert_array_equal(
+            games["played"], np.arange(len(schedule)) < len(played)
+        )
+        self.assertTrue(games["home_win_probability"][: len(played)].isin([0, 1]).all())
+        self.assertTrue(games["home_points"][len(played) :].between(80, 140).all())
+        np.testing.assert_allclose(standings["wins"].sum(), len(schedule))
+
+    def test_unknown_team(self):
+        """Test a schedule with a team the model wasn't fit on raises"""
+        schedule = self.schedule.assign(home_team_id=0)
+        with self.assertRaises(ValueError):
+            simulate_season(self.model, schedule, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
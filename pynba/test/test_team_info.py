@@ -0,0 +1,88 @@
+"""Unit tests for the team_info module"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from pynba import team_info
+from pynba.config import Config
+from pynba.team_info import (
+    TeamIndex,
+    team_abb_to_id,
+    team_id_to_abb,
+    team_ids_to_abbs,
+)
+
+
+class TestTeamIndex(unittest.TestCase):
+    """Test case for the team index"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        for name, value in [
+            ("local_data_directory", tmp_dir.name),
+            ("cache_directory", "cache"),
+            ("team_index_cache", True),
+        ]:
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        team_info.team_index.cache_clear()
+        self.addCleanup(team_info.team_index.cache_clear)
+        self.cache_filepath = os.path.join(
+            tmp_dir.name, "cache", team_info.TEAM_INDEX_FILENAME
+        )
+
+    def test_mappings(self):
+        """Mappings match teams.yaml, both ways, and can't be modified"""
+        teams = team_info.team_info["nba"][2019]
+        id_to_abb = team_id_to_abb("nba", 2019)
+        self.assertEqual(
+            dict(id_to_abb), {key: val["abbreviation"] for key, val in teams.items()}
+        )
+        self.assertEqual(
+            dict(team_abb_to_id("nba", 2019)),
+            {abb: key for key, abb in id_to_abb.items()},
+        )
+        with self.assertRaises(TypeError):
+            id_to_abb[0] = "ABC"  # pylint: disable=unsupported-assignment-operation
+        with self.assertRaises(KeyError):
+            team_id_to_abb("nba", 1900)
+
+    def test_ids_to_abbs(self):
+        """Arrays of ids map to the same abbreviations as looking each one up"""
+        id_to_abb = team_id_to_abb("wnba", 2019)
+        team_ids = np.array(list(id_to_abb) * 3 + [0])
+        abbs = team_ids_to_abbs("wnba", 2019, team_ids)
+        self.assertIsInstance(abbs, pd.Categorical)
+        self.assertEqual(
+            list(abbs[:-1]), [id_to_abb[team_id] for team_id in team_ids[:-1]]
+        )
+        self.assertTrue(pd.isna(abbs[-1]))
+
+    def test_cache(self):
+        """The index is cached, then loaded from its cache instead of teams.yaml"""
+        index = team_info.team_index()
+        self.assertTrue(os.path.exists(self.cache_filepath))
+        team_info.team_index.cache_clear()
+        with mock.patch.object(TeamIndex, "from_team_info") as from_team_info:
+            cached_index = team_info.team_index()
+        from_team_info.assert_not_called()
+        self.assertEqual(
+            dict(cached_index.id_to_abb("nba", 2019)),
+            dict(index.id_to_abb("nba", 2019)),
+        )
+
+    def test_stale_cache(self):
+        """A cache of a different teams.yaml is rebuilt"""
+        team_info.team_index()
+        team_info.team_index.cache_clear()
+        with mock.patch.object(team_info, "_teams_digest", return_value="changed"):
+            team_info.team_index()
+            with np.load(self.cache_filepath) as arrays:
+                self.assertEqual(str(arrays["digest"]), "changed")
@@ -0,0 +1,333 @@
+"""Unit tests for the team_stats module"""
+
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from pymc3.theanof import inputvars
+
+from pynba.halfgames import (
+    _rates,
+    calc_scoring_rate,
+    estimate_shots_per_opp,
+    estimate_shots_per_poss,
+)
+from pynba.constants import LAPLACE
+from pynba.team_info import team_id_to_abb
+from pynba.traces import load_trace
+from pynba.team_stats import (
+    TeamsModel,
+    WARM_START_MEAN,
+    WARM_START_VAR,
+    RESULTS_COLUMNS,
+    TEAM_RATES,
+    TEAM_SIDES,
+)
+
+
+def _halfgames(team_ids, n_games=12, seed=0):
+    """Halfgames of games between teams in turn, with typical rate statistics"""
+    rng = np.random.default_rng(seed)
+    team_ids = np.array(team_ids)
+    games = np.arange(n_games)
+    home_team_ids = team_ids[games % len(team_ids)]
+    away_team_ids = team_ids[(games + 1) % len(team_ids)]
+    n_halfgames = 2 * n_games
+    possessions = rng.integers(95, 105, n_halfgames)
+    shots = rng.binomial(possessions, 0.85)
+    threes = rng.binomial(shots, 0.35)
+    ft_attempted = rng.binomial(possessions, 0.2)
+    halfgames = pd.DataFrame(
+        {
+            "game_id": np.repeat([f"{game:010d}" for game in games], 2),
+            "off_team_id": np.column_stack([home_team_ids, away_team_ids]).ravel(),
+            "def_team_id": np.column_stack([away_team_ids, home_team_ids]).ravel(),
+            "home_team_id": np.repeat(home_team_ids, 2),
+            "league": "nba",
+            "year": 2019,
+            "season_type": "Regular Season",
+            "turnovers": rng.binomial(possessions, 0.13),
+            "threes_attempted": threes,
+            "threes_made": rng.binomial(threes, 0.35),
+            "twos_attempted": shots - threes,
+            "twos_made": rng.binomial(shots - threes, 0.52),
+            "ft_attempted": ft_attempted,
+            "ft_made": rng.binomial(ft_attempted, 0.77),
+            "off_rebs": rng.binomial(40, 0.25, n_halfgames),
+            "def_rebs": rng.binomial(40, 0.75, n_halfgames),
+            "points_scored": rng.integers(95, 120, n_halfgames),
+            "duration": possessions * rng.uniform(13, 15, n_halfgames),
+            "possession_num": possessions,
+        }
+    )
+    return halfgames.assign(**_rates(halfgames))
+
+
+class TestWarmStart(unittest.TestCase):
+    """Test case for warm starting a TeamsModel's fit from an earlier one"""
+
+    def setUp(self):
+        self.team_ids = list(team_id_to_abb("nba", 2019))[:4]
+        self.model = TeamsModel(_halfgames(self.team_ids))
+
+    def _state(self, team_ids):
+        """A warm start state with each team's values equal to its id"""
+        state = {"team_ids": np.array(team_ids), "step_size": np.array(0.5)}
+        for name, value in self.model.model.test_point.items():
+            if value.shape == (len(self.team_ids),):
+                value = np.array(team_ids, dtype=float)
+            state[WARM_START_MEAN + name] = value
+            state[WARM_START_VAR + name] = np.ones_like(value)
+        return state
+
+    def test_teams_remapped(self):
+        """Test team's values are reordered to the model's, ignoring others"""
+        team_ids = list(self.model.team_id_to_team_ind)
+        (
+            mean,
+            variance,
+        ) = self.model._warm_start_point(  # pylint: disable=protected-access
+            self._state([12345] + team_ids[::-1])
+        )
+        point = self.model.model.bijection.rmap(mean)
+        np.testing.assert_array_equal(point["off_pace_log__"], team_ids)
+        np.testing.assert_array_equal(variance, 1)
+
+        (
+            step,
+            start,
+        ) = self.model._warm_step_and_start(  # pylint: disable=protected-access
+            self._state(team_ids), chains=3, random_seed=1
+        )
+        self.assertEqual(len(start), 3)
+        self.assertAlmostEqual(step.step_size, 0.5)
+
+    def test_mismatch(self):
+        """Test a state without one of the model's teams isn't used"""
+        team_ids = list(self.model.team_id_to_team_ind)
+        state = self._state(team_ids[1:] + [12345])
+        self.assertIsNone(
+            self.model._warm_start_point(state)  # pylint: disable=protected-access
+        )
+        state = self._state(team_ids)
+        del state[WARM_START_MEAN + "sigma_pace_log__"]
+        self.assertIsNone(
+            self.model._warm_start_point(state)  # pylint: disable=protected-access
+        )
+
+
+class TestBackends(unittest.TestCase):
+    """Test case for fitting a TeamsModel with approximate inference backends"""
+
+    def setUp(self):
+        self.team_ids = list(team_id_to_abb("nba", 2019))[:4]
+        self.model = TeamsModel(_halfgames(self.team_ids, n_games=40))
+
+    def test_laplace(self):
+        """Test the Laplace approximation's draws make results for every team"""
+        self.model.fit(draws=200, backend=LAPLACE, random_seed=1)
+        self.assertEqual(self.model.trace["off_pace"].shape, (200, 4))
+        results = self.model.results
+        self.assertEqual(
+            sorted(results["team"]),
+            sorted(team_id_to_abb("nba", 2019)[team_id] for team_id in self.team_ids),
+        )
+        self.assertTrue(np.isfinite(results["net_scoring_rate"]).all())
+        self.assertTrue(results["total_pace"].between(80, 120).all())
+
+    def test_invalid(self):
+        """Test an unknown backend raises"""
+        with self.assertRaises(ValueError):
+            self.model.fit(backend="gibbs")
+
+
+class TestCollapsedBinomials(unittest.TestCase):
+    """Test case for summing binomial counts over halfgames with the same teams"""
+
+    def setUp(self):
+        team_ids = list(team_id_to_abb("nba", 2019))[:4]
+        halfgames = _halfgames(team_ids, n_games=40)
+        self.full = TeamsModel(halfgames, collapse_binomials=False)
+        self.collapsed = TeamsModel(halfgames, collapse_binomials=True)
+
+    def test_collapsed(self):
+        """Test binomial terms are per set of teams, and others per halfgame"""
+        full = self.full.model
+        collapsed = self.collapsed.model
+        # 4 teams playing each other in turn, at home & away, make 8 matchups
+        self.assertEqual(collapsed["threes_made"].observations.shape, (8,))
+        self.assertEqual(collapsed["ft_made"].observations.shape, (8,))
+        self.assertEqual(collapsed["pace"].observations.shape, (80,))
+        for name in ["threes_made", "threes_attempted", "turnovers", "ft_made"]:
+            self.assertEqual(
+                collapsed[name].observations.sum(), full[name].observations.sum()
+            )
+
+    def test_posterior(self):
+        """Test the log posterior only differs by a constant, so its gradient matches"""
+        rng = np.random.default_rng(0)
+        full = self.full.model
+        collapsed = self.collapsed.model
+        full_dlogp = full.fastdlogp(inputvars(full.vars))
+        collapsed_dlogp = collapsed.fastdlogp(inputvars(collapsed.vars))
+        differences = []
+        for _ in range(3):
+            point = {
+                name: value + rng.normal(0, 0.01, np.shape(value))
+                for name, value in full.test_point.items()
+            }
+            differences.append(full.logp(point) - collapsed.logp(point))
+            np.testing.assert_allclose(
+                collapsed_dlogp(point), full_dlogp(point), rtol=1e-8, atol=1e-6
+            )
+        np.testing.assert_allclose(differences, differences[0], rtol=1e-10)
+
+
+class TestResults(unittest.TestCase):
+    """Test case for post-processing a trace into a TeamsModel's results"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.team_ids = list(team_id_to_abb("nba", 2019))[:4]
+        self.model = TeamsModel(_halfgames(self.team_ids))
+        means = {
+            "three_attempt_rate": 0.4,
+            "two_make_rate": 0.52,
+            "three_make_rate": 0.35,
+            "off_reb_rate": 0.25,
+            "turnover_rate": 0.13,
+            "ft_attempt_rate": 0.2,
+            "ft_make_rate": 0.77,
+            "pace": 14.0,
+        }
+        self.model._trace = {  # pylint: disable=protected-access
+            f"{side}_{rate}": means[rate] * rng.uniform(0.9, 1.1, (500, 4))
+            for rate in TEAM_RATES
+            for side in TEAM_SIDES
+        }
+
+    def _scoring_rate(self, side):
+        trace = self.model.trace
+        ft_make_rate = (
+            trace["off_ft_make_rate"] if side == "off" else self.model.mu_ft_make_rate
+        )
+        shots_per_poss_est = estimate_shots_per_poss(
+            estimate_shots_per_opp(
+                trace[f"{side}_turnover_rate"], trace[f"{side}_ft_attempt_rate"]
+            ),
+            trace[f"{side}_three_attempt_rate"],
+            trace[f"{side}_three_make_rate"],
+            trace[f"{side}_two_make_rate"],
+            trace[f"{side}_off_reb_rate"],
+        )
+        return calc_scoring_rate(
+            shots_per_poss_est,
+            trace[f"{side}_three_make_rate"],
+            trace[f"{side}_two_make_rate"],
+            trace[f"{side}_three_attempt_rate"],
+            trace[f"{side}_ft_attempt_rate"],
+            ft_make_rate,
+        )
+
+    def test_means(self):
+        """Test results match each statistic's mean computed per draw"""
+        trace = self.model.trace
+        results = self.model._calc_results([])  # pylint: disable=protected-access
+        results = results.set_index("team")
+        teams = [self.model.team_ind_to_team_abb[ind] for ind in range(4)]
+        self.assertEqual(
+            list(results.columns),
+            RESULTS_COLUMNS[1:] + ["league", "year", "season_type"],
+        )
+        off_scoring_rate = self._scoring_rate("off")
+        def_scoring_rate = self._scoring_rate("def")
+        total_pace = trace["off_pace"] + trace["def_pace"]
+        expected = {
+            "off_two_make_rate": trace["off_two_make_rate"].mean(0) * 100,
+            "def_reb_rate": (1 - trace["def_off_reb_rate"].mean(0)) * 100,
+            "off_ft_make_rate": trace["off_ft_make_rate"].mean(0) * 100,
+            "off_scoring_rate": off_scoring_rate.mean(0) * 100,
+            "def_scoring_rate": def_scoring_rate.mean(0) * 100,
+            "net_scoring_rate": (off_scoring_rate - def_scoring_rate).mean(0) * 100,
+            "def_pace": (12 * 4 * 60 / trace["def_pace"] / 2).mean(0),
+            "total_pace": (12 * 4 * 60 / total_pace).mean(0),
+        }
+        for column, values in expected.items():
+            np.testing.assert_allclose(
+                results.loc[teams, column], values, err_msg=column
+            )
+
+    def test_quantiles(self):
+        """Test quantile columns bound the posterior means"""
+        results = self.model._calc_results(  # pylint: disable=protected-access
+            [0.05, 0.95]
+        )
+        for column in ["off_scoring_rate", "def_reb_rate", "total_pace"]:
+            self.assertTrue(
+                (results[f"{column}_p5"] < results[column]).all(), msg=column
+            )
+            self.assertTrue(
+                (results[column] < results[f"{column}_p95"]).all(), msg=column
+            )
+        self.assertNotIn("scoring_margin_p5", results.columns)
+
+
+class TestSavedTrace(unittest.TestCase):
+    """Test case for saving a TeamsModel's trace and memory mapping it back"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.model = TeamsModel(_halfgames(list(team_id_to_abb("nba", 2019))[:4]))
+        model = self.model.model
+        test_point = dict(
+            zip(
+                [var.name for var in model.unobserved_RVs],
+                model.fastfn(model.unobserved_RVs)(model.test_point),
+            )
+        )
+        self.model._trace = {  # pylint: disable=protected-access
+            name: value * rng.uniform(0.9, 1.1, (300,) + np.shape(value))
+            for name, value in test_point.items()
+        }
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.directory = tmp_dir.name
+
+    def test_round_trip(self):
+        """Test every variable's draws are memory mapped back"""
+        self.model.save_trace(self.directory)
+        trace = load_trace(self.directory)
+        self.assertEqual(set(trace), set(self.model.trace))
+        self.assertEqual(trace.teams[0], self.model.team_ind_to_team_abb[0])
+        self.assertIsInstance(trace["off_pace"], np.memmap)
+        for name, values in self.model.trace.items():
+            np.testing.assert_allclose(trace[name], values, rtol=1e-6, err_msg=name)
+        np.testing.assert_allclose(
+            trace.team(trace.teams[2])["def_pace"],
+            self.model.trace["def_pace"][:, 2],
+            rtol=1e-6,
+        )
+
+    def test_layout(self):
+        """Test each team's draws are contiguous on disk"""
+        self.model.save_trace(self.directory)
+        values = np.load(f"{self.directory}/off_pace.npy", mmap_mode="r")
+        self.assertTrue(values.flags.c_contiguous)
+        self.assertEqual(values.shape, (self.model.n_teams, 300))
+        self.assertTrue(values[2].flags.c_contiguous)
+        np.testing.assert_allclose(
+            values[2], self.model.trace["off_pace"][:, 2], rtol=1e-6
+        )
+
+    def test_load(self):
+        """Test results from a loaded trace match the fitted model's"""
+        results = self.model._calc_results()  # pylint: disable=protected-access
+        self.model.save_trace(self.directory)
+        model = TeamsModel(self.model.halfgames)
+        model.load_trace(load_trace(self.directory, mmap_mode=None))
+        pd.testing.assert_frame_equal(model.results, results, rtol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Unit tests for the teams module"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from pynba.config import Config
+from pynba.constants import LOCAL
+from pynba.schemas import TEAMS_SCHEMA, TEAMS_STATS_COLUMNS, apply_schema
+from pynba.teams import save_teams, teams_from_file, teams_from_files
+
+
+def _teams(league, year, season_type, teams=("BOS", "LAL", "MIA")):
+    rng = np.random.default_rng(year)
+    return pd.DataFrame(
+        {
+            "team": list(teams),
+            **{
+                column: rng.uniform(0, 100, len(teams))
+                for column in TEAMS_STATS_COLUMNS
+            },
+            "league": league,
+            "year": year,
+            "season_type": season_type,
+        }
+    )
+
+
+class TestTeamsStore(unittest.TestCase):
+    """Test case for saving and loading teams data"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        for name, value in [
+            ("local_data_directory", tmp_dir.name),
+            ("teams_directory", "teams"),
+            ("teams_source", LOCAL),
+        ]:
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.teams_dir = os.path.join(tmp_dir.name, "teams")
+
+    def test_round_trip(self):
+        """Test saved teams load back with the schema's dtypes"""
+        teams = _teams("nba", 2019, "Regular Season")
+        save_teams(teams, csv=False)
+        result = teams_from_file("nba", 2019, "Regular Season")
+        pd.testing.assert_frame_equal(result, apply_schema(teams, TEAMS_SCHEMA))
+        self.assertIsInstance(result["team"].dtype, pd.CategoricalDtype)
+        self.assertEqual(result["year"].dtype, "int16")
+        self.assertEqual(
+            os.listdir(self.teams_dir), ["nba_2019_Regular Season_teams.parquet"]
+        )
+
+    def test_csv(self):
+        """Test a csv is saved alongside for the web app"""
+        teams = _teams("nba", 2019, "Regular Season")
+        save_teams(teams, csv=True)
+        csv = pd.read_csv(
+            os.path.join(self.teams_dir, "nba_2019_Regular Season_teams.csv")
+        )
+        pd.testing.assert_frame_equal(csv, teams)
+
+    def test_legacy_csv(self):
+        """Test seasons saved before parquet load from their csv"""
+        teams = _teams("nba", 2018, "Regular Season")
+        os.makedirs(self.teams_dir)
+        teams.to_csv(
+            os.path.join(self.teams_dir, "nba_2018_Regular Season_teams.csv"),
+            index=False,
+        )
+        pd.testing.assert_frame_equal(
+            teams_from_file("nba", 2018, "Regular Season"),
+            apply_schema(teams, TEAMS_SCHEMA),
+        )
+        result = teams_from_file(
+            "nba", 2018, "Regular Season", columns=["team", "year"]
+        )
+        self.assertEqual(list(result.columns), ["team", "year"])
+
+    def test_many_seasons(self):
+        """Test many seasons load into one frame, with their categories unioned"""
+        seasons = [
+            ("nba", 2019, "Regular Season"),
+            ("nba", 2020, "Playoffs"),
+            ("wnba", 2020, "Regular Season"),
+        ]
+        for league, year, season_type in seasons:
+            save_teams(
+                _teams(league, year, season_type, teams=[f"{league}{year}", "BOS"]),
+                csv=False,
+            )
+        result = teams_from_files(
+            pd.DataFrame(seasons, columns=["league", "year", "season_type"]),
+            columns=["team", "net_scoring_rate"],
+        )
+        self.assertEqual(
+            list(result.columns),
+            ["team", "net_scoring_rate", "league", "year", "season_type"],
+        )
+        self.assertEqual(result["year"].tolist(), [2019, 2019, 2020, 2020, 2020, 2020])
+        self.assertIsInstance(result["team"].dtype, pd.CategoricalDtype)
+        self.assertEqual(
+            sorted(result["team"].cat.categories),
+            ["BOS", "nba2019", "nba2020", "wnba2020"],
+        )
+
+    def test_missing_season(self):
+        """Test a season without teams data raises"""
+        with self.assertRaises(FileNotFoundError):
+            teams_from_files([("nba", 2019, "Playoffs")])
+
+
+if __name__ == "__main__":
+    unittest.main()
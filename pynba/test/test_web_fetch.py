@@ -0,0 +1,145 @@
+"""Unit tests for the web_fetch module"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from pbpstats.data_loader.data_nba.pbp.file import DataNbaPbpFileLoader
+from pbpstats.data_loader.stats_nba.shots.file import StatsNbaShotsFileLoader
+
+from pynba.constants import DATA_NBA, STATS_NBA
+from pynba.test.stand_in_server import StandInServer
+from pynba.web_fetch import (
+    FetchRequest,
+    TokenBucket,
+    fetch_all,
+    game_fetch_requests,
+)
+
+
+FAST_RETRIES = {"backoff_base": 0.01, "backoff_cap": 0.05, "rate_limit": 0}
+
+
+class TestWebFetch(unittest.TestCase):
+    """Test case for web_fetch, against a local stand-in server"""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = tmpdir.name
+
+    def _request(self, server, path):
+        return FetchRequest(
+            server.url(path), None, None, os.path.join(self.directory, path[1:])
+        )
+
+    def _load(self, path):
+        with open(os.path.join(self.directory, path[1:]), encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_fetches_concurrently(self):
+        """Test payloads are saved to file, with requests in flight concurrently"""
+        routes = {f"/pbp/{ind}.json": [{"game": ind}] for ind in range(20)}
+        with StandInServer(routes, delay=0.25) as server:
+            start = time.monotonic()
+            summary = fetch_all(
+                [self._request(server, path) for path in routes],
+                concurrency=10,
+                **FAST_RETRIES,
+            )
+            elapsed = time.monotonic() - start
+        self.assertEqual(summary.downloaded, 20)
+        self.assertEqual(server.max_in_flight, 10)
+        # 5s if fetched serially, with plenty of headroom for slow machines
+        self.assertLess(elapsed, 2.5)
+        for ind in range(20):
+            self.assertEqual(self._load(f"/pbp/{ind}.json"), {"game": ind})
+
+    def test_retries_then_succeeds(self):
+        """Test retryable failures are retried until they succeed"""
+        routes = {"/flaky.json": [503, 429, {"ok": True}]}
+        with StandInServer(routes) as server:
+            summary = fetch_all([self._request(server, "/flaky.json")], **FAST_RETRIES)
+        self.assertEqual(summary.downloaded, 1)
+        self.assertEqual(summary.retries, 2)
+        self.assertEqual(self._load("/flaky.json"), {"ok": True})
+
+    def test_missing(self):
+        """Test 404s are recorded as missing without retrying"""
+        with StandInServer({}) as server:
+            summary = fetch_all([self._request(server, "/gone.json")], **FAST_RETRIES)
+        self.assertEqual(len(summary.missing), 1)
+        self.assertEqual(summary.retries, 0)
+        self.assertEqual(server.requests, ["/gone.json"])
+
+    def test_max_retries(self):
+        """Test each request is retried at most max_retries times"""
+        with StandInServer({"/down.json": [503]}) as server:
+            summary = fetch_all(
+                [self._request(server, "/down.json")], max_retries=3, **FAST_RETRIES
+            )
+        self.assertEqual(len(summary.failed), 1)
+        self.assertEqual(len(server.requests), 4)
+
+    def test_retry_budget(self):
+        """Test retries across all requests are limited by the retry budget"""
+        routes = {f"/down{ind}.json": [503] for ind in range(5)}
+        with StandInServer(routes) as server:
+            summary = fetch_all(
+                [self._request(server, path) for path in routes],
+                max_retries=10,
+                retry_budget=3,
+                **FAST_RETRIES,
+            )
+        self.assertEqual(len(summary.failed), 5)
+        self.assertEqual(summary.retries, 3)
+        self.assertEqual(len(server.requests), 8)
+
+    def test_skips_cached(self):
+        """Test files already on disk aren't downloaded again"""
+        os.makedirs(os.path.join(self.directory, "pbp"))
+        with open(os.path.join(self.directory, "pbp", "1.json"), "w", encoding="utf-8"):
+            pass
+        with StandInServer({"/pbp/1.json": [{}]}) as server:
+            summary = fetch_all([self._request(server, "/pbp/1.json")], **FAST_RETRIES)
+        self.assertEqual(summary.cached, 1)
+        self.assertEqual(server.requests, [])
+
+    def test_token_bucket(self):
+        """Test the token bucket limits the rate after the initial burst"""
+
+        async def acquire_all():
+            bucket = TokenBucket(rate=50, capacity=5)
+            for _ in range(15):
+                await bucket.acquire()
+
+        start = time.monotonic()
+        asyncio.run(acquire_all())
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_data_nba_filepaths(self):
+        """Test data_nba requests save to where pbpstats loads files from"""
+        game_id = "0022100001"
+        fetch_requests = game_fetch_requests(game_id, 1, 2, DATA_NBA, self.directory)
+        loader = DataNbaPbpFileLoader(self.directory)
+        with self.assertRaisesRegex(Exception, "does not exist"):
+            loader.load_data(game_id)
+        self.assertIn(loader.file_path, [req.filepath for req in fetch_requests])
+
+    def test_stats_nba_filepaths(self):
+        """Test stats_nba requests save to where pbpstats loads files from"""
+        game_id = "1022000001"
+        fetch_requests = game_fetch_requests(game_id, 1, 2, STATS_NBA, self.directory)
+        loader = StatsNbaShotsFileLoader(self.directory)
+        with self.assertRaisesRegex(Exception, "does not exist"):
+            loader.load_data(game_id)
+        self.assertIn(loader.home_file_path, [req.filepath for req in fetch_requests])
+        for fetch_request in fetch_requests:
+            self.assertTrue(fetch_request.url.startswith("https://stats.wnba.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
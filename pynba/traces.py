@@ -0,0 +1,109 @@
+"""Module to load posterior draws saved by TeamsModel.save_trace"""
+
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+
+# metadata file of a saved trace, alongside a .npy file per variable
+TRACE_METADATA_FILENAME = "trace.json"
+# dtype of a saved trace's draws, half the size of the sampler's float64
+TRACE_DTYPE = np.dtype(np.float32)
+
+
+class SavedTrace(Mapping):
+    """
+    Posterior draws saved by TeamsModel.save_trace, mapping each variable's
+    name to an array of its draws, with draws along the first axis like
+    a MultiTrace's combined chains. Each variable's file is only read on
+    first access, and memory mapped if it's local, so e.g. a team's draws
+    of a variable can be sliced without reading the rest.
+
+    Parameters
+    ----------
+    filepath_or_buffer : callable
+        function of a filename in the trace's directory, returning its path
+        or a file object to read it from
+    mmap_mode : str, optional
+        np.load's mmap_mode for local files, defaulting to "r",
+        or None to read them into memory
+    """
+
+    def __init__(self, filepath_or_buffer, mmap_mode="r"):
+        self._filepath_or_buffer = filepath_or_buffer
+        self.mmap_mode = mmap_mode
+        metadata_file = filepath_or_buffer(TRACE_METADATA_FILENAME)
+        if isinstance(metadata_file, str):
+            with open(metadata_file, encoding="utf-8") as file:
+                metadata = json.load(file)
+        else:
+            metadata = json.load(metadata_file)
+        self.league = metadata["league"]
+        self.year = metadata["year"]
+        self.season_type = metadata["season_type"]
+        self.team_ids = metadata["team_ids"]
+        self.teams = metadata["teams"]
+        self.nchains = metadata["chains"]
+        self.varnames = metadata["variables"]
+        self._values = {}
+
+    def __getitem__(self, name):
+        if name not in self.varnames:
+            raise KeyError(name)
+        if name not in self._values:
+            filepath_or_buffer = self._filepath_or_buffer(f"{name}.npy")
+            # np.load can only memory map paths, not file objects
+            mmap_mode = self.mmap_mode if isinstance(filepath_or_buffer, str) else None
+            values = np.load(filepath_or_buffer, mmap_mode=mmap_mode)
+            self._values[name] = np.moveaxis(values, -1, 0)
+        return self._values[name]
+
+    def __iter__(self):
+        return iter(self.varnames)
+
+    def __len__(self):
+        return len(self.varnames)
+
+    def team(self, team):
+        """
+        Draws of every team variable for one team
+
+        Parameters
+        ----------
+        team : str
+            the team's abbreviation, e.g. "BOS"
+
+        Returns
+        -------
+        dict
+            mapping the name of each variable with a value per team
+            to a 1-d array of the team's draws
+        """
+        team_ind = self.teams.index(team)
+        return {
+            name: self[name][:, team_ind]
+            for name in self.varnames
+            if self[name].shape[1:] == (len(self.teams),)
+        }
+
+
+def load_trace(directory, mmap_mode="r"):
+    """
+    Loads posterior draws saved by TeamsModel.save_trace
+
+    Parameters
+    ----------
+    directory : str
+        path of the directory the trace was saved in
+    mmap_mode : str, optional
+        np.load's mmap_mode, defaulting to "r", or None to read into memory
+
+    Returns
+    -------
+    SavedTrace
+    """
+    return SavedTrace(
+        lambda filename: os.path.join(directory, filename), mmap_mode=mmap_mode
+    )
@@ -0,0 +1,384 @@
+"""Module for fetching pbpstats json payloads from the web concurrently"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests import ReadTimeout, ConnectionError as RequestsConnectionError
+from pbpstats import HEADERS, REQUEST_TIMEOUT
+from pbpstats.data_loader.stats_nba.base import StatsNbaLoaderBase
+from pbpstats.data_loader.data_nba.base import DataNbaLoaderBase
+
+from pynba.config import config
+from pynba.constants import STATS_NBA, DATA_NBA
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+FetchRequest = namedtuple("FetchRequest", ["url", "params", "headers", "filepath"])
+_sessions = threading.local()
+
+
+class TokenBucket:  # pylint: disable=too-few-public-methods
+    """
+    Asyncio token bucket, allowing bursts of up to capacity requests,
+    then limiting requests to rate per second on average.
+    A non-positive rate disables the limit.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available, then take it"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FetchSummary:  # pylint: disable=too-few-public-methods
+    """Tally of the outcomes of a batch of fetch requests"""
+
+    def __init__(self):
+        self.downloaded = 0
+        self.cached = 0
+        self.retries = 0
+        self.bytes = 0
+        self.missing = []
+        self.failed = []
+
+    def __str__(self):
+        return (
+            f"{self.downloaded} downloaded ({self.bytes} bytes), "
+            f"{self.cached} already cached, {len(self.missing)} missing, "
+            f"{len(self.failed)} failed, {self.retries} retries"
+        )
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """Exponential backoff with full jitter, in seconds"""
+    if base is None:
+        base = config.web_backoff_base
+    if cap is None:
+        cap = config.web_backoff_cap
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def fetch_all(fetch_requests, **kwargs):
+    """
+    Fetches json payloads from the web concurrently, saving each to its filepath
+
+    Parameters
+    ----------
+    fetch_requests : iterable of FetchRequest
+    **kwargs
+        passed along to fetch_all_async
+
+    Returns
+    -------
+    FetchSummary
+    """
+    return asyncio.run(fetch_all_async(fetch_requests, **kwargs))
+
+
+async def fetch_all_async(
+    fetch_requests,
+    *,
+    concurrency=None,
+    rate_limit=None,
+    max_retries=None,
+    retry_budget=None,
+    backoff_base=None,
+    backoff_cap=None,
+    overwrite=False,
+):
+    """
+    Coroutine fetching json payloads from the web concurrently,
+    saving each to its filepath. Requests that time out, fail to connect,
+    or receive a 429 or 5xx response are retried with exponential backoff
+    and jitter, up to max_retries times each, and retry_budget times in total.
+    404 responses are recorded as missing rather than retried.
+
+    Parameters
+    ----------
+    fetch_requests : iterable of FetchRequest
+    concurrency : int, optional
+        maximum number of requests in flight, defaulting to config.web_concurrency
+    rate_limit : float, optional
+        maximum requests per second, defaulting to config.web_rate_limit
+    max_retries : int, optional
+        defaulting to config.web_max_retries
+    retry_budget : int, optional
+        defaulting to config.web_retry_budget
+    backoff_base : float, optional
+        seconds, defaulting to config.web_backoff_base
+    backoff_cap : float, optional
+        seconds, defaulting to config.web_backoff_cap
+    overwrite : bool
+        whether to re-download files that already exist
+
+    Returns
+    -------
+    FetchSummary
+    """
+    if concurrency is None:
+        concurrency = config.web_concurrency
+    if rate_limit is None:
+        rate_limit = config.web_rate_limit
+    if max_retries is None:
+        max_retries = config.web_max_retries
+    if retry_budget is None:
+        retry_budget = config.web_retry_budget
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        fetcher = _Fetcher(
+            executor,
+            TokenBucket(rate_limit, concurrency),
+            max_retries,
+            retry_budget,
+            (backoff_base, backoff_cap),
+        )
+        await asyncio.gather(
+            *(
+                fetcher.fetch(fetch_request)
+                for fetch_request in fetch_requests
+                if overwrite or not fetcher.is_cached(fetch_request)
+            )
+        )
+    return fetcher.summary
+
+
+class _Fetcher:  # pylint: disable=too-few-public-methods
+    def __init__(  # pylint: disable=too-many-arguments
+        self, executor, bucket, max_retries, retry_budget, backoff
+    ):
+        self.executor = executor
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.backoff = backoff
+        self.summary = FetchSummary()
+
+    def is_cached(self, fetch_request):
+        """Whether the request's file already exists, tallying it if so"""
+        if os.path.isfile(fetch_request.filepath):
+            self.summary.cached += 1
+            return True
+        return False
+
+    async def fetch(self, fetch_request):
+        """Fetch a single request, retrying as allowed"""
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                response = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, _get, fetch_request
+                )
+            except (ReadTimeout, RequestsConnectionError) as exc:
+                response = None
+                reason = repr(exc)
+            else:
+                reason = f"status code {response.status_code}"
+
+            if response is not None:
+                if response.status_code == 200:
+                    self._save(fetch_request, response)
+                    return
+                if response.status_code == 404:
+                    self.summary.missing.append(fetch_request)
+                    return
+                if response.status_code not in RETRY_STATUS_CODES:
+                    break
+
+            if attempt == self.max_retries or self.retry_budget <= 0:
+                break
+            self.retry_budget -= 1
+            self.summary.retries += 1
+            delay = backoff_delay(attempt, *self.backoff)
+            if response is not None and "Retry-After" in response.headers:
+                delay = max(delay, _parse_retry_after(response.headers["Retry-After"]))
+            logger.debug(
+                f"Re-requesting {fetch_request.url} after {reason} "
+                f"in {delay:.2f} seconds."
+            )
+            await asyncio.sleep(delay)
+
+        logger.warning(f"Failed to fetch {fetch_request.url} after {reason}")
+        self.summary.failed.append(fetch_request)
+
+    def _save(self, fetch_request, response):
+        try:
+            response.json()
+        except ValueError:
+            logger.warning(f"Invalid json received from {fetch_request.url}")
+            self.summary.failed.append(fetch_request)
+            return
+        os.makedirs(os.path.dirname(fetch_request.filepath), exist_ok=True)
+        tmp_filepath = f"{fetch_request.filepath}.tmp"
+        with open(tmp_filepath, "wb") as json_file:
+            json_file.write(response.content)
+        os.replace(tmp_filepath, fetch_request.filepath)
+        self.summary.downloaded += 1
+        self.summary.bytes += len(response.content)
+
+
+def _get(fetch_request):
+    """Blocking GET, using a keep-alive session per thread"""
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    return session.get(
+        fetch_request.url,
+        params=fetch_request.params,
+        headers=fetch_request.headers,
+        timeout=REQUEST_TIMEOUT,
+    )
+
+
+def _parse_retry_after(value):
+    try:
+        return float(value)
+    except ValueError:
+        return 0
+
+
+def game_fetch_requests(game_id, home_team_id, away_team_id, provider, directory):
+    """
+    Lists the requests needed to load a pbpstats Game from file,
+    saving to the same filepaths pbpstats' web loaders use
+
+    Parameters
+    ----------
+    game_id : str
+    home_team_id : int
+    away_team_id : int
+    provider : str
+        e.g. "stats_nba", "data_nba"
+    directory : str
+        pbpstats data directory
+
+    Returns
+    -------
+    list of FetchRequest
+    """
+    if provider == DATA_NBA:
+        return _data_nba_game_requests(game_id, directory)
+    if provider == STATS_NBA:
+        return _stats_nba_game_requests(game_id, home_team_id, away_team_id, directory)
+    raise ValueError(f"Incompatible pbpstats data provider: {provider}")
+
+
+def _data_nba_game_requests(game_id, directory):
+    loader = DataNbaLoaderBase()
+    loader.game_id = game_id
+    base_url = (
+        f"https://data.{loader.league}.com/data/v2015/json/mobile_teams/"
+        f"{loader.league}/{loader.season}/scores"
+    )
+    return [
+        FetchRequest(
+            f"{base_url}/pbp/{game_id}_full_pbp.json",
+            None,
+            None,
+            os.path.join(directory, "pbp", f"data_{game_id}.json"),
+        ),
+        FetchRequest(
+            f"{base_url}/gamedetail/{game_id}_gamedetail.json",
+            None,
+            None,
+            os.path.join(directory, "game_details", f"data_{game_id}.json"),
+        ),
+    ]
+
+
+def _stats_nba_game_requests(game_id, home_team_id, away_team_id, directory):
+    loader = StatsNbaLoaderBase()
+    loader.game_id = game_id
+    base_url = f"https://stats.{loader.league}.com/stats"
+    range_params = {
+        "GameId": game_id,
+        "StartPeriod": 0,
+        "EndPeriod": 10,
+        "RangeType": 2,
+        "StartRange": 0,
+        "EndRange": 55800,
+    }
+    game_details = os.path.join(directory, "game_details")
+    fetch_requests = [
+        FetchRequest(
+            f"{base_url}/playbyplayv2",
+            range_params,
+            HEADERS,
+            os.path.join(directory, "pbp", f"stats_{game_id}.json"),
+        ),
+        FetchRequest(
+            f"{base_url}/boxscoretraditionalv2",
+            range_params,
+            HEADERS,
+            os.path.join(game_details, f"stats_boxscore_{game_id}.json"),
+        ),
+        FetchRequest(
+            f"{base_url}/boxscoresummaryv2",
+            {"GameId": game_id},
+            HEADERS,
+            os.path.join(game_details, f"stats_summary_{game_id}.json"),
+        ),
+    ]
+    for side, team_id in [("home", home_team_id), ("away", away_team_id)]:
+        fetch_requests.append(
+            FetchRequest(
+                f"{base_url}/shotchartdetail",
+                _shots_params(loader, team_id),
+                HEADERS,
+                os.path.join(game_details, f"stats_{side}_shots_{game_id}.json"),
+            )
+        )
+    return fetch_requests
+
+
+def _shots_params(loader, team_id):
+    return {
+        "GameID": loader.game_id,
+        "Season": loader.season,
+        "SeasonType": loader.season_type,
+        "PlayerID": 0,
+        "Outcome": "",
+        "Location": "",
+        "Month": 0,
+        "SeasonSegment": "",
+        "DateFrom": "",
+        "DateTo": "",
+        "OpponentTeamID": 0,
+        "VsConference": "",
+        "VsDivision": "",
+        "Position": "",
+        "RookieYear": "",
+        "GameSegment": "",
+        "Period": 0,
+        "LastNGames": 0,
+        "ContextMeasure": "FG_PCT",
+        "PlayerPosition": "",
+        "LeagueID": loader.game_id[0:2],
+        "TeamID": team_id,
+    }